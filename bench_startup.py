@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Startup-time benchmark for the vt CLI.
+
+Measures how long `import vidtools` and parsing a command take compared with
+a bare interpreter, and checks that the heavy dependencies stay unimported
+until they are needed. Exits non-zero on a regression, so it can run in CI:
+
+    python bench_startup.py                  # report
+    python bench_startup.py --max-ms 40      # fail if the overhead is above 40 ms
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be imported just to start the CLI and parse a command
+LAZY_MODULES = ["structlog", "tqdm", "rich", "vidtools.main", "vidtools.presets",
+                "vidtools.probe", "vidtools.batch", "sqlite3", "asyncio", "numpy"]
+
+CASES = {
+    "python": "pass",
+    "import vidtools": "import vidtools",
+    "parse command": (
+        "import vidtools.cli as c; "
+        "c.parse_arguments(['cut', 'setup.py', 'out.mp4', '--start', '1', '--duration', '2'])"
+    ),
+}
+
+
+def time_case(code, runs):
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                       stdout=subprocess.DEVNULL, cwd=HERE)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def imported_modules():
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    code = CASES["parse command"] + "; import sys; print('\\n'.join(sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=HERE,
+                         capture_output=True, text=True).stdout
+    return set(out.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vt startup time")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per case (median is reported)")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Fail if parsing a command costs more than this over bare python")
+    args = parser.parse_args()
+
+    results = {name: time_case(code, args.runs) for name, code in CASES.items()}
+    baseline = results["python"]
+    for name, ms in results.items():
+        print(f"{name:<16} {ms:7.1f} ms  (+{ms - baseline:.1f} ms)")
+
+    failed = False
+    eager = sorted(m for m in LAZY_MODULES if m in imported_modules())
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+    overhead = results["parse command"] - baseline
+    if args.max_ms is not None and overhead > args.max_ms:
+        print(f"FAIL: startup overhead {overhead:.1f} ms exceeds {args.max_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
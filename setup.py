@@ -50,6 +50,7 @@ setup(
     ],
     extras_require={
         "tui": ["textual>=0.40.0"],
+        "frames": ["numpy>=1.20"],
         "dev": [
             "pytest>=7.0",
             "black>=23.0",
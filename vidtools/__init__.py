@@ -6,49 +6,53 @@ from ._version import __version__, __version_info__
 
 __author__ = "Fred Bliss"
 
-from .main import (
-    cut_video,
-    resize_video,
-    convert_format,
-    extract_audio,
-    extract_frames,
-    concatenate_videos,
-    crop_video,
-    rotate_video,
-    add_subtitles,
-    get_video_info,
-    sanitize_video,
-    apply_preset,
-)
-
-from .presets import (
-    get_presets,
-    save_preset_command,
-    delete_preset,
-    edit_preset_command,
-    list_presets,
-)
+# Public names are resolved on first access (PEP 562) so that `import vidtools`
+# and the `vt` entry point don't import every command module up front.
+_EXPORTS = {
+    # Core functions
+    "cut_video": "main",
+    "resize_video": "main",
+    "convert_format": "main",
+    "extract_audio": "main",
+    "extract_frames": "main",
+    "concatenate_videos": "main",
+    "crop_video": "main",
+    "rotate_video": "main",
+    "add_subtitles": "main",
+    "get_video_info": "main",
+    "sanitize_video": "main",
+    "apply_preset": "main",
+    "Pipeline": "pipeline",
+    # Preset functions
+    "get_presets": "presets",
+    "save_preset_command": "presets",
+    "delete_preset": "presets",
+    "edit_preset_command": "presets",
+    "list_presets": "presets",
+}
+
+# Submodules reachable as attributes, e.g. `vidtools.aio.convert_format`
+_SUBMODULES = ("aio", "batch", "cache", "frames", "governor", "probe", "telemetry")
 
 __all__ = [
     # Version
     "__version__",
-    # Core functions
-    "cut_video",
-    "resize_video", 
-    "convert_format",
-    "extract_audio",
-    "extract_frames",
-    "concatenate_videos",
-    "crop_video",
-    "rotate_video",
-    "add_subtitles",
-    "get_video_info",
-    "sanitize_video",
-    "apply_preset",
-    # Preset functions
-    "get_presets",
-    "save_preset_command",
-    "delete_preset",
-    "edit_preset_command",
-    "list_presets",
-]
\ No newline at end of file
+    *_EXPORTS,
+]
+
+
+def __getattr__(name):
+    import importlib
+
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS, *_SUBMODULES])
@@ -0,0 +1,234 @@
+"""asyncio API: run ffmpeg jobs on an event loop instead of blocking a thread.
+
+The blocking functions in vidtools.main build an ffmpeg command and run it
+with run_ffmpeg_command, which exits the process on failure.  Here the
+same functions are called with command capture enabled, so they only plan
+the command (probing, seek planning, stream-copy decisions), and the
+command is then run as an asyncio subprocess:
+
+    job = await vidtools.aio.convert_format("in.mkv", "out.mp4", "mp4",
+                                             progress=print, timeout=600)
+    await job          # raises FFmpegError / asyncio.TimeoutError
+    await job.cancel() # SIGTERM, then SIGKILL after a grace period
+
+Planning runs in the loop's default executor; no thread is held while
+ffmpeg runs, so one loop can drive many concurrent jobs.  Operations that
+chain several dependent ffmpeg runs (chunked or normalized encodes, smart
+cuts, merges) cannot be expressed as a single job and raise ValueError.
+"""
+
+import asyncio
+import functools
+import subprocess
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from .governor import get_governor
+from .utils import (STDERR_TAIL_LINES, ProgressEvent, _expected_duration, _note_stderr_line,
+                    _progress_line, ffmpeg_run_options, logger)
+
+# Seconds a cancelled ffmpeg gets to finish writing after SIGTERM
+KILL_GRACE = 5.0
+
+
+class FFmpegError(RuntimeError):
+    """ffmpeg exited with a non-zero status."""
+
+    def __init__(self, returncode: int, command: List[str], stderr: List[str]):
+        self.returncode = returncode
+        self.command = command
+        self.stderr = stderr
+        detail = stderr[-1] if stderr else "no error output"
+        super().__init__(f"ffmpeg exited with status {returncode}: {detail}")
+
+
+class Job:
+    """Handle for one running ffmpeg process.
+
+    Awaiting the job waits for it to finish.  ``progress`` is called with a
+    ProgressEvent (from the event loop thread) for every ffmpeg update;
+    ``last_progress`` holds the most recent one.
+    """
+
+    __slots__ = ("command", "progress", "timeout", "returncode", "stderr", "last_progress",
+                 "_process", "_task", "_duration")
+
+    def __init__(self, command: List[str], progress: Optional[Callable[[ProgressEvent], None]] = None,
+                 timeout: Optional[float] = None):
+        self.command = list(command)
+        self.progress = progress
+        self.timeout = timeout
+        self.returncode: Optional[int] = None
+        self.stderr: deque = deque(maxlen=STDERR_TAIL_LINES)
+        self.last_progress: Optional[ProgressEvent] = None
+        self._process = None
+        self._task = None
+        self._duration = {"duration": _expected_duration(self.command)}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> "Job":
+        """Spawn ffmpeg; returns once the process exists."""
+        if self._task is not None:
+            raise RuntimeError("job already started")
+        # ffmpeg writes progress to stdout, which a file output never uses
+        to_stdout = self.command[-1] in ("-", "pipe:", "pipe:1")
+        argv = [self.command[0], "-nostdin", "-nostats"]
+        if not to_stdout:
+            argv += ["-progress", "pipe:1"]
+        argv += self.command[1:]
+        governor = get_governor()
+        argv = governor.apply(argv, governor.acquire())
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL if to_stdout else subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except BaseException:
+            governor.release()
+            raise
+        logger.debug("Started ffmpeg job", pid=self._process.pid, command=self.command)
+        self._task = asyncio.ensure_future(self._run())
+        self._task.add_done_callback(lambda _: governor.release())
+        return self
+
+    async def _read_progress(self):
+        fields = {}
+        async for raw in self._process.stdout:
+            event = _progress_line(raw.decode("utf-8", "replace"), fields, self._duration)
+            if event is None:
+                continue
+            self.last_progress = event
+            if self.progress is not None:
+                try:
+                    self.progress(event)
+                except Exception:
+                    logger.exception("Progress callback failed", command=self.command)
+
+    async def _read_stderr(self):
+        async for raw in self._process.stderr:
+            _note_stderr_line(raw.decode("utf-8", "replace"), self.stderr, self._duration)
+
+    async def _run(self) -> int:
+        from . import telemetry
+
+        started = time.monotonic()
+        readers = [self._read_stderr()]
+        if self._process.stdout is not None:
+            readers.append(self._read_progress())
+        try:
+            await asyncio.wait_for(asyncio.gather(*readers, self._process.wait()), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("ffmpeg job timed out", timeout=self.timeout, command=self.command)
+            await self._terminate()
+            raise
+        except asyncio.CancelledError:
+            await self._terminate()
+            raise
+        self.returncode = self._process.returncode
+        # The event loop reaps the child itself, so there is no rusage here
+        telemetry.record(telemetry.JobMetrics(self.command, self.returncode,
+                                              time.monotonic() - started, self.last_progress))
+        if self.returncode != 0:
+            raise FFmpegError(self.returncode, self.command, list(self.stderr))
+        return self.returncode
+
+    async def _terminate(self, grace: float = KILL_GRACE):
+        """SIGTERM lets ffmpeg close the output cleanly; SIGKILL if it does not stop."""
+        process = self._process
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), grace)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        except ProcessLookupError:
+            pass
+        self.returncode = process.returncode
+
+    async def wait(self) -> int:
+        """Wait for ffmpeg to finish; raises FFmpegError, asyncio.TimeoutError or CancelledError."""
+        if self._task is None:
+            await self.start()
+        return await asyncio.shield(self._task)
+
+    async def cancel(self, grace: float = KILL_GRACE) -> None:
+        """Stop the job: SIGTERM, then SIGKILL if ffmpeg is still running after ``grace`` seconds."""
+        if self._task is None or self._task.done():
+            return
+        await self._terminate(grace)
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, FFmpegError):
+            pass
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __repr__(self):
+        state = "running" if self.running else f"returncode={self.returncode}"
+        return f"<Job {self.command[-1]!r} {state}>"
+
+
+async def run_command(command: List[str], progress=None, timeout=None) -> Job:
+    """Start an ffmpeg argv as a Job."""
+    return await Job(command, progress=progress, timeout=timeout).start()
+
+
+def plan_command(func: Callable, *args, overwrite: bool = False, **kwargs) -> List[str]:
+    """Call a blocking vidtools function with capture enabled and return its ffmpeg argv.
+
+    Raises:
+        ValueError: the function runs no ffmpeg command or several dependent ones
+    """
+    captured: List[List[str]] = []
+    with ffmpeg_run_options(capture=captured, quiet=True, overwrite=overwrite):
+        try:
+            func(*args, **kwargs)
+        except SystemExit as e:
+            raise ValueError(f"{func.__name__} failed while planning (status {e.code})") from None
+    if len(captured) != 1:
+        raise ValueError(f"{func.__name__} with these arguments runs {len(captured)} ffmpeg "
+                         "commands; only single-command operations can run as a job")
+    return captured[0]
+
+
+async def start(func: Callable, *args, progress=None, timeout=None, overwrite: bool = False,
+                **kwargs) -> Job:
+    """Plan func(*args, **kwargs) in the default executor and start its command as a Job."""
+    loop = asyncio.get_running_loop()
+    command = await loop.run_in_executor(
+        None, functools.partial(plan_command, func, *args, overwrite=overwrite, **kwargs))
+    return await run_command(command, progress=progress, timeout=timeout)
+
+
+def _async_version(name: str):
+    async def wrapper(*args, progress=None, timeout=None, overwrite=False, **kwargs):
+        from . import main
+
+        return await start(getattr(main, name), *args, progress=progress, timeout=timeout,
+                           overwrite=overwrite, **kwargs)
+
+    wrapper.__name__ = wrapper.__qualname__ = name
+    wrapper.__doc__ = (f"Async vidtools.{name}: same arguments plus ``progress``, ``timeout`` "
+                       "and ``overwrite``; returns a started Job.")
+    return wrapper
+
+
+convert_format = _async_version("convert_format")
+resize_video = _async_version("resize_video")
+cut_video = _async_version("cut_video")
+extract_audio = _async_version("extract_audio")
+extract_frames = _async_version("extract_frames")
+crop_video = _async_version("crop_video")
+rotate_video = _async_version("rotate_video")
+add_subtitles = _async_version("add_subtitles")
+apply_preset = _async_version("apply_preset")
@@ -0,0 +1,268 @@
+"""Shared execution engine for the ``vt batch`` subcommands.
+
+Each batch handler in ``main.py`` turns its glob into a list of BatchJob
+entries and hands them to run_batch(), which runs them one at a time or
+through a worker pool and prints a single aggregated summary.  When a
+Journal is supplied every job's state and resolved ffmpeg argv is recorded
+so an interrupted run can be resumed.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from .journal import Journal, job_key
+from .utils import (_current_run_options, ffmpeg_run_options, last_ffmpeg_error, logger,
+                    run_ffmpeg_command)
+
+
+class BatchJob:
+    """One unit of batch work: produce ``output_file`` from ``input_file``.
+
+    ``params`` holds the operation settings; they are part of the journal key
+    so a rerun with different settings is not mistaken for a finished job.
+    """
+
+    __slots__ = ("input_file", "output_file", "run", "params")
+
+    def __init__(self, input_file: str, output_file: str, run: Callable[[], None],
+                 params: Optional[Dict[str, Any]] = None):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.run = run
+        self.params = params
+
+
+class BatchResult:
+    """Per-run accounting returned by run_batch()."""
+
+    __slots__ = ("total", "succeeded", "skipped", "failed")
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.succeeded: List[BatchJob] = []
+        self.skipped: List[BatchJob] = []
+        self.failed: List[tuple] = []  # (BatchJob, error message)
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Map the ``-j/--jobs`` value to a worker count (0 means one per CPU)."""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+_END = object()
+
+
+def imap_bounded(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int,
+    window: Optional[int] = None,
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """Yield (item, result, error) in completion order with bounded look-ahead.
+
+    Unlike Executor.map, at most ``window`` items (default 4 x workers) are
+    pulled from ``items`` ahead of the consumer, so memory stays flat when
+    ``items`` is a lazy walk over a huge directory tree.
+    """
+    window = window or max_workers * 4
+    iterator = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        for item in iterator:
+            pending[pool.submit(func, item)] = item
+            if len(pending) >= window:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+                next_item = next(iterator, _END)
+                if next_item is not _END:
+                    pending[pool.submit(func, next_item)] = next_item
+
+
+def _exit_error(exit: SystemExit) -> str:
+    """Describe a failed run, including ffmpeg's last stderr line when there is one."""
+    error = f"ffmpeg exited with status {exit.code}"
+    detail = last_ffmpeg_error()
+    return f"{error}: {detail}" if detail else error
+
+
+def _run_one(job: BatchJob, parallel: bool, overwrite: bool,
+             journal: Optional[Journal], operation: str, concurrency: int = 1) -> None:
+    key = job_key(operation, job.input_file, job.output_file, job.params)
+    if journal:
+        journal.record(key, "running", job.input_file, job.output_file, params=job.params)
+    argv: List[List[str]] = []
+    # ffmpeg must never prompt on a shared terminal; in parallel mode the
+    # per-process progress bars are replaced by the aggregate bar below.
+    with ffmpeg_run_options(quiet=parallel, overwrite=overwrite, record=argv,
+                            concurrency=concurrency):
+        try:
+            job.run()
+        except SystemExit as e:
+            # run_ffmpeg_command exits on failure; report it as a job error
+            error = _exit_error(e)
+            if journal:
+                journal.record(key, "failed", job.input_file, job.output_file,
+                               argv=argv, error=error, params=job.params)
+            raise RuntimeError(error) from None
+        except Exception as e:
+            if journal:
+                journal.record(key, "failed", job.input_file, job.output_file,
+                               argv=argv, error=str(e), params=job.params)
+            raise
+    if journal:
+        journal.record(key, "done", job.input_file, job.output_file, argv=argv, params=job.params)
+
+
+def _plan(jobs: List[BatchJob], operation: str, overwrite: bool,
+          journal: Optional[Journal], result: BatchResult) -> List[tuple]:
+    """Decide which jobs run and whether ffmpeg may overwrite their output."""
+    planned = []
+    resumed = 0
+    for job in jobs:
+        key = job_key(operation, job.input_file, job.output_file, job.params)
+        if journal and journal.is_complete(key, job.input_file, job.output_file):
+            resumed += 1
+            result.skipped.append(job)
+        elif journal and journal.has_entry(key):
+            # Started or failed in an earlier run: whatever is on disk is partial.
+            planned.append((job, True))
+        elif not overwrite and os.path.exists(job.output_file):
+            print(f"Skipping {job.input_file} (output exists)")
+            result.skipped.append(job)
+        else:
+            planned.append((job, overwrite))
+    if resumed:
+        print(f"Resuming: {resumed} jobs already complete")
+    return planned
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    verb: str,
+    operation: str,
+    max_workers: int = 1,
+    overwrite: bool = False,
+    skipped: Optional[List[BatchJob]] = None,
+    journal: Optional[Journal] = None,
+) -> BatchResult:
+    """Run batch jobs, sequentially or concurrently, and print a summary.
+
+    Existing outputs are skipped unless ``overwrite`` is set.  With a journal,
+    jobs it reports complete are skipped and jobs it saw start are redone.
+
+    Args:
+        jobs: Jobs to run
+        verb: Progress prefix, e.g. "Converting"
+        operation: Name used in the summary, e.g. "conversion"
+        max_workers: Number of ffmpeg processes to run at once
+        overwrite: Replace existing outputs (passes -y instead of -n to ffmpeg)
+        skipped: Jobs the caller already decided not to run (for the summary)
+        journal: Journal to consult and record job states in
+    """
+    result = BatchResult(total=len(jobs) + len(skipped or []))
+    result.skipped.extend(skipped or [])
+    planned = _plan(jobs, operation, overwrite, journal, result)
+    parallel = max_workers > 1 and len(planned) > 1
+
+    if not parallel:
+        for job, job_overwrite in planned:
+            print(f"{verb}: {job.input_file} -> {job.output_file}")
+            try:
+                _run_one(job, False, job_overwrite, journal, operation)
+            except Exception as e:
+                result.failed.append((job, str(e)))
+                print(f"  ✗ Failed: {e}")
+            else:
+                result.succeeded.append(job)
+                print("  ✓ Success")
+    else:
+        print(f"Running {len(planned)} jobs with {max_workers} workers")
+        progress = tqdm(total=len(planned), unit="file", desc=verb, dynamic_ncols=True)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_run_one, job, True, job_overwrite, journal, operation,
+                            min(max_workers, len(planned))): job
+                for job, job_overwrite in planned
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result.failed.append((job, str(e)))
+                    progress.write(f"  ✗ {job.input_file}: {e}")
+                else:
+                    result.succeeded.append(job)
+                progress.update(1)
+        progress.close()
+
+    _print_summary(result, operation)
+    return result
+
+
+def _print_summary(result: BatchResult, operation: str) -> None:
+    logger.info(
+        "Batch finished",
+        operation=operation,
+        total=result.total,
+        succeeded=len(result.succeeded),
+        skipped=len(result.skipped),
+        failed=len(result.failed),
+    )
+    print(f"\nBatch {operation} complete: {len(result.succeeded)}/{result.total} successful"
+          + (f", {len(result.skipped)} skipped" if result.skipped else ""))
+    if result.failed:
+        print(f"{len(result.failed)} failed:")
+        for job, error in result.failed:
+            print(f"  ✗ {job.input_file}: {error}")
+
+
+def _run_command(command: List[str], options: Dict[str, Any]) -> None:
+    # Worker threads don't inherit the caller's run options; carry them over
+    # (e.g. a journal's argv recorder) but keep per-process output quiet.
+    with ffmpeg_run_options(**{**options, "quiet": True}):
+        try:
+            run_ffmpeg_command(command)
+        except SystemExit as e:
+            raise RuntimeError(_exit_error(e)) from None
+
+
+def run_commands(commands: List[List[str]], desc: str, unit: str = "job",
+                 max_workers: Optional[int] = None,
+                 overwrite: bool = True) -> List[Tuple[int, BaseException]]:
+    """Run independent ffmpeg commands concurrently under one aggregate progress bar.
+
+    Used for intermediate files (chunks, normalized clips), which is why
+    ``overwrite`` defaults to True.  ``max_workers`` defaults to one per CPU.
+
+    Returns:
+        (index, error) for every command that failed
+    """
+    options = dict(_current_run_options())
+    options["overwrite"] = overwrite
+    workers = max(1, min(len(commands), max_workers or os.cpu_count() or 1))
+    options["concurrency"] = workers
+    failed: List[Tuple[int, BaseException]] = []
+    with tqdm(total=len(commands), unit=unit, desc=desc, dynamic_ncols=True,
+              disable=options.get("quiet", False)) as bar:
+        for i, _, error in imap_bounded(lambda i: _run_command(commands[i], options),
+                                        range(len(commands)), workers):
+            if error:
+                failed.append((i, error))
+                logger.error("Command failed", desc=desc, index=i, error=str(error))
+            bar.update(1)
+    return failed
@@ -0,0 +1,209 @@
+"""Content-addressed cache of ffmpeg outputs.
+
+An entry is keyed on the exact ffmpeg argv with every ``-i`` input replaced
+by a sampled fingerprint of that file and the output path replaced by its
+extension, so re-running the same command on an unchanged input restores
+the stored artifact (hardlink, or copy across filesystems) instead of
+encoding again.  Entries are evicted least-recently-used once the cache
+grows beyond its size limit.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+from .utils import cache_dir, logger
+
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_COUNT = 8
+DEFAULT_MAX_SIZE = 10 * 1024 ** 3  # 10 GiB
+
+# Flags that change how ffmpeg behaves but not what it writes
+_NEUTRAL_FLAGS = {"-y", "-n", "-nostdin", "-hide_banner", "-nostats"}
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as ``500M``, ``10G`` or ``1048576`` into bytes."""
+    text = text.strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def max_cache_size() -> int:
+    value = os.environ.get("VIDTOOLS_CACHE_MAX_SIZE")
+    return parse_size(value) if value else DEFAULT_MAX_SIZE
+
+
+def outputs_dir() -> str:
+    return cache_dir("outputs")
+
+
+def sample_fingerprint(path: str) -> str:
+    """Hash the file size plus evenly spaced samples of its content.
+
+    Reading SAMPLE_COUNT small blocks keeps fingerprinting multi-GB sources
+    cheap while still catching re-encodes, truncation and edits.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= SAMPLE_SIZE * SAMPLE_COUNT:
+            digest.update(f.read())
+        else:
+            step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+            for i in range(SAMPLE_COUNT):
+                f.seek(i * step)
+                digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def command_key(command: List[str]) -> Optional[str]:
+    """Return the cache key for an ffmpeg argv, or None if it is not cacheable.
+
+    Only single-output commands writing a regular file are cacheable.
+    """
+    output = command[-1]
+    if output in ("-", "pipe:", "pipe:1") or "%" in output or output.startswith("-"):
+        return None
+    normalized = []
+    expect_input = False
+    for arg in command[1:-1]:
+        if expect_input:
+            expect_input = False
+            if os.path.isfile(arg):
+                normalized.append("file:" + sample_fingerprint(arg))
+                continue
+        elif arg == "-i":
+            expect_input = True
+        elif arg in _NEUTRAL_FLAGS:
+            continue
+        normalized.append(arg)
+    normalized.append("output" + os.path.splitext(output)[1].lower())
+    payload = json.dumps(normalized)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str, output_file: str) -> str:
+    return os.path.join(outputs_dir(), key + os.path.splitext(output_file)[1].lower())
+
+
+def _place(src: str, dst: str) -> None:
+    """Hardlink src to dst, falling back to a copy across filesystems."""
+    tmp = dst + ".vtcache-tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _meta_path(entry: str) -> str:
+    return entry + ".json"
+
+
+def restore(key: str, output_file: str, overwrite: bool = False) -> bool:
+    """Materialise a cached artifact at output_file. Returns True on a hit."""
+    entry = _entry_path(key, output_file)
+    if not os.path.exists(entry):
+        return False
+    if os.path.exists(output_file) and not overwrite:
+        # Let ffmpeg apply its usual overwrite prompt / -n handling.
+        return False
+    try:
+        with open(_meta_path(entry)) as f:
+            expected = json.load(f)["fingerprint"]
+    except (OSError, ValueError, KeyError):
+        expected = None
+    # A hardlinked output that was later rewritten in place also changes
+    # the cache entry; detect that and drop the entry instead of serving it.
+    if expected != sample_fingerprint(entry):
+        logger.warning("Discarding corrupted cache entry", entry=entry)
+        _remove_entry(entry)
+        return False
+    if os.path.abspath(output_file) != os.path.abspath(entry):
+        _place(entry, output_file)
+    os.utime(entry)  # mtime doubles as last-access time for LRU eviction
+    logger.info("Output cache hit", key=key, output=output_file)
+    return True
+
+
+def store(key: str, output_file: str) -> None:
+    """Add a freshly produced output to the cache and enforce the size limit."""
+    if not os.path.isfile(output_file):
+        return
+    entry = _entry_path(key, output_file)
+    try:
+        _place(output_file, entry)
+        with open(_meta_path(entry), "w") as f:
+            json.dump({"fingerprint": sample_fingerprint(entry),
+                       "source": os.path.abspath(output_file)}, f)
+    except OSError as e:
+        logger.warning("Could not store output in cache", output=output_file, error=str(e))
+        return
+    logger.debug("Output cached", key=key, output=output_file)
+    prune(max_cache_size())
+
+
+def _remove_entry(entry: str) -> None:
+    for path in (entry, _meta_path(entry)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _entries() -> List[Tuple[float, int, str]]:
+    """Return (last access, size, path) for every cached artifact."""
+    entries = []
+    with os.scandir(outputs_dir()) as it:
+        for de in it:
+            if de.name.endswith(".json") or de.name.endswith(".vtcache-tmp"):
+                continue
+            st = de.stat()
+            entries.append((st.st_mtime, st.st_size, de.path))
+    return entries
+
+
+def stats() -> dict:
+    entries = _entries()
+    return {
+        "directory": outputs_dir(),
+        "entries": len(entries),
+        "size": sum(size for _, size, _ in entries),
+        "max_size": max_cache_size(),
+    }
+
+
+def prune(max_size: int) -> Tuple[int, int]:
+    """Evict least-recently-used entries until the cache fits in max_size.
+
+    Returns (entries removed, bytes freed).
+    """
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for _, size, path in entries:
+        if total <= max_size:
+            break
+        _remove_entry(path)
+        total -= size
+        removed += 1
+        freed += size
+    if removed:
+        logger.info("Output cache pruned", removed=removed, freed=freed)
+    return removed, freed
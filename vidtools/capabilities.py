@@ -0,0 +1,314 @@
+"""What the installed ffmpeg can do, probed once and cached on disk.
+
+Capabilities lists the version, encoders, decoders, filters, muxers and
+hardware accelerations of the ffmpeg on PATH.  The listing takes a handful
+of ffmpeg runs, so it is stored under the vidtools cache keyed by the
+binary's resolved path, size and mtime; upgrading or swapping ffmpeg
+invalidates it automatically.
+
+check_command() uses it to validate a command before it runs: an encoder
+the build lacks is replaced by one that produces the same codec (libxvid
+-> mpeg4, libfdk_aac -> aac, ...), with its quality options translated
+(``-crf`` becomes ``-cq`` for NVENC, ``-qp`` for VAAPI, ...).  A missing
+filter, an encoder with no fallback, or a ``-crf`` the fallback cannot
+express is reported up front instead of after a failed or degraded encode.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .utils import cache_dir, logger
+
+# Encoder -> alternatives producing the same codec, in order of preference
+ENCODER_FALLBACKS: Dict[str, List[str]] = {
+    "libx264": ["libopenh264", "h264_videotoolbox", "h264_nvenc", "h264_qsv", "h264_vaapi"],
+    "libx265": ["hevc_videotoolbox", "hevc_nvenc", "hevc_qsv", "hevc_vaapi"],
+    "libvpx-vp9": ["vp9_qsv", "vp9_vaapi"],
+    "libaom-av1": ["libsvtav1", "librav1e", "av1_nvenc", "av1_qsv"],
+    "libsvtav1": ["libaom-av1", "librav1e", "av1_nvenc", "av1_qsv"],
+    "libxvid": ["mpeg4"],
+    "libfdk_aac": ["aac"],
+    "libopus": ["opus"],
+    "libvorbis": ["vorbis"],
+    "libmp3lame": ["libshine"],
+}
+
+_AUDIO_ENCODERS = {"libfdk_aac", "libopus", "libvorbis", "libmp3lame"}
+
+# ffmpeg's native encoders that refuse to run without -strict experimental
+EXPERIMENTAL_ENCODERS = {"opus", "vorbis"}
+
+# Encoder-private options of libx264/libx265/libvpx/libaom and what a fallback
+# understands instead: a replacement flag, or None to drop it (speed/tuning only).
+# A -crf the fallback can't express is reported, since quality would silently
+# revert to the fallback's default.
+_PRIVATE_OPTIONS = ("-crf", "-preset", "-tune", "-x264-params", "-x264opts", "-x265-params",
+                    "-aom-params", "-svtav1-params")
+_FALLBACK_OPTIONS = {
+    "_nvenc": {"-crf": "-cq", "-preset": "-preset"},
+    "_qsv": {"-crf": "-global_quality", "-preset": "-preset"},
+    "_vaapi": {"-crf": "-qp"},
+    "libsvtav1": {"-crf": "-crf"},
+    "libaom-av1": {"-crf": "-crf"},
+}
+# x264 preset names -> NVENC p1 (fastest) .. p7 (slowest), and the subset QSV accepts
+_NVENC_PRESETS = {"ultrafast": "p1", "superfast": "p1", "veryfast": "p2", "faster": "p3",
+                  "fast": "p3", "medium": "p4", "slow": "p5", "slower": "p6", "veryslow": "p7"}
+_QSV_PRESETS = {"ultrafast": "veryfast", "superfast": "veryfast"}
+
+# Option values that are not encoder names
+_NOT_ENCODERS = {"copy"}
+_ENCODER_FLAGS = ("-c", "-codec", "-c:v", "-c:a", "-c:s", "-vcodec", "-acodec", "-scodec")
+_FILTER_FLAGS = ("-vf", "-af", "-filter:v", "-filter:a", "-filter_complex", "-lavfi")
+
+_probe_lock = threading.Lock()
+_cached: Dict[Tuple, "Capabilities"] = {}
+
+
+class Capabilities:
+    """Feature sets of one ffmpeg binary."""
+
+    __slots__ = ("path", "version", "encoders", "decoders", "filters", "muxers", "hwaccels")
+
+    def __init__(self, path: str, version: str, encoders=(), decoders=(), filters=(), muxers=(),
+                 hwaccels=()):
+        self.path = path
+        self.version = version
+        self.encoders: FrozenSet[str] = frozenset(encoders)
+        self.decoders: FrozenSet[str] = frozenset(decoders)
+        self.filters: FrozenSet[str] = frozenset(filters)
+        self.muxers: FrozenSet[str] = frozenset(muxers)
+        self.hwaccels: FrozenSet[str] = frozenset(hwaccels)
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    @property
+    def version_info(self) -> Optional[Tuple[int, int]]:
+        """(major, minor) of a release build, None for git snapshots and unknown versions."""
+        match = re.match(r"n?(\d+)\.(\d+)", self.version)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+    def resolve_encoder(self, name: str) -> Optional[str]:
+        """name if this ffmpeg has it, else the first available fallback, else None."""
+        if name in self.encoders:
+            return name
+        for alternative in ENCODER_FALLBACKS.get(name, []):
+            if alternative in self.encoders:
+                return alternative
+        return None
+
+    def as_dict(self) -> Dict:
+        return {"path": self.path, "version": self.version,
+                **{key: sorted(getattr(self, key))
+                   for key in ("encoders", "decoders", "filters", "muxers", "hwaccels")}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Capabilities":
+        return cls(data["path"], data["version"], data["encoders"], data["decoders"],
+                   data["filters"], data["muxers"], data["hwaccels"])
+
+    def __repr__(self):
+        return (f"<Capabilities {self.version} encoders={len(self.encoders)} "
+                f"filters={len(self.filters)} hwaccels={sorted(self.hwaccels)}>")
+
+
+def _listing(binary: str, flag: str) -> List[str]:
+    result = subprocess.run([binary, "-hide_banner", flag], capture_output=True, text=True,
+                            check=True)
+    return result.stdout.splitlines()
+
+
+def _codec_names(lines: List[str]) -> List[str]:
+    # " V....D libx264   description", after the " ------" legend separator
+    names, started = [], False
+    for line in lines:
+        if line.strip().startswith("---"):
+            started = True
+        elif started and line.strip():
+            names.append(line.split()[1])
+    return names
+
+
+def _filter_names(lines: List[str]) -> List[str]:
+    matches = (re.match(r"^ [T.][S.][C.] (\S+)\s+\S*->\S*", line) for line in lines)
+    return [m.group(1) for m in matches if m]
+
+
+def _muxer_names(lines: List[str]) -> List[str]:
+    names, started = [], False
+    for line in lines:
+        if line.strip().startswith("--"):
+            started = True
+        elif started and line.strip():
+            flags, _, rest = line.strip().partition(" ")
+            if "E" in flags:
+                names.extend(rest.split()[0].split(","))
+    return names
+
+
+def _probe(binary: str) -> Capabilities:
+    version_line = _listing(binary, "-version")[0]
+    match = re.match(r"ffmpeg version (\S+)", version_line)
+    hwaccels = _listing(binary, "-hwaccels")
+    return Capabilities(
+        path=binary,
+        version=match.group(1) if match else version_line,
+        encoders=_codec_names(_listing(binary, "-encoders")),
+        decoders=_codec_names(_listing(binary, "-decoders")),
+        filters=_filter_names(_listing(binary, "-filters")),
+        muxers=_muxer_names(_listing(binary, "-muxers")),
+        hwaccels=[line.strip() for line in hwaccels[1:] if line.strip()],
+    )
+
+
+def _binary_key(binary: str) -> Tuple:
+    real = os.path.realpath(binary)
+    st = os.stat(real)
+    return real, st.st_size, st.st_mtime_ns
+
+
+def get_capabilities(binary: str = "ffmpeg", refresh: bool = False) -> Optional[Capabilities]:
+    """Capabilities of binary (looked up on PATH), or None if it is not installed."""
+    path = shutil.which(binary)
+    if path is None:
+        return None
+    key = _binary_key(path)
+    with _probe_lock:
+        if not refresh and key in _cached:
+            return _cached[key]
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        cache_file = os.path.join(cache_dir("capabilities"), f"{digest}.json")
+        caps = None
+        if not refresh:
+            try:
+                with open(cache_file, encoding="utf-8") as f:
+                    caps = Capabilities.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                caps = None
+        if caps is None:
+            try:
+                caps = _probe(path)
+            except (subprocess.CalledProcessError, OSError, IndexError) as e:
+                logger.warning("Could not list ffmpeg capabilities", binary=path, error=str(e))
+                return None
+            logger.info("Probed ffmpeg capabilities", binary=path, version=caps.version,
+                        encoders=len(caps.encoders), filters=len(caps.filters))
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(caps.as_dict(), f)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                logger.debug("Could not cache ffmpeg capabilities", error=str(e))
+        _cached[key] = caps
+        return caps
+
+
+def filter_names(graph: str) -> List[str]:
+    """Names of the filters used in a filtergraph string."""
+    # Drop quoted option values and [labels], then take what starts each filter
+    graph = re.sub(r"'[^']*'", "", graph)
+    graph = re.sub(r"\[[^\]]*\]", "", graph)
+    names = []
+    for part in re.split(r"[,;]", graph):
+        name = part.strip().split("=", 1)[0].split("@", 1)[0].strip()
+        if re.fullmatch(r"[A-Za-z][A-Za-z0-9_]*", name):
+            names.append(name)
+    return names
+
+
+def check_command(command: List[str], caps: Optional[Capabilities] = None
+                  ) -> Tuple[List[str], List[str]]:
+    """Validate an ffmpeg argv against the installed build.
+
+    Returns:
+        (command with unavailable encoders replaced by fallbacks,
+         problems that no fallback can fix)
+    """
+    caps = caps or get_capabilities(command[0])
+    if caps is None:
+        return command, []
+    command = list(command)
+    problems = []
+    last_input = max((i for i, arg in enumerate(command) if arg == "-i"), default=-1)
+    swapped = []
+    for i, arg in enumerate(command[:-1]):
+        value = command[i + 1]
+        is_codec = arg in _ENCODER_FLAGS or arg.startswith(("-c:", "-codec:"))
+        if is_codec and i < last_input:
+            # Before an -i it selects a decoder for that input
+            if value not in caps.decoders:
+                problems.append(f"decoder {value} is not available in this ffmpeg ({caps.version})")
+        elif is_codec and value not in _NOT_ENCODERS:
+            resolved = caps.resolve_encoder(value)
+            if resolved is None:
+                problems.append(f"encoder {value} is not available in this ffmpeg ({caps.version})")
+            elif resolved != value:
+                logger.warning("Encoder not available; using fallback", encoder=value,
+                               fallback=resolved)
+                command[i + 1] = resolved
+                swapped.append((value, resolved))
+        elif arg in _FILTER_FLAGS or arg.startswith(("-filter:", "-vf:", "-af:")):
+            for name in filter_names(value):
+                if not caps.has_filter(name):
+                    problems.append(f"filter {name} is not available in this ffmpeg "
+                                    f"({caps.version})")
+    # Options are adapted after the scan since this inserts and removes arguments
+    for encoder, fallback in swapped:
+        problems += _adapt_options(command, encoder, fallback, last_input)
+    return command, problems
+
+
+def _fallback_options(fallback: str) -> Dict[str, str]:
+    for pattern, options in _FALLBACK_OPTIONS.items():
+        if fallback == pattern or (pattern.startswith("_") and fallback.endswith(pattern)):
+            return options
+    return {}
+
+
+def _adapt_options(command: List[str], encoder: str, fallback: str, last_input: int) -> List[str]:
+    """Rewrite encoder-private options in place for fallback; returns the problems left."""
+    problems = []
+    if fallback in EXPERIMENTAL_ENCODERS and "-strict" not in command:
+        command[-1:-1] = ["-strict", "-2"]
+    if encoder in _AUDIO_ENCODERS:
+        return problems
+    options = _fallback_options(fallback)
+    i = last_input + 2
+    while i < len(command) - 1:
+        flag = command[i]
+        name = flag.split(":", 1)[0]
+        if name not in _PRIVATE_OPTIONS:
+            i += 1
+            continue
+        replacement = options.get(name)
+        value = command[i + 1]
+        if replacement is None and name == "-crf":
+            problems.append(f"encoder {encoder} is not available and its fallback {fallback} "
+                            "has no equivalent of -crf; set a bitrate with -b:v instead")
+            i += 2
+        elif replacement is None:
+            logger.warning("Option not supported by fallback encoder; dropped", option=flag,
+                           value=value, fallback=fallback)
+            del command[i:i + 2]
+        else:
+            if name == "-preset" and fallback.endswith("_nvenc"):
+                value = _NVENC_PRESETS.get(value, value)
+            elif name == "-preset" and fallback.endswith("_qsv"):
+                value = _QSV_PRESETS.get(value, value)
+            command[i:i + 2] = [replacement + flag[len(name):], value]
+            i += 2
+    if options.get("-crf") == "-cq" and "-cq" in command and "-b:v" not in command:
+        # NVENC only targets the -cq quality when it has no bitrate to aim for
+        command[-1:-1] = ["-b:v", "0"]
+    return problems
@@ -0,0 +1,100 @@
+"""Chunked parallel encoding for long single-file conversions.
+
+A single libx264/libvpx-vp9 process rarely saturates a many-core host.
+encode_chunked() splits the requested range at source keyframes (encoders
+put keyframes on scene cuts, so these are natural split points), encodes
+the video of every chunk as its own ffmpeg process, joins the chunks with
+the concat demuxer and stream copy, and encodes the audio once over the
+whole range while muxing.  Every chunk uses the same encoder arguments, so
+constant-quality modes (CRF, VP9 ``-b:v 0``) produce the same quality as a
+single pass; with a target bitrate each chunk aims at that average.
+"""
+
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+from .segments import write_concat_list
+from .utils import logger, parse_time, run_ffmpeg_command
+
+
+def split_points(keyframes: List[float], start: float, end: float, chunks: int) -> List[float]:
+    """Pick up to chunks-1 keyframes inside (start, end) closest to even splits."""
+    inside = [k for k in keyframes if start + 1e-3 < k < end - 1e-3]
+    points: List[float] = []
+    for i in range(1, chunks):
+        if not inside:
+            break
+        target = start + (end - start) * i / chunks
+        best = min(inside, key=lambda k: abs(k - target))
+        if best not in points:
+            points.append(best)
+    return sorted(points)
+
+
+def encode_chunked(input_file: str, output_file: str, video_args: List[str], audio_args: List[str],
+                   chunks: int, start_time=None, end_time=None, duration=None,
+                   max_workers: Optional[int] = None) -> None:
+    """Encode input_file into output_file as keyframe-aligned video chunks in parallel.
+
+    Args:
+        input_file: Source video
+        output_file: Destination file
+        video_args: Video encoder arguments applied identically to every chunk
+        audio_args: Audio encoder arguments used once for the final mux
+        chunks: Number of chunks (0 means one per CPU)
+        start_time: Start timestamp (HH:MM:SS or seconds)
+        end_time: End timestamp (absolute)
+        duration: Length of the range (alternative to end_time)
+        max_workers: Concurrent encoders (default: one per chunk, capped at the CPU count)
+    """
+    from .batch import resolve_jobs, run_commands
+    from .probe import probe
+    from .seek import keyframe_index, plan_seek
+
+    cpus = os.cpu_count() or 1
+    chunks = resolve_jobs(chunks)
+    start = parse_time(start_time) or 0.0
+    if duration is not None:
+        end = start + parse_time(duration)
+    elif end_time is not None:
+        end = parse_time(end_time)
+    else:
+        end = probe(input_file).duration
+
+    points = split_points(keyframe_index(input_file), start, end, chunks)
+    bounds = [start, *points, end]
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+    workers = max_workers or min(len(ranges), cpus)
+    logger.info("Chunked encode plan", input=input_file, chunks=len(ranges), workers=workers,
+                boundaries=points)
+    print(f"Encoding {len(ranges)} chunks with {workers} parallel encoders")
+
+    with tempfile.TemporaryDirectory(prefix="vidtools-chunks-") as tmp:
+        pieces = [os.path.join(tmp, f"chunk{i:04d}.mkv") for i in range(len(ranges))]
+        commands = []
+        for (chunk_start, chunk_end), piece in zip(ranges, pieces):
+            seek = plan_seek(input_file, chunk_start, duration=chunk_end - chunk_start)
+            commands.append([
+                "ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args,
+                "-map", "0:v:0", "-an", "-sn", "-dn", *video_args, "-f", "matroska", piece,
+            ])
+        failed = run_commands(commands, "Encoding", unit="chunk", max_workers=workers)
+        if failed:
+            print(f"Error: {len(failed)} of {len(ranges)} chunks failed to encode")
+            sys.exit(1)
+
+        list_path = os.path.join(tmp, "chunks.txt")
+        write_concat_list(pieces, list_path)
+        # Audio is continuous, so it is encoded in one pass for exact A/V length
+        audio_seek = plan_seek(input_file, start, duration=end - start, accurate=False)
+        command = [
+            "ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path,
+            *audio_seek.input_args, "-i", input_file, *audio_seek.output_args,
+            "-map", "0:v:0", "-map", "1:a?", "-c:v", "copy", *audio_args,
+        ]
+        if output_file.lower().endswith(".mp4"):
+            command.extend(["-movflags", "+faststart"])
+        command.append(output_file)
+        run_ffmpeg_command(command)
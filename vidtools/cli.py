@@ -1,22 +1,120 @@
 import argparse
 import sys
-from .utils import is_valid_file, check_ffmpeg_installed  # helper for path checks
-from . import main as main_module  # command handlers live here
+from .utils import is_valid_file, check_ffmpeg_installed, time_arg  # helper for path checks
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-def setup_argparse() -> argparse.ArgumentParser:
-    """Return the top‑level argument parser with all sub‑commands registered."""
+class _LazyHandlers:
+    """Stands in for vidtools.main: ``main_module.x_handler`` is a stub that
+    imports main only when the chosen command actually runs."""
+
+    def __getattr__(self, name):
+        def handler(args):
+            from . import main
+
+            return getattr(main, name)(args)
+
+        handler.__name__ = name
+        return handler
+
+
+main_module = _LazyHandlers()  # command handlers live in main.py
+
+
+class _Skipped:
+    """Absorbs every call made while defining a sub‑command that isn't needed."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+class _CommandSubparsers:
+    """Wraps the sub‑parsers action so only the requested command is built.
+
+    argparse costs a little for every sub‑parser and argument; when the
+    command is known up front there is no need to build the other ~20.
+    """
+
+    def __init__(self, action, only=None):
+        self._action = action
+        self._only = only
+        self.names = []
+
+    def add_parser(self, name, **kwargs):
+        self.names.append(name)
+        if self._only is not None and name != self._only:
+            return _Skipped()
+        return self._action.add_parser(name, **kwargs)
+
+
+class _AppendStep(argparse.Action):
+    """Collects chain steps in command-line order as (kind, value) pairs."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        steps = list(getattr(namespace, self.dest, None) or [])
+        steps.append((option_string.lstrip("-"), values))
+        setattr(namespace, self.dest, steps)
+
+
+def _ladder_heights(value):
+    """argparse ``type=`` for --ladder: ``1080,720p,480`` -> [1080, 720, 480]."""
+    heights = []
+    for part in value.split(","):
+        text = part.strip().rstrip("pP")
+        if not text.isdigit() or int(text) <= 0:
+            raise argparse.ArgumentTypeError(
+                f"invalid height {part.strip()!r} (use e.g. 1080,720,480)")
+        heights.append(int(text))
+    return heights
+
+
+# Top-level options that take a value (needed to find the command in argv)
+_VALUE_OPTIONS = {"--cpu-budget", "--nice", "--ionice", "--memory-limit"}
+
+
+def _command_in(argv):
+    """First positional argument of argv, i.e. the sub‑command name, if any."""
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg.startswith("-"):
+            skip = arg in _VALUE_OPTIONS
+        else:
+            return arg
+    return None
+
+
+def setup_argparse(only: str | None = None) -> argparse.ArgumentParser:
+    """Return the top‑level argument parser with all sub‑commands registered.
+
+    With ``only``, just that sub‑command is built (the parser can then only
+    parse that command); the full parser is needed for help and errors.
+    """
     parser = argparse.ArgumentParser(
         description="vidtools – FFmpeg helper CLI",
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
-    subparsers = parser.add_subparsers(
+    limits = parser.add_argument_group("resource limits (apply to every ffmpeg started)")
+    limits.add_argument(
+        "--cpu-budget", type=int, metavar="N",
+        help="Threads shared across concurrent ffmpeg jobs (default: CPU count)",
+    )
+    limits.add_argument("--nice", type=int, metavar="N", help="Run ffmpeg with this niceness")
+    limits.add_argument(
+        "--ionice", metavar="CLASS", help="I/O priority: idle or best-effort[:0-7]"
+    )
+    limits.add_argument(
+        "--memory-limit", metavar="SIZE", help="Address-space cap per ffmpeg, e.g. 4G"
+    )
+
+    subparsers = _CommandSubparsers(parser.add_subparsers(
         title="commands",
         dest="command",
         help="Available operations",
-    )
+    ), only)
+    parser.command_names = subparsers.names
 
     # ---------------------------------------------------------------- resize --
     resize_parser = subparsers.add_parser(
@@ -50,6 +148,9 @@ def setup_argparse() -> argparse.ArgumentParser:
         ],
         help="FFmpeg scale flags (default: lanczos)",
     )
+    resize_parser.add_argument(
+        "--cache", action="store_true", help="Reuse a cached output for identical input + command"
+    )
     resize_parser.set_defaults(func=main_module.resize_video_handler)
 
     # ---------------------------------------------------------------- sanitize
@@ -83,6 +184,10 @@ def setup_argparse() -> argparse.ArgumentParser:
     sanitize.add_argument(
         "--crf", type=int, default=22, help="x264 CRF quality (default 22)"
     )
+    sanitize.add_argument(
+        "--preset", default="slow",
+        help="x264 preset (default slow); faster presets need less CPU per job"
+    )
     sanitize.add_argument(
         "--aac",
         action="store_true",
@@ -167,16 +272,26 @@ Examples:
   # Ultra-fast seeking (seeks before input)
   %(prog)s input.mp4 output.mp4 --start 40 --end 66.5 --fast-seek
 
+  # Frame-accurate but fast: re-encode only the GOPs at each end
+  %(prog)s input.mp4 output.mp4 --start 40 --end 1:20:00 --smart
+
+  # Many clips from one pass over the source (OUTPUT is a directory)
+  %(prog)s match.mp4 highlights/ --edl highlights.csv
+
+Edit lists are CSV rows of start,end[,name] (optional header with
+start/end/duration/name columns) or a JSON list of such objects.
+
 Time formats: HH:MM:SS.mmm, seconds (66.5), or MM:SS"""
     )
     cut.add_argument("input", type=lambda x: is_valid_file(cut, x), help="Input video")
-    cut.add_argument("output", help="Output video")
+    cut.add_argument("output", help="Output video (output directory with --edl)")
 
     # Time specification group
     cut.add_argument(
         "-ss", "--start", "--from",
         dest="start_time",
-        help="Start time (e.g., 00:00:40, 40, 1:30)"
+        type=time_arg,
+        help="Start time (e.g., 00:00:40, 40, 1:30, 500ms)"
     )
 
     # End time specification (mutually exclusive)
@@ -184,11 +299,13 @@ Time formats: HH:MM:SS.mmm, seconds (66.5), or MM:SS"""
     end_group.add_argument(
         "-to", "--end", "--to",
         dest="end_time",
+        type=time_arg,
         help="End time (absolute timestamp)"
     )
     end_group.add_argument(
         "-t", "--duration", "--length",
         dest="duration",
+        type=time_arg,
         help="Duration from start time"
     )
 
@@ -204,10 +321,15 @@ Time formats: HH:MM:SS.mmm, seconds (66.5), or MM:SS"""
         action="store_true",
         help="Frame-accurate cut (re-encodes, slower but precise)"
     )
+    cut.add_argument(
+        "--smart",
+        action="store_true",
+        help="Frame-accurate cut that re-encodes only the edge GOPs (H.264/HEVC)"
+    )
     cut.add_argument(
         "--fast-seek",
         action="store_true",
-        help="Seek before input (faster but may be less accurate)"
+        help="Only seek the input, skipping the fine output seek (faster, may be less accurate)"
     )
     cut.add_argument(
         "--fix-sync",
@@ -227,6 +349,17 @@ Time formats: HH:MM:SS.mmm, seconds (66.5), or MM:SS"""
         type=int,
         help="CRF quality for re-encoding (0-51, lower is better)"
     )
+    cut.add_argument(
+        "--edl",
+        type=lambda x: is_valid_file(cut, x),
+        help="Edit list (CSV/JSON of start,end,name) to cut many clips in one pass"
+    )
+    cut.add_argument(
+        "--group-gap",
+        type=float,
+        default=60.0,
+        help="With --edl, clips closer than this many seconds share one ffmpeg pass (default: 60)"
+    )
     cut.set_defaults(func=main_module.cut_video_handler)
 
     # ---------------------------------------------------------------- convert -
@@ -247,10 +380,19 @@ Examples:
   %(prog)s input.mp4 output.mp3
 
   # Convert with specific codec
-  %(prog)s input.mp4 output.webm --vcodec libvpx-vp9 --acodec libopus"""
+  %(prog)s input.mp4 output.webm --vcodec libvpx-vp9 --acodec libopus
+
+  # Long file on a many-core box: encode 16 keyframe-aligned chunks at once
+  %(prog)s movie.mkv movie.webm --chunked 16
+
+  # Encoding ladder from one decode: out_1080p.mp4, out_720p.mp4, out_480p.mp4
+  %(prog)s input.mov out.mp4 --ladder 1080,720,480
+
+  # Several formats from one decode
+  %(prog)s input.mov out.mp4 out.webm"""
     )
     convert.add_argument("input", type=lambda x: is_valid_file(convert, x), help="Input file")
-    convert.add_argument("output", help="Output file")
+    convert.add_argument("output", nargs="+", help="Output file(s); several outputs share one decode")
     convert.add_argument(
         "-f", "--format",
         help="Output format (auto-detected from extension if not specified)"
@@ -274,9 +416,24 @@ Examples:
         help="Copy streams without re-encoding where possible"
     )
     # Time range options
-    convert.add_argument("--start", dest="start_time", help="Start time")
-    convert.add_argument("--end", dest="end_time", help="End time")
-    convert.add_argument("--duration", help="Duration")
+    convert.add_argument("--start", dest="start_time", type=time_arg, help="Start time")
+    convert.add_argument("--end", dest="end_time", type=time_arg, help="End time")
+    convert.add_argument("--duration", type=time_arg, help="Duration")
+    convert.add_argument(
+        "--cache", action="store_true", help="Reuse a cached output for identical input + command"
+    )
+    convert.add_argument(
+        "--chunked", type=int, metavar="N",
+        help="Split the video at keyframes and encode N chunks in parallel (0 = one per CPU)"
+    )
+    convert.add_argument(
+        "--ladder", metavar="HEIGHTS", type=_ladder_heights,
+        help="Comma-separated output heights (e.g. 1080,720,480) encoded from one decode"
+    )
+    convert.add_argument(
+        "--no-auto-copy", action="store_true",
+        help="Always re-encode, even when the source codecs already fit the target"
+    )
     convert.set_defaults(func=main_module.convert_format_handler)
 
     # ---------------------------------------------------------------- extract-audio
@@ -292,9 +449,9 @@ Examples:
         default="copy",
         help="Audio format (copy, mp3, aac, flac, etc.) Default: copy"
     )
-    extract_audio.add_argument("--start", dest="start_time", help="Start time")
-    extract_audio.add_argument("--end", dest="end_time", help="End time")
-    extract_audio.add_argument("--duration", help="Duration")
+    extract_audio.add_argument("--start", dest="start_time", type=time_arg, help="Start time")
+    extract_audio.add_argument("--end", dest="end_time", type=time_arg, help="End time")
+    extract_audio.add_argument("--duration", type=time_arg, help="Duration")
     extract_audio.set_defaults(func=main_module.extract_audio_handler)
 
     # ---------------------------------------------------------------- extract-frames
@@ -319,9 +476,9 @@ Examples:
         default="image2",
         help="Output format. Default: image2"
     )
-    extract_frames.add_argument("--start", dest="start_time", help="Start time")
-    extract_frames.add_argument("--end", dest="end_time", help="End time")
-    extract_frames.add_argument("--duration", help="Duration")
+    extract_frames.add_argument("--start", dest="start_time", type=time_arg, help="Start time")
+    extract_frames.add_argument("--end", dest="end_time", type=time_arg, help="End time")
+    extract_frames.add_argument("--duration", type=time_arg, help="Duration")
     extract_frames.set_defaults(func=main_module.extract_frames_handler)
 
     # ---------------------------------------------------------------- concat ---
@@ -331,13 +488,27 @@ Examples:
         formatter_class=argparse.RawTextHelpFormatter,
         description="""Concatenate multiple videos into one.
 
-Note: For stream copy mode, all inputs must have the same codec parameters."""
+Note: For stream copy mode, all inputs must have the same codec parameters.
+Use --normalize for mixed sources: only the inputs that differ from the
+most common codec/resolution/frame rate/audio layout are re-encoded.
+
+Thousands of inputs: list them in a file with --from-file. More than
+--fanout inputs are joined in parallel stages through intermediate files.
+
+Examples:
+  %(prog)s clip*.mp4 -o reel.mp4 --normalize -j 4
+  %(prog)s --from-file clips.txt -o archive.mkv --fanout 200"""
     )
     concat.add_argument(
         "inputs",
-        nargs="+",
+        nargs="*",
         help="Input video files"
     )
+    concat.add_argument(
+        "--from-file",
+        type=lambda x: is_valid_file(concat, x),
+        help="Read input paths from a text file, one per line"
+    )
     concat.add_argument("-o", "--output", required=True, help="Output file")
     concat.add_argument(
         "--copy",
@@ -350,8 +521,66 @@ Note: For stream copy mode, all inputs must have the same codec parameters."""
         action="store_true",
         help="Re-encode videos (slower, handles different codecs)"
     )
+    concat.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Re-encode only inputs that differ from the majority profile, then stream copy"
+    )
+    concat.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Parallel normalizing encodes / concat groups (default: one per CPU)"
+    )
+    concat.add_argument(
+        "--fanout",
+        type=int,
+        help="Maximum inputs per ffmpeg run before joining in parallel stages (default: 256)"
+    )
     concat.set_defaults(func=main_module.concatenate_videos_handler)
 
+    # ---------------------------------------------------------------- gif -----
+    gif = subparsers.add_parser(
+        "gif",
+        help="Make a GIF with a cached palette (tunable fps, size, dithering)",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""Render a GIF in two passes: palette first (cached), then the GIF.
+
+Re-rendering the same range at the same size reuses the palette, so trying
+another --dither or --loop only costs the second pass.
+
+Examples:
+  %(prog)s clip.mp4 clip.gif --start 12 --duration 4 --fps 15 --width 480
+  %(prog)s talk.mp4 talk.gif --stats-mode diff --dither bayer --bayer-scale 3
+  %(prog)s long.mp4 long.gif --segments 0    # one palette slice per CPU"""
+    )
+    gif.add_argument("input", type=lambda x: is_valid_file(gif, x), help="Input video")
+    gif.add_argument("output", help="Output .gif")
+    gif.add_argument("--fps", type=float, default=10, help="Frame rate (default: 10)")
+    gif.add_argument("--width", type=int, default=320,
+                     help="Width in pixels, height follows (default: 320, 0 = source size)")
+    gif.add_argument("--dither", default="sierra2_4a",
+                     choices=["sierra2_4a", "sierra2", "floyd_steinberg", "bayer", "none"],
+                     help="Dithering (default: sierra2_4a)")
+    gif.add_argument("--bayer-scale", type=int, choices=range(6), metavar="0-5",
+                     help="Bayer pattern scale with --dither bayer (lower = stronger pattern)")
+    gif.add_argument("--stats-mode", default="full", choices=["full", "diff", "single"],
+                     help="Palette statistics: whole frames, only changes, or a palette per frame")
+    gif.add_argument("--colors", type=int, default=256, help="Palette size, 2-256 (default: 256)")
+    gif.add_argument("--loop", type=int, default=0,
+                     help="Loop count (default: 0 = forever, -1 = play once)")
+    gif.add_argument("--start", dest="start_time", type=time_arg, help="Start time")
+    gif_end = gif.add_mutually_exclusive_group()
+    gif_end.add_argument("--end", dest="end_time", type=time_arg, help="End time")
+    gif_end.add_argument("--duration", type=time_arg, help="Duration")
+    gif.add_argument("--segments", type=int, metavar="N",
+                     help="Build the palette from N slices in parallel (0 = one per CPU)")
+    gif.add_argument("--no-palette-cache", action="store_true",
+                     help="Always regenerate the palette and don't keep it")
+    gif.add_argument(
+        "--cache", action="store_true", help="Reuse a cached output for identical input + command"
+    )
+    gif.set_defaults(func=main_module.make_gif_handler)
+
     # ---------------------------------------------------------------- crop ----
     crop = subparsers.add_parser(
         "crop",
@@ -364,6 +593,12 @@ Note: For stream copy mode, all inputs must have the same codec parameters."""
     crop.add_argument("-H", "--height", type=int, required=True, help="Crop height")
     crop.add_argument("-x", type=int, default=0, help="X offset (default: 0)")
     crop.add_argument("-y", type=int, default=0, help="Y offset (default: 0)")
+    crop.add_argument(
+        "--lossless",
+        action="store_true",
+        help="H.264/HEVC: rewrite the stream's crop window instead of re-encoding\n"
+             "(falls back to a re-encode when the crop can't be expressed that way)"
+    )
     crop.set_defaults(func=main_module.crop_video_handler)
 
     # ---------------------------------------------------------------- rotate --
@@ -380,6 +615,11 @@ Note: For stream copy mode, all inputs must have the same codec parameters."""
         choices=["90", "180", "270", "-90"],
         help="Rotation angle in degrees"
     )
+    rotate.add_argument(
+        "--lossless",
+        action="store_true",
+        help="Copy the streams and only set the display rotation (mp4/mov output)"
+    )
     rotate.set_defaults(func=main_module.rotate_video_handler)
 
     # ---------------------------------------------------------------- subtitles
@@ -398,17 +638,81 @@ Note: For stream copy mode, all inputs must have the same codec parameters."""
     )
     subtitles.set_defaults(func=main_module.add_subtitles_handler)
 
+    # ---------------------------------------------------------------- chain ---
+    chain = subparsers.add_parser(
+        "chain",
+        help="Apply several edits in one encode (crop, rotate, resize, subtitles, trim)",
+        description=(
+            "Steps run in the order given and are fused into a single filter chain:\n"
+            "  vt chain in.mp4 out.mp4 --start 10 --duration 30 --crop 1920:960 \\\n"
+            "      --rotate 90 --resize x720 --subtitles subs.srt"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    chain.add_argument("input", type=lambda x: is_valid_file(chain, x))
+    chain.add_argument("output")
+    chain.add_argument("--crop", dest="steps", action=_AppendStep, metavar="W:H[:X:Y]",
+                       help="Crop to W x H at X,Y (numbers or ffmpeg expressions)")
+    chain.add_argument("--rotate", dest="steps", action=_AppendStep, metavar="DEGREES",
+                       help="Rotate clockwise by 90, 180, 270 or -90 degrees")
+    chain.add_argument("--resize", dest="steps", action=_AppendStep, metavar="SIZE",
+                       help="Scale factor (0.5) or WxH, Wx, xH (missing side keeps aspect)")
+    chain.add_argument("--subtitles", dest="steps", action=_AppendStep, metavar="FILE",
+                       help="Burn in a subtitle file (.srt, .ass, etc.)")
+    chain.add_argument("-s", "--start", dest="start_time", type=time_arg,
+                       help="Start time (HH:MM:SS or seconds)")
+    trim_end = chain.add_mutually_exclusive_group()
+    trim_end.add_argument("-e", "--end", dest="end_time", type=time_arg,
+                          help="End time (HH:MM:SS or seconds)")
+    trim_end.add_argument("-d", "--duration", type=time_arg, help="Duration (HH:MM:SS or seconds)")
+    chain.add_argument("--vcodec", help="Video codec (default: libx264 for mp4)")
+    chain.add_argument("--acodec", help="Audio codec (default: aac for mp4)")
+    chain.add_argument("--crf", type=int, help="Quality (CRF for x264/x265/vp9)")
+    chain.add_argument("--preset", help="Encoder preset (e.g. medium, slow)")
+    chain.set_defaults(func=main_module.chain_video_handler, steps=[])
+
     # ---------------------------------------------------------------- info ----
     info = subparsers.add_parser(
         "info",
         help="Show video information",
         formatter_class=argparse.RawTextHelpFormatter,
+        description="""Show ffprobe information for one file, or inventory many.
+
+Examples:
+  # Human-readable info for one file
+  %(prog)s input.mp4
+
+  # Inventory a whole archive as CSV, 16 probes at a time
+  %(prog)s /archive --format csv --jobs 16 > inventory.csv
+
+  # Stream full ffprobe data as JSON lines
+  %(prog)s "footage/**/*.mov" --format jsonl"""
+    )
+    info.add_argument(
+        "inputs",
+        nargs="+",
+        help="Files, glob patterns or directories (walked recursively)"
     )
-    info.add_argument("input", type=lambda x: is_valid_file(info, x))
     info.add_argument(
         "-j", "--json",
         action="store_true",
-        help="Output in JSON format"
+        help="Output in JSON format (JSON lines when several files are given)"
+    )
+    info.add_argument(
+        "--format",
+        choices=["text", "json", "jsonl", "csv"],
+        help="Output format (default: text, or json with --json)"
+    )
+    info.add_argument(
+        "--jobs",
+        type=int,
+        default=8,
+        help="Number of files to probe concurrently (default: 8)"
+    )
+    info.add_argument(
+        "--all-files",
+        action="store_true",
+        help="Probe every file found in directories, not just media extensions"
     )
     info.set_defaults(func=main_module.get_video_info_handler)
 
@@ -430,21 +734,50 @@ Examples:
   %(prog)s extract-audio "*.mp4" --format mp3
   
   # Cut same segment from multiple videos
-  %(prog)s cut "*.mp4" --start 10 --duration 30"""
+  %(prog)s cut "*.mp4" --start 10 --duration 30
+
+  # Convert using 8 concurrent ffmpeg processes (0 = one per CPU)
+  %(prog)s convert "*.mkv" --format mp4 -j 8
+
+  # Pick up an interrupted run where it left off
+  %(prog)s convert "*.mkv" --format mp4 -o out/ --resume"""
     )
     batch_sub = batch.add_subparsers(dest="batch_operation", help="Operation to perform")
-    
+
+    # Options shared by every batch operation
+    batch_common = argparse.ArgumentParser(add_help=False)
+    batch_common.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of files to process concurrently (0 = one per CPU, default: 1)"
+    )
+    batch_common.add_argument("--overwrite", action="store_true", help="Overwrite existing files")
+    batch_common.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip files the job journal records as done; redo failed or interrupted ones"
+    )
+    batch_common.add_argument(
+        "--journal",
+        metavar="PATH",
+        help="Job journal file (default: .vidtools-journal.jsonl next to the outputs)"
+    )
+
     # Batch convert
-    batch_convert = batch_sub.add_parser("convert", help="Batch convert files")
+    batch_convert = batch_sub.add_parser("convert", help="Batch convert files", parents=[batch_common])
     batch_convert.add_argument("pattern", help="File pattern (e.g., '*.webp')")
     batch_convert.add_argument("-f", "--format", help="Output format (auto-detect from extension if not set)")
     batch_convert.add_argument("-o", "--output-dir", help="Output directory (default: same as source)")
     batch_convert.add_argument("--suffix", help="Add suffix to output filename (e.g., '_converted')")
-    batch_convert.add_argument("--overwrite", action="store_true", help="Overwrite existing files")
+    batch_convert.add_argument(
+        "--no-auto-copy", action="store_true",
+        help="Always re-encode, even when the source codecs already fit the target"
+    )
     batch_convert.set_defaults(func=main_module.batch_convert_handler)
     
     # Batch resize
-    batch_resize = batch_sub.add_parser("resize", help="Batch resize videos")
+    batch_resize = batch_sub.add_parser("resize", help="Batch resize videos", parents=[batch_common])
     batch_resize.add_argument("pattern", help="File pattern")
     batch_resize.add_argument("-s", "--scale", type=float, help="Scale factor (e.g., 0.5)")
     batch_resize.add_argument("-W", "--width", type=int, help="Target width")
@@ -454,22 +787,42 @@ Examples:
     batch_resize.set_defaults(func=main_module.batch_resize_handler)
     
     # Batch cut
-    batch_cut = batch_sub.add_parser("cut", help="Batch cut videos")
+    batch_cut = batch_sub.add_parser("cut", help="Batch cut videos", parents=[batch_common])
     batch_cut.add_argument("pattern", help="File pattern")
-    batch_cut.add_argument("--start", help="Start time")
-    batch_cut.add_argument("--end", help="End time")
-    batch_cut.add_argument("--duration", help="Duration")
+    batch_cut.add_argument("--start", type=time_arg, help="Start time")
+    batch_cut.add_argument("--end", type=time_arg, help="End time")
+    batch_cut.add_argument("--duration", type=time_arg, help="Duration")
     batch_cut.add_argument("-o", "--output-dir", help="Output directory")
     batch_cut.add_argument("--suffix", default="_cut", help="Add suffix to filename")
     batch_cut.set_defaults(func=main_module.batch_cut_handler)
     
     # Batch extract audio
-    batch_audio = batch_sub.add_parser("extract-audio", help="Batch extract audio")
+    batch_audio = batch_sub.add_parser("extract-audio", help="Batch extract audio", parents=[batch_common])
     batch_audio.add_argument("pattern", help="File pattern")
     batch_audio.add_argument("-f", "--format", default="mp3", help="Audio format (default: mp3)")
     batch_audio.add_argument("-o", "--output-dir", help="Output directory")
     batch_audio.set_defaults(func=main_module.batch_extract_audio_handler)
 
+    # ---------------------------------------------------------------- cache ---
+    cache_parser = subparsers.add_parser(
+        "cache",
+        help="Inspect or prune the output cache",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="""Inspect or prune the content-addressed output cache.
+
+Enable caching per command with --cache, or for every convert/resize/preset
+run with VIDTOOLS_CACHE=1. The size limit defaults to 10G and can be set with
+VIDTOOLS_CACHE_MAX_SIZE; the location with VIDTOOLS_CACHE_DIR."""
+    )
+    cache_sub = cache_parser.add_subparsers(dest="cache_action")
+    cache_stats = cache_sub.add_parser("stats", help="Show cache size and entry count")
+    cache_stats.set_defaults(func=main_module.cache_stats_handler)
+    cache_prune = cache_sub.add_parser("prune", help="Evict least recently used outputs")
+    prune_grp = cache_prune.add_mutually_exclusive_group()
+    prune_grp.add_argument("--max-size", help="Shrink the cache to this size (e.g. 2G)")
+    prune_grp.add_argument("--all", action="store_true", help="Remove every cached output")
+    cache_prune.set_defaults(func=main_module.cache_prune_handler)
+
     # ---------------------------------------------------------------- presets -
     preset_parser = subparsers.add_parser(
         "preset",
@@ -480,8 +833,14 @@ Examples:
     # Apply preset
     apply = preset_sub.add_parser("apply", help="Apply a preset")
     apply.add_argument("input", type=lambda x: is_valid_file(apply, x))
-    apply.add_argument("output")
-    apply.add_argument("name", help="Preset name")
+    apply.add_argument("output", help="Output file (output directory with several presets)")
+    apply.add_argument(
+        "name", nargs="+",
+        help="Preset name(s); several presets are rendered from one decode as <input>_<preset>.<ext>"
+    )
+    apply.add_argument(
+        "--cache", action="store_true", help="Reuse a cached output for identical input + command"
+    )
     apply.set_defaults(func=main_module.apply_preset_handler)
 
     # List presets
@@ -506,21 +865,56 @@ Examples:
     return parser
 
 
-# singleton parser -----------------------------------------------------------
+# singleton parser (the full one, used for help and errors) -----------------
 _parser: argparse.ArgumentParser | None = None
 
 
+def _check_combinations(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Reject option combinations a handler would otherwise silently ignore."""
+    if args.command == "convert" and (args.ladder or len(args.output) > 1):
+        ignored = [flag for flag, used in (("--copy", args.copy), ("--cache", args.cache),
+                                           ("--chunked", args.chunked is not None),
+                                           ("--no-auto-copy", args.no_auto_copy)) if used]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be combined with --ladder or "
+                         "several outputs")
+
+
 def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
     global _parser
-    if _parser is None:
-        _parser = setup_argparse()
-    return _parser.parse_args(argv)
+    if argv is None:
+        argv = sys.argv[1:]
+    command = _command_in(argv)
+    parser = None
+    if command and "-h" not in argv and "--help" not in argv:
+        # Build just this command's parser; fall back to the full one if the
+        # name is unknown so argparse can list the valid choices.
+        parser = setup_argparse(only=command)
+        if command not in parser.command_names:
+            parser = None
+    if parser is None:
+        if _parser is None:
+            _parser = setup_argparse()
+        parser = _parser
+    args = parser.parse_args(argv)
+    _check_combinations(parser, args)
+    return args
 
 
 def handle_command(args: argparse.Namespace) -> None:
+    global _parser
+    if any(getattr(args, name, None) is not None
+           for name in ("cpu_budget", "nice", "ionice", "memory_limit")):
+        from .cache import parse_size
+        from .governor import configure
+
+        configure(cpu_budget=args.cpu_budget, nice=args.nice, ionice=args.ionice,
+                  memory_limit=parse_size(args.memory_limit) if args.memory_limit else None)
     if args.command:
         args.func(args)
     else:
+        if _parser is None:
+            _parser = setup_argparse()
         _parser.print_help()
 
 
@@ -0,0 +1,343 @@
+"""Compatibility-aware concatenation that scales to thousands of inputs.
+
+The concat demuxer can only stream-copy inputs that share codec
+parameters.  concat_normalized() probes every input in parallel, takes the
+most common stream profile as the target, re-encodes only the inputs that
+differ from it (also in parallel) and then joins everything with stream
+copy, so a reel with a handful of odd clips costs a handful of encodes.
+
+For very large input sets, write_ffconcat() streams an ``ffconcat`` list
+with every file's duration taken from the probe cache, so each file's
+place on the output timeline is fixed before ffmpeg reaches it.
+concat_copy() joins inputs in a tree: groups of ``fanout`` files are
+concatenated in parallel into intermediates, which are then concatenated
+in turn.
+"""
+
+import os
+import sys
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .segments import PIECE_EXT, PIECE_FORMAT, matching_video_args
+from .utils import format_time, logger, run_ffmpeg_command
+
+# Inputs per ffmpeg invocation before concat_copy() switches to a tree
+DEFAULT_FANOUT = 256
+
+# Source audio codec -> encoder that produces it
+AUDIO_ENCODERS = {
+    "aac": "aac",
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+    "vorbis": "libvorbis",
+    "ac3": "ac3",
+    "flac": "flac",
+}
+
+# Audio codecs that MPEG-TS pieces can carry (see concat_normalized)
+PIECE_AUDIO_CODECS = ("aac", "mp3", "opus", "ac3")
+
+
+def stream_profile(info) -> Tuple:
+    """Everything that must match for two files to be stream-copy concatenated."""
+    video, audio = info.video, info.audio
+    video_key = None
+    if video:
+        fps = round(video.frame_rate, 3) if video.frame_rate else None
+        video_key = (video.codec_name, video.profile, video.width, video.height,
+                     video.pix_fmt, fps, video.time_base)
+    audio_key = None
+    if audio:
+        audio_key = (audio.codec_name, audio.sample_rate, audio.channels, audio.channel_layout)
+    return video_key, audio_key
+
+
+def describe_profile(profile: Tuple) -> str:
+    video, audio = profile
+    parts = []
+    if video:
+        codec, _, width, height, pix_fmt, fps, _ = video
+        parts.append(f"{codec} {width}x{height} {pix_fmt} {fps}fps")
+    if audio:
+        codec, rate, channels, _ = audio
+        parts.append(f"{codec} {rate}Hz {channels}ch")
+    return ", ".join(parts) or "no streams"
+
+
+def probe_all(paths: List[str], max_workers: int = 8):
+    """Probe paths concurrently (cached probes return immediately); keeps input order."""
+    from .batch import imap_bounded
+    from .probe import probe
+
+    infos = [None] * len(paths)
+    for i, info, error in imap_bounded(lambda i: probe(paths[i]), range(len(paths)), max_workers):
+        if error:
+            raise RuntimeError(f"Could not probe {paths[i]}: {error}")
+        infos[i] = info
+    return infos
+
+
+def iter_probes(paths: Iterable[str], max_workers: int = 8) -> Iterator[Tuple[str, object]]:
+    """Yield (path, MediaInfo or None) in input order, probing ahead with bounded memory.
+
+    At most ``4 x max_workers`` probes are in flight, so a list of tens of
+    thousands of paths is never materialised alongside its probe results.
+    """
+    from .probe import probe
+
+    def safe_probe(path):
+        try:
+            return probe(path)
+        except Exception as e:
+            logger.warning("Probe failed; ffmpeg will probe the file itself", file=path,
+                           error=str(e))
+            return None
+
+    window = max_workers * 4
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append((path, pool.submit(safe_probe, path)))
+            if len(pending) >= window:
+                head, future = pending.popleft()
+                yield head, future.result()
+        while pending:
+            head, future = pending.popleft()
+            yield head, future.result()
+
+
+def _quote(path: str) -> str:
+    return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+
+def write_ffconcat(paths: Iterable[str], list_path: str, max_workers: int = 8) -> int:
+    """Stream an ffconcat list for paths, embedding cached probe data.
+
+    Each entry carries its probed ``duration``, which the demuxer uses as
+    the file's length on the timeline instead of the container's own value
+    (it opens each file lazily when it gets to it either way).  No
+    ``stream``/``exact_stream_id``/``stream_codec`` directives are written:
+    declared streams replace those of the first file, and since an ffconcat
+    list cannot carry their time base the joined timestamps come out wrong.
+    Paths are consumed lazily and the list is written line by line.
+
+    Returns:
+        Number of files written
+    """
+    count = 0
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for path, info in iter_probes(paths, max_workers):
+            f.write(f"file {_quote(path)}\n")
+            if info is not None and info.duration:
+                f.write(f"duration {format_time(info.duration)}\n")
+            count += 1
+    return count
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _concat_command(list_path: str, output_file: str, extra: Optional[List[str]] = None) -> List[str]:
+    command = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path, *(extra or ["-c", "copy"])]
+    if output_file.lower().endswith(".mp4"):
+        command.extend(["-movflags", "+faststart"])
+    command.append(output_file)
+    return command
+
+
+def concat_copy(input_files: List[str], output_file: str, fanout: int = DEFAULT_FANOUT,
+                max_workers: Optional[int] = None) -> None:
+    """Stream-copy concatenate input_files, in parallel stages when there are many.
+
+    Up to ``fanout`` inputs are joined by one ffmpeg run.  Beyond that the
+    inputs are split into groups that are concatenated concurrently into
+    intermediate files next to the output, level by level, until one run
+    can produce the final file.
+    """
+    from .batch import run_commands
+
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    ext = os.path.splitext(output_file)[1] or ".mkv"
+    with tempfile.TemporaryDirectory(prefix=".vidtools-concat-", dir=output_dir) as tmp:
+        level = 0
+        current = list(input_files)
+        while len(current) > fanout:
+            groups = _chunks(current, fanout)
+            outputs, commands = [], []
+            for n, group in enumerate(groups):
+                list_path = os.path.join(tmp, f"level{level}-{n:05d}.ffconcat")
+                write_ffconcat(group, list_path)
+                outputs.append(os.path.join(tmp, f"level{level}-{n:05d}{ext}"))
+                # Intermediates skip faststart; only the final file needs it
+                commands.append(["ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path,
+                                 "-c", "copy", outputs[-1]])
+            logger.info("Concat stage", level=level, inputs=len(current), groups=len(groups))
+            failed = run_commands(commands, f"Concat stage {level + 1}", unit="group",
+                                  max_workers=max_workers)
+            if failed:
+                print(f"Error: {len(failed)} of {len(groups)} concat groups failed")
+                sys.exit(1)
+            for path in current:
+                # Free disk as soon as a level's intermediates are merged
+                if path.startswith(tmp):
+                    os.remove(path)
+            current = outputs
+            level += 1
+
+        list_path = os.path.join(tmp, "final.ffconcat")
+        write_ffconcat(current, list_path)
+        run_ffmpeg_command(_concat_command(list_path, output_file))
+
+
+def normalize_command(input_file: str, output_file: str, reference, has_audio: bool,
+                      crf: Optional[int] = None,
+                      output_format: Optional[str] = None) -> Optional[List[str]]:
+    """Build the ffmpeg argv that re-encodes input_file to the reference profile.
+
+    ``reference`` is the MediaInfo of an input that already has the target
+    profile; ``output_format`` forces the muxer (e.g. PIECE_FORMAT).
+    Returns None if the reference codec has no matching encoder.
+    """
+    video = reference.video
+    command = ["ffmpeg", "-i", input_file]
+    audio_input = "0:a:0"
+    if reference.audio and not has_audio:
+        # Silent clips get a silent track so every file has the same streams
+        audio = reference.audio
+        layout = audio.channel_layout or ("stereo" if audio.channels == 2 else "mono")
+        command += ["-f", "lavfi", "-i", f"anullsrc=r={audio.sample_rate}:cl={layout}"]
+        audio_input = "1:a:0"
+
+    if video:
+        video_args = matching_video_args(video, crf=crf)
+        if video_args is None:
+            return None
+        filters = [
+            f"scale={video.width}:{video.height}:force_original_aspect_ratio=decrease",
+            f"pad={video.width}:{video.height}:(ow-iw)/2:(oh-ih)/2",
+            "setsar=1",
+        ]
+        if video.frame_rate:
+            filters.append(f"fps={video.frame_rate:.6g}")
+        command += ["-map", "0:v:0", "-vf", ",".join(filters), *video_args]
+        if video.time_base and output_file.lower().endswith((".mp4", ".mov", ".m4v")):
+            # Same track timescale, otherwise the copied timestamps drift
+            command += ["-video_track_timescale", video.time_base.partition("/")[2] or "90000"]
+
+    if reference.audio:
+        audio = reference.audio
+        encoder = AUDIO_ENCODERS.get(audio.codec_name)
+        if encoder is None:
+            return None
+        command += ["-map", audio_input, "-c:a", encoder]
+        if audio.sample_rate:
+            command += ["-ar", str(audio.sample_rate)]
+        if audio.channels:
+            command += ["-ac", str(audio.channels)]
+        if audio.bit_rate:
+            command += ["-b:a", str(audio.bit_rate)]
+        if not has_audio:
+            command += ["-shortest"]
+    else:
+        command += ["-an"]
+    command += ["-sn", "-dn"]
+    if output_format:
+        command += ["-f", output_format]
+    command.append(output_file)
+    return command
+
+
+def _piece_command(input_file: str, piece_path: str) -> List[str]:
+    """Stream-copy input_file's first video and audio stream into an MPEG-TS piece."""
+    return ["ffmpeg", "-i", input_file, "-map", "0:v:0?", "-map", "0:a:0?", "-c", "copy",
+            "-sn", "-dn", "-f", PIECE_FORMAT, piece_path]
+
+
+def concat_normalized(input_files: List[str], output_file: str, max_workers: Optional[int] = None,
+                      crf: Optional[int] = None, fanout: int = DEFAULT_FANOUT) -> int:
+    """Concatenate input_files losslessly, re-encoding only inputs that differ from the majority.
+
+    When any input is re-encoded, every input is joined as an MPEG-TS piece
+    (the matching ones by a stream-copy remux) so each keeps its own
+    in-band parameter sets.
+
+    Args:
+        input_files: Inputs in output order
+        output_file: Destination file
+        max_workers: Concurrent normalizing encodes (default: one per CPU)
+        crf: Quality for normalized clips (default 18, visually lossless)
+        fanout: Inputs per concat run before joining in stages
+
+    Returns:
+        Number of inputs that had to be re-encoded
+    """
+    from .batch import run_commands
+
+    try:
+        infos = probe_all(input_files)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    profiles = [stream_profile(info) for info in infos]
+    target, count = Counter(profiles).most_common(1)[0]
+    reference = infos[profiles.index(target)]
+    odd = [i for i, profile in enumerate(profiles) if profile != target]
+    logger.info("Concat plan", inputs=len(input_files), target=describe_profile(target),
+                matching=count, normalize=len(odd))
+    print(f"Target profile: {describe_profile(target)} ({count}/{len(input_files)} inputs match)")
+
+    ext = os.path.splitext(output_file)[1] or os.path.splitext(input_files[0])[1]
+    # A re-encoded clip has its own out-of-band parameter sets (SPS/PPS), which
+    # a stream copy would replace with the first file's.  Like smart_cut, join
+    # MPEG-TS pieces instead: every piece then carries its headers in-band.
+    as_pieces = bool(odd) and (reference.audio is None
+                               or reference.audio.codec_name in PIECE_AUDIO_CODECS)
+    if odd and not as_pieces:
+        logger.warning("Audio codec cannot go in MPEG-TS pieces; normalized clips keep their "
+                       "own parameter sets", codec=reference.audio.codec_name)
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    # Normalized clips live next to the output so large files stay on one filesystem
+    with tempfile.TemporaryDirectory(prefix=".vidtools-concat-", dir=output_dir) as tmp:
+        parts = list(input_files)
+        commands = []
+        for i in odd:
+            parts[i] = os.path.join(tmp, f"norm{i:05d}{PIECE_EXT if as_pieces else ext}")
+            print(f"  normalizing {input_files[i]} ({describe_profile(profiles[i])})")
+            command = normalize_command(input_files[i], parts[i], reference,
+                                        has_audio=infos[i].audio is not None, crf=crf,
+                                        output_format=PIECE_FORMAT if as_pieces else None)
+            if command is None:
+                print(f"Error: cannot encode to {describe_profile(target)}; use --reencode")
+                sys.exit(1)
+            commands.append(command)
+        if commands:
+            failed = run_commands(commands, "Normalizing", unit="clip", max_workers=max_workers)
+            if failed:
+                for index, error in failed:
+                    print(f"  ✗ {input_files[odd[index]]}: {error}")
+                print(f"Error: {len(failed)} inputs could not be normalized")
+                sys.exit(1)
+        if as_pieces:
+            # Matching clips are only remuxed, but must be pieces too: mixing
+            # MPEG-TS with other containers in one concat list is not supported
+            normalized = set(odd)
+            matching = [i for i in range(len(input_files)) if i not in normalized]
+            commands = []
+            for i in matching:
+                parts[i] = os.path.join(tmp, f"copy{i:05d}{PIECE_EXT}")
+                commands.append(_piece_command(input_files[i], parts[i]))
+            failed = run_commands(commands, "Remuxing", unit="clip", max_workers=max_workers)
+            if failed:
+                for index, error in failed:
+                    print(f"  ✗ {input_files[matching[index]]}: {error}")
+                print(f"Error: {len(failed)} inputs could not be remuxed")
+                sys.exit(1)
+
+        concat_copy(parts, output_file, fanout=fanout, max_workers=max_workers)
+    return len(odd)
+
@@ -0,0 +1,226 @@
+"""Cut many ranges out of one input while reading the source only once.
+
+An edit decision list (EDL) is a CSV or JSON file of ``start, end, name``
+rows.  cut_ranges() sorts the ranges and groups neighbours that sit close
+together; each group becomes a single ffmpeg invocation with one input
+seek and one mapped output per range, so the source is opened, demuxed and
+(when re-encoding) decoded once per group instead of once per clip.
+"""
+
+import bisect
+import csv
+import json
+import os
+import subprocess
+from typing import List, Optional
+
+from .utils import format_time, logger, parse_time, run_ffmpeg_command
+
+# Ranges closer than this share one ffmpeg pass (the gap is read and discarded)
+DEFAULT_GROUP_GAP = 60.0
+# Upper bound on outputs per invocation, which bounds open encoders and files
+DEFAULT_MAX_OUTPUTS = 16
+
+
+class EdlRange:
+    """One clip to extract: [start, end) in seconds plus its output name."""
+
+    __slots__ = ("start", "end", "name")
+
+    def __init__(self, start: float, end: float, name: Optional[str] = None):
+        self.start = start
+        self.end = end
+        self.name = name
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"<EdlRange {self.start}-{self.end} {self.name!r}>"
+
+
+def _make_range(start, end=None, duration=None, name=None, line=None) -> EdlRange:
+    begin = parse_time(start)
+    if begin is None:
+        raise ValueError(f"EDL entry {line}: missing start time")
+    if end not in (None, ""):
+        finish = parse_time(end)
+    elif duration not in (None, ""):
+        finish = begin + parse_time(duration)
+    else:
+        raise ValueError(f"EDL entry {line}: needs an end time or a duration")
+    if finish <= begin:
+        raise ValueError(f"EDL entry {line}: end ({finish}) is not after start ({begin})")
+    name = (name or "").strip() or None
+    if name is not None and ("/" in name or "\\" in name or name in (".", "..")):
+        # Clips are always written into the output directory
+        raise ValueError(f"EDL entry {line}: name {name!r} must be a file name, not a path")
+    return EdlRange(begin, finish, name)
+
+
+def load_edl(path: str) -> List[EdlRange]:
+    """Read an edit list from CSV or JSON.
+
+    CSV rows are ``start,end[,name]``; a header row naming ``start``, ``end``
+    or ``duration`` and ``name`` columns is also accepted.  JSON is a list
+    of ``{"start": .., "end": .., "name": ..}`` objects (``duration`` may
+    replace ``end``) or of ``[start, end, name]`` lists.  Times use any
+    format parse_time() understands.
+    """
+    ranges = []
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        for i, row in enumerate(rows, 1):
+            if isinstance(row, dict):
+                ranges.append(_make_range(row.get("start"), row.get("end"), row.get("duration"),
+                                          row.get("name"), line=i))
+            else:
+                cells = list(row) + [None, None, None]
+                ranges.append(_make_range(cells[0], cells[1], name=cells[2], line=i))
+        return ranges
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and not row[0].lstrip().startswith("#")]
+    if not rows:
+        return ranges
+    header = [cell.strip().lower() for cell in rows[0]]
+    if "start" in header:
+        columns = {name: header.index(name) for name in ("start", "end", "duration", "name")
+                   if name in header}
+
+        def cell(row, name):
+            index = columns.get(name)
+            return row[index].strip() if index is not None and index < len(row) else None
+
+        for i, row in enumerate(rows[1:], 2):
+            ranges.append(_make_range(cell(row, "start"), cell(row, "end"), cell(row, "duration"),
+                                      cell(row, "name"), line=i))
+    else:
+        for i, row in enumerate(rows, 1):
+            cells = [c.strip() for c in row] + [None, None, None]
+            ranges.append(_make_range(cells[0], cells[1], name=cells[2], line=i))
+    return ranges
+
+
+def group_ranges(ranges: List[EdlRange], max_gap: float = DEFAULT_GROUP_GAP,
+                 max_outputs: int = DEFAULT_MAX_OUTPUTS) -> List[List[EdlRange]]:
+    """Group start-sorted ranges so each group can be served by one pass."""
+    groups: List[List[EdlRange]] = []
+    group_end = None
+    for r in sorted(ranges, key=lambda r: (r.start, r.end)):
+        if (groups and len(groups[-1]) < max_outputs
+                and r.start - group_end <= max_gap):
+            groups[-1].append(r)
+            group_end = max(group_end, r.end)
+        else:
+            groups.append([r])
+            group_end = r.end
+    return groups
+
+
+def _output_names(ranges: List[EdlRange], input_file: str, output_dir: str) -> List[str]:
+    stem, ext = os.path.splitext(os.path.basename(input_file))
+    paths = []
+    used = set()
+    for i, r in enumerate(ranges, 1):
+        name = r.name or f"{stem}_{i:03d}"
+        base, suffix = os.path.splitext(name)
+        if not suffix:
+            base, suffix = name, ext
+        # Repeated names would overwrite each other's clips; number the repeats
+        name, n = base + suffix, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base}_{n}{suffix}"
+        used.add(name.lower())
+        paths.append(os.path.join(output_dir, name))
+    return paths
+
+
+def cut_ranges(input_file: str, ranges: List[EdlRange], output_dir: str, use_copy: bool = True,
+               video_codec=None, audio_codec=None, crf=None,
+               max_gap: float = DEFAULT_GROUP_GAP, max_outputs: int = DEFAULT_MAX_OUTPUTS) -> List[str]:
+    """Cut every range of input_file into output_dir.
+
+    Args:
+        input_file: Source video
+        ranges: EdlRange list (any order); unnamed ranges get
+            ``<stem>_NNN<ext>`` names numbered in list order, and repeated
+            names get a ``_2``, ``_3``... suffix
+        output_dir: Directory for the clips (created if missing)
+        use_copy: Stream copy (each clip starts at the keyframe at or before
+            its start, like a single ``vt cut``); False re-encodes frame-accurately
+        video_codec: Video codec for re-encoding
+        audio_codec: Audio codec for re-encoding
+        crf: Quality for re-encoding
+        max_gap: Ranges closer than this many seconds share one ffmpeg pass
+        max_outputs: Maximum clips written by one ffmpeg pass
+
+    Returns:
+        Output paths, in the order of ranges
+    """
+    from .seek import has_video, keyframe_index
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = _output_names(ranges, input_file, output_dir)
+    output_for = {id(r): path for r, path in zip(ranges, outputs)}
+
+    # One full index serves every range; cheaper than a windowed probe per clip.
+    keyframes: List[float] = []
+    if has_video(input_file):
+        try:
+            keyframes = keyframe_index(input_file)
+        except (subprocess.CalledProcessError, OSError) as e:
+            logger.debug("Keyframe index unavailable; seeking to exact range starts", error=str(e))
+
+    def keyframe_at_or_before(t):
+        i = bisect.bisect_right(keyframes, t + 1e-6)
+        return keyframes[i - 1] if i else None
+
+    groups = group_ranges(ranges, max_gap=max_gap, max_outputs=max_outputs)
+    logger.info("EDL cut plan", input=input_file, ranges=len(ranges), passes=len(groups))
+    for n, group in enumerate(groups, 1):
+        first = group[0].start
+        base = keyframe_at_or_before(first) if keyframes else None
+        if base is None:
+            base = first if not keyframes else 0.0
+        command = ["ffmpeg"]
+        if base > 0:
+            command += ["-ss", format_time(base)]
+        command += ["-i", input_file]
+
+        for r in group:
+            start = r.start
+            if use_copy and keyframes:
+                # A copied clip can only begin on a keyframe.  Output seeking
+                # compares decode timestamps, which run slightly ahead of the
+                # keyframe's pts with B-frames, so aim a little before it; the
+                # copied stream still starts on the keyframe because leading
+                # non-key packets are dropped.
+                start = keyframe_at_or_before(r.start)
+                if start is None:
+                    start = r.start
+                elif start > base:
+                    previous = keyframe_at_or_before(start - 1e-3)
+                    start -= min(0.5, (start - previous) / 2) if previous is not None else 0.0
+            offset = max(0.0, start - base)
+            if offset > 0:
+                command += ["-ss", format_time(offset)]
+            command += ["-t", format_time(r.end - start)]
+            if use_copy:
+                command += ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+            else:
+                command += ["-c:v", video_codec or "libx264", "-c:a", audio_codec or "aac"]
+                if crf:
+                    command += ["-crf", str(crf)]
+            output = output_for[id(r)]
+            if output.lower().endswith(".mp4"):
+                command += ["-movflags", "+faststart"]
+            command.append(output)
+
+        print(f"Pass {n}/{len(groups)}: {len(group)} clip(s) from "
+              f"{format_time(group[0].start)}s to {format_time(max(r.end for r in group))}s")
+        run_ffmpeg_command(command)
+    return outputs
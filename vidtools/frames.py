@@ -0,0 +1,501 @@
+"""Decoded video frames as NumPy arrays, straight from an ffmpeg pipe.
+
+extract_frames writes image files, which analysis code then has to read
+back.  iter_frames() instead runs ffmpeg with ``-f rawvideo`` to a pipe and
+reads fixed-size frames into preallocated arrays:
+
+    from vidtools.frames import iter_frames
+
+    with iter_frames("talk.mp4", fps=2, size=(640, None)) as frames:
+        for frame in frames:          # (H, W, 3) uint8, RGB
+            ...
+
+    for batch in iter_frames("talk.mp4", size=(224, 224), batch=32):
+        model(batch)                  # (N, H, W, 3), N == 32 except at the end
+
+A background thread reads ahead into a small ring of buffers (``read_ahead``
+of them), so decoding overlaps with whatever the caller does per frame.
+Yielded arrays are views of those buffers: each one is valid until the
+next frame is requested.  Pass ``copy=True`` (or call ``.copy()``) to keep
+frames around.
+
+get_frames() fetches frames at arbitrary timestamps.  The requested times
+are grouped by the keyframe interval they fall in, each group is decoded
+by one ffmpeg run that seeks straight to its keyframe and stops after its
+last target, and only the matching frames leave ffmpeg.  Decoded frames
+are kept in a size-bounded LRU cache (``frame_cache``), so asking again,
+as a TUI scrubbing back and forth or a notebook cell re-run does, is free:
+
+    from vidtools.frames import get_frames
+
+    thumbs = get_frames("talk.mp4", [0, 12.5, 61, "00:02:00"], size=(320, None))
+
+numpy is an optional dependency: ``pip install 'vidtools[frames]'``.
+"""
+
+import collections
+import io
+import os
+import queue
+import re
+import subprocess
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .utils import STDERR_TAIL_LINES, _read_stderr, logger, parse_time
+
+# pix_fmt -> (channels, numpy dtype)
+PIX_FMTS = {
+    "rgb24": (3, "uint8"),
+    "bgr24": (3, "uint8"),
+    "rgba": (4, "uint8"),
+    "bgra": (4, "uint8"),
+    "gray": (1, "uint8"),
+    "gray16le": (1, "<u2"),
+    "rgb48le": (3, "<u2"),
+}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("vidtools.frames needs numpy: pip install 'vidtools[frames]'") from None
+    return numpy
+
+
+def _read_into(stream, view) -> int:
+    """Fill view from stream; returns the bytes read (less than len(view) only at EOF)."""
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+class FrameReader:
+    """Iterable over the frames (or batches) of one ffmpeg rawvideo pipe.
+
+    Iterate it once; leaving the loop early (or close()) stops ffmpeg.
+    """
+
+    __slots__ = ("command", "width", "height", "pix_fmt", "batch", "read_ahead", "copy",
+                 "_process", "_reader", "_slots", "_free", "_filled", "_stop", "_error",
+                 "_stderr_tail", "_stderr_thread")
+
+    def __init__(self, command: List[str], width: int, height: int, pix_fmt: str = "rgb24",
+                 batch: Optional[int] = None, read_ahead: int = 2, copy: bool = False):
+        if pix_fmt not in PIX_FMTS:
+            raise ValueError(f"unsupported pix_fmt {pix_fmt!r}; choose from {', '.join(PIX_FMTS)}")
+        self.command = command
+        self.width = width
+        self.height = height
+        self.pix_fmt = pix_fmt
+        self.batch = batch
+        self.read_ahead = max(0, read_ahead)
+        self.copy = copy
+        self._process = None
+        self._reader = None
+        self._stop = threading.Event()
+        self._error = None
+        self._stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+        self._stderr_thread = None
+
+    @property
+    def frame_shape(self) -> Tuple[int, ...]:
+        channels = PIX_FMTS[self.pix_fmt][0]
+        if channels == 1:
+            return self.height, self.width
+        return self.height, self.width, channels
+
+    @property
+    def frame_bytes(self) -> int:
+        np = _numpy()
+        return int(np.prod(self.frame_shape)) * np.dtype(PIX_FMTS[self.pix_fmt][1]).itemsize
+
+    def _start(self) -> None:
+        logger.debug("Reading raw frames", command=" ".join(self.command))
+        self._process = subprocess.Popen(self.command, stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                         bufsize=0)
+        stderr = io.TextIOWrapper(self._process.stderr, errors="replace")
+        self._stderr_thread = threading.Thread(
+            target=_read_stderr, args=(stderr, self._stderr_tail, {}), daemon=True)
+        self._stderr_thread.start()
+
+    def _fill(self, slot) -> int:
+        """Read up to len(slot) frames into slot; returns the number of whole frames read."""
+        return _read_into(self._process.stdout, memoryview(slot).cast("B")) // self.frame_bytes
+
+    def _read_ahead(self) -> None:
+        per_slot = self.batch or 1
+        try:
+            while not self._stop.is_set():
+                index = self._free.get()
+                if index is None:
+                    break
+                count = self._fill(self._slots[index])
+                if count:
+                    self._filled.put((index, count))
+                if count < per_slot:
+                    break
+        except BaseException as e:  # surfaced in the consuming thread
+            self._error = e
+        finally:
+            self._filled.put(None)
+
+    def _item(self, slot, count):
+        view = slot[:count] if self.batch else slot[0]
+        return view.copy() if self.copy else view
+
+    def __iter__(self):
+        np = _numpy()
+        if self._process is not None:
+            raise RuntimeError("a FrameReader can only be iterated once")
+        per_slot = self.batch or 1
+        slot_count = self.read_ahead + 1 if self.read_ahead else 1
+        dtype = np.dtype(PIX_FMTS[self.pix_fmt][1])
+        self._slots = [np.empty((per_slot, *self.frame_shape), dtype) for _ in range(slot_count)]
+        self._start()
+        try:
+            if not self.read_ahead:
+                while True:
+                    count = self._fill(self._slots[0])
+                    if count:
+                        yield self._item(self._slots[0], count)
+                    if count < per_slot:
+                        break
+            else:
+                # A slot goes back to the reader only when the caller asks for the
+                # next frame, so the view it holds stays intact until then
+                self._free = queue.Queue()
+                self._filled = queue.Queue()
+                for index in range(slot_count):
+                    self._free.put(index)
+                self._reader = threading.Thread(target=self._read_ahead, daemon=True)
+                self._reader.start()
+                held = None
+                while True:
+                    item = self._filled.get()
+                    if held is not None:
+                        self._free.put(held)
+                    if item is None:
+                        break
+                    held, count = item
+                    yield self._item(self._slots[held], count)
+                if self._error is not None:
+                    raise self._error
+            self._finish()
+        finally:
+            self.close()
+
+    def _finish(self) -> None:
+        returncode = self._process.wait()
+        self._stderr_thread.join()
+        if returncode != 0:
+            stderr = "\n".join(self._stderr_tail)
+            logger.error("ffmpeg frame reader failed", return_code=returncode, error_output=stderr)
+            raise subprocess.CalledProcessError(returncode, self.command, stderr=stderr)
+
+    def close(self) -> None:
+        """Stop ffmpeg and the read-ahead thread (safe to call more than once)."""
+        self._stop.set()
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+        if self._reader is not None:
+            self._free.put(None)
+            self._reader.join()
+        self._process.wait()
+        self._process.stdout.close()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return (f"<FrameReader {self.width}x{self.height} {self.pix_fmt} "
+                f"batch={self.batch} read_ahead={self.read_ahead}>")
+
+
+def output_size(input_file: str, size=None) -> Tuple[int, int]:
+    """Resolve (width, height) of the frames; a None side keeps the source aspect ratio."""
+    width, height = size if size else (None, None)
+    if width and height:
+        return int(width), int(height)
+    from .probe import probe
+
+    video = probe(input_file).video
+    if video is None or not video.width or not video.height:
+        raise ValueError(f"{input_file} has no video stream with a known size")
+    src_w, src_h = video.width, video.height
+    if video.rotation and round(video.rotation) % 180:
+        src_w, src_h = src_h, src_w  # ffmpeg autorotates while decoding
+    if not width and not height:
+        return src_w, src_h
+    # Even sizes, as scale=-2 would pick
+    if width:
+        return int(width), max(2, round(int(width) * src_h / src_w / 2) * 2)
+    return max(2, round(int(height) * src_w / src_h / 2) * 2), int(height)
+
+
+def frames_command(input_file: str, width: int, height: int, fps=None, pix_fmt: str = "rgb24",
+                   start_time=None, end_time=None, duration=None,
+                   scale_flags: str = "bicubic") -> List[str]:
+    """ffmpeg argv that writes frames of input_file to stdout as raw pix_fmt pixels."""
+    from .governor import get_governor
+    from .seek import plan_seek
+
+    seek = plan_seek(input_file, start_time, end_time, duration)
+    filters = []
+    if fps:
+        filters.append(f"fps={fps}")
+    filters.append(f"scale={width}:{height}:flags={scale_flags}")
+    command = ["ffmpeg", "-v", "error", "-nostdin", *seek.input_args, "-i", input_file,
+               *seek.output_args, "-map", "0:v:0", "-an", "-sn", "-dn", "-vf", ",".join(filters)]
+    if not fps:
+        command += ["-fps_mode", "passthrough"]  # one array per decoded frame, no dups
+    command += ["-f", "rawvideo", "-pix_fmt", pix_fmt, "pipe:1"]
+    return get_governor().apply(command, 1)
+
+
+def iter_frames(input_file: str, fps=None, size=None, pix_fmt: str = "rgb24",
+                start_time=None, end_time=None, duration=None, batch: Optional[int] = None,
+                read_ahead: int = 2, copy: bool = False) -> FrameReader:
+    """Decode input_file into NumPy arrays.
+
+    Args:
+        input_file: Source video
+        fps: Sample at this rate (None yields every decoded frame)
+        size: (width, height); either side None keeps the aspect ratio,
+            None keeps the source size
+        pix_fmt: One of PIX_FMTS (rgb24 gives (H, W, 3) uint8)
+        start_time: Start timestamp (HH:MM:SS or seconds)
+        end_time: End timestamp (absolute)
+        duration: Length of the range (alternative to end_time)
+        batch: Yield (N, H, W, C) arrays of this many frames instead of single frames
+        read_ahead: Buffers decoded ahead in a background thread (0 reads inline)
+        copy: Yield independent copies instead of views of the reused buffers
+
+    Returns:
+        FrameReader; iterate it (optionally inside ``with``) to get the frames.
+    """
+    _numpy()
+    if batch is not None and batch < 1:
+        raise ValueError("batch must be at least 1")
+    if parse_time(duration) == 0:
+        raise ValueError("duration must be positive")
+    width, height = output_size(input_file, size)
+    command = frames_command(input_file, width, height, fps, pix_fmt, start_time, end_time,
+                             duration)
+    return FrameReader(command, width, height, pix_fmt, batch=batch, read_ahead=read_ahead,
+                       copy=copy)
+
+
+DEFAULT_FRAME_CACHE_SIZE = 512 * 1024 ** 2  # 512 MiB
+
+_SHOWINFO_RE = re.compile(r"\] n:\s*\d+ .*?pts_time:\s*(-?[\d.]+)")
+
+
+class FrameCache:
+    """Thread-safe LRU of decoded frames, bounded by their total size in bytes.
+
+    Cached arrays are read-only and shared between callers.
+    """
+
+    __slots__ = ("max_bytes", "_entries", "_bytes", "_lock", "hits", "misses")
+
+    def __init__(self, max_bytes: int = DEFAULT_FRAME_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self._entries: "collections.OrderedDict[Tuple, object]" = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "FrameCache":
+        from .cache import parse_size
+
+        value = os.environ.get("VIDTOOLS_FRAME_CACHE_SIZE")
+        return cls(parse_size(value) if value else DEFAULT_FRAME_CACHE_SIZE)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def get(self, key: Tuple):
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key: Tuple, frame) -> None:
+        if frame.nbytes > self.max_bytes:
+            return
+        frame.flags.writeable = False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = frame
+            self._bytes += frame.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"<FrameCache {len(self._entries)} frames {self._bytes}/{self.max_bytes} bytes "
+                f"hits={self.hits} misses={self.misses}>")
+
+
+frame_cache = FrameCache.from_env()
+
+
+def group_by_keyframe(times: Sequence[float],
+                      keyframes: Sequence[float]) -> Dict[float, List[float]]:
+    """Map each keyframe to the sorted, distinct times that decode from it.
+
+    Without keyframes every time is its own group, seeking to the time itself.
+    """
+    import bisect
+
+    groups: Dict[float, List[float]] = {}
+    for t in sorted(set(times)):
+        if keyframes:
+            i = bisect.bisect_right(keyframes, t + 1e-6) - 1
+            origin = keyframes[i] if i >= 0 else 0.0
+        else:
+            origin = t
+        groups.setdefault(origin, []).append(t)
+    return groups
+
+
+def _decode_group(input_file: str, origin: float, times: List[float], width: int, height: int,
+                  pix_fmt: str, frame_duration: float):
+    """Decode the frames nearest to times with one seek to origin; returns {time: array}."""
+    np = _numpy()
+    from .governor import get_governor
+    from .utils import format_time
+
+    channels, dtype = PIX_FMTS[pix_fmt]
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    # Let through the frames within one frame duration of a target; the nearest wins below
+    relative = [t - origin for t in times]
+    select = "+".join(f"lt(abs(t-{format_time(r)}),{format_time(frame_duration)})"
+                      for r in relative)
+    span = relative[-1] + 2 * frame_duration
+    command = ["ffmpeg", "-hide_banner", "-nostats", "-nostdin"]
+    if origin > 0:
+        command += ["-ss", format_time(origin)]
+    command += ["-t", format_time(span), "-i", input_file, "-map", "0:v:0", "-an", "-sn", "-dn",
+                "-vf", f"select='{select}',showinfo,scale={width}:{height}:flags=bicubic",
+                "-fps_mode", "passthrough", "-f", "rawvideo", "-pix_fmt", pix_fmt, "pipe:1"]
+    command = get_governor().apply(command, 1)
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True)
+    stderr = result.stderr.decode("utf-8", "replace")
+    if result.returncode != 0:
+        tail = "\n".join(stderr.splitlines()[-STDERR_TAIL_LINES:])
+        logger.error("ffmpeg frame fetch failed", return_code=result.returncode, error_output=tail)
+        raise subprocess.CalledProcessError(result.returncode, command, stderr=tail)
+
+    pts = [float(m.group(1)) for m in _SHOWINFO_RE.finditer(stderr)]
+    frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    count = min(len(pts), len(result.stdout) // frame_bytes)
+    frames = np.frombuffer(result.stdout[:count * frame_bytes], dtype=dtype)
+    frames = frames.reshape((count, *shape))
+    found = {}
+    for t, r in zip(times, relative):
+        if count:
+            nearest = min(range(count), key=lambda i: (abs(pts[i] - r), pts[i]))
+            if abs(pts[nearest] - r) <= frame_duration:
+                found[t] = frames[nearest].copy()
+    return found
+
+
+def get_frames(input_file: str, timestamps: Sequence, size=None, pix_fmt: str = "rgb24",
+               cache: Optional[FrameCache] = None, jobs: int = 1) -> list:
+    """Frames of input_file nearest to each timestamp, in request order.
+
+    Args:
+        input_file: Source video
+        timestamps: Seconds or HH:MM:SS strings, in any order, repeats allowed
+        size: (width, height); either side None keeps the aspect ratio
+        pix_fmt: One of PIX_FMTS
+        cache: FrameCache to use (default: the shared ``frame_cache``)
+        jobs: Keyframe groups decoded concurrently
+
+    Returns:
+        One read-only array per timestamp (shared with the cache).
+
+    Raises:
+        ValueError: a timestamp has no frame (e.g. past the end of the video)
+    """
+    _numpy()
+    from .batch import imap_bounded
+    from .probe import _stat_key, probe
+    from .seek import keyframe_index
+
+    if pix_fmt not in PIX_FMTS:
+        raise ValueError(f"unsupported pix_fmt {pix_fmt!r}; choose from {', '.join(PIX_FMTS)}")
+    cache = frame_cache if cache is None else cache
+    times = [round(parse_time(t), 6) for t in timestamps]
+    width, height = output_size(input_file, size)
+    file_key = _stat_key(input_file)
+
+    def key(t):
+        return (file_key, t, width, height, pix_fmt)
+
+    result = {}
+    for t in times:
+        if t not in result:
+            frame = cache.get(key(t))
+            if frame is not None:
+                result[t] = frame
+    missing = [t for t in times if t not in result]
+    if missing:
+        try:
+            keyframes = keyframe_index(input_file)
+        except (subprocess.CalledProcessError, OSError) as e:
+            logger.debug("No keyframe index; seeking to each timestamp", error=str(e))
+            keyframes = []
+        video = probe(input_file).video
+        frame_duration = 1 / video.frame_rate if video and video.frame_rate else 0.04
+        groups = group_by_keyframe(missing, keyframes)
+        logger.info("Fetching frames", input=input_file, frames=len(set(missing)),
+                    groups=len(groups), cached=len(result))
+
+        def decode(origin):
+            return _decode_group(input_file, origin, groups[origin], width, height, pix_fmt,
+                                 frame_duration)
+
+        for _, found, error in imap_bounded(decode, groups, max(1, jobs)):
+            if error is not None:
+                raise error
+            for t, frame in found.items():
+                cache.put(key(t), frame)
+                result[t] = frame
+
+    absent = sorted({t for t in times if t not in result})
+    if absent:
+        raise ValueError(f"no frame at {', '.join(map(str, absent))}s in {input_file}")
+    return [result[t] for t in times]
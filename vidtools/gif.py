@@ -0,0 +1,210 @@
+"""GIF rendering with reusable palettes.
+
+A good GIF needs a palette computed from the clip itself (palettegen) and
+then applied with dithering (paletteuse).  Doing both in one filter graph
+means the palette only exists at end of stream, so ``split`` has to hold
+every frame of the clip in memory until then, and the palette is thrown
+away afterwards.
+
+make_gif() splits the work instead:
+
+1. the palette is generated in its own pass and stored under the vidtools
+   cache, keyed by the source fingerprint, the time range, the size/fps and
+   the palette settings, so re-rendering the same range with a different
+   dither or loop setting skips straight to step 2;
+2. the GIF is rendered with that palette as a second input.
+
+For long inputs ``segments`` generates one palette per time slice in
+parallel and merges them into the final palette with a last palettegen
+over their colours, so no single process has to scan the whole clip.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import List, Optional
+
+from .utils import cache_dir, format_time, logger, parse_time, run_ffmpeg_command
+
+DEFAULT_FPS = 10
+DEFAULT_WIDTH = 320
+DITHERS = ("sierra2_4a", "sierra2", "floyd_steinberg", "bayer", "none")
+STATS_MODES = ("full", "diff", "single")
+
+
+def frame_filter(fps=DEFAULT_FPS, width=DEFAULT_WIDTH, algorithm="lanczos") -> str:
+    """fps/scale chain producing the GIF's frames (width None or 0 keeps the source size)."""
+    parts = [f"fps={fps}"]
+    if width:
+        parts.append(f"scale={width}:-1:flags={algorithm}")
+    return ",".join(parts)
+
+
+def _palettegen(stats_mode: str, max_colors: int) -> str:
+    return f"palettegen=stats_mode={stats_mode}:max_colors={max_colors}"
+
+
+def _paletteuse(dither: str, bayer_scale: Optional[int], stats_mode: str) -> str:
+    options = [f"dither={dither}"]
+    if dither == "bayer" and bayer_scale is not None:
+        options.append(f"bayer_scale={bayer_scale}")
+    if stats_mode == "diff":
+        # Only the changing region was sampled; only redraw that region
+        options.append("diff_mode=rectangle")
+    if stats_mode == "single":
+        options.append("new=1")
+    return "paletteuse=" + ":".join(options)
+
+
+def one_pass_filter(fps=DEFAULT_FPS, width=DEFAULT_WIDTH, dither="sierra2_4a", bayer_scale=None,
+                    stats_mode="full", max_colors=256) -> str:
+    """Single -vf graph that generates and applies the palette in one go."""
+    return (f"{frame_filter(fps, width)},split[s0][s1];"
+            f"[s0]{_palettegen(stats_mode, max_colors)}[p];"
+            f"[s1][p]{_paletteuse(dither, bayer_scale, stats_mode)}")
+
+
+def palette_key(input_file: str, start: float, length: Optional[float], fps, width,
+                stats_mode: str, max_colors: int, segments: int) -> str:
+    """Cache key of a palette: source fingerprint, range, frame size and palette settings."""
+    from .cache import sample_fingerprint
+
+    payload = json.dumps([sample_fingerprint(input_file), round(start, 6),
+                          round(length, 6) if length is not None else None, fps, width,
+                          stats_mode, max_colors, segments])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _palette_command(input_file, start, length, frames, palette, stats_mode, max_colors):
+    from .seek import plan_seek
+
+    # An output -ss would drop palettegen's single frame, which comes out with
+    # pts 0 at end of stream; colour statistics don't need frame accuracy
+    seek = plan_seek(input_file, start, duration=length, accurate=False)
+    return ["ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args,
+            "-vf", f"{frames},{_palettegen(stats_mode, max_colors)}",
+            "-frames:v", "1", "-update", "1", palette]
+
+
+def _merge_palettes(palettes: List[str], output: str, max_colors: int) -> None:
+    """Reduce several palettes to one by running palettegen over all their colours."""
+    inputs = []
+    for path in palettes:
+        inputs += ["-i", path]
+    labels = "".join(f"[{i}:v]" for i in range(len(palettes)))
+    graph = f"{labels}hstack=inputs={len(palettes)},{_palettegen('full', max_colors)}"
+    run_ffmpeg_command(["ffmpeg", *inputs, "-filter_complex", graph,
+                        "-frames:v", "1", "-update", "1", output])
+
+
+def make_palette(input_file: str, start: float = 0.0, length: Optional[float] = None,
+                 fps=DEFAULT_FPS, width=DEFAULT_WIDTH, stats_mode: str = "full",
+                 max_colors: int = 256, segments: Optional[int] = None,
+                 use_cache: bool = True) -> str:
+    """Return the path of a palette PNG for [start, start+length) of input_file.
+
+    ``segments`` > 1 generates that many partial palettes in parallel and
+    merges them (0 means one per CPU).  Palettes are cached unless
+    ``use_cache`` is False, in which case the returned file sits in a
+    temporary directory of its own that the caller removes.
+    """
+    from .batch import resolve_jobs, run_commands
+    from .probe import probe
+
+    segments = resolve_jobs(segments)
+    key = palette_key(input_file, start, length, fps, width, stats_mode, max_colors, segments)
+    palette = os.path.join(cache_dir("palettes"), f"{key}.png")
+    if use_cache and os.path.isfile(palette):
+        logger.info("Reusing cached GIF palette", palette=palette)
+        return palette
+
+    frames = frame_filter(fps, width)
+    # A private work directory per call: concurrent renders of the same key
+    # never share a file, and a failed run leaves nothing in the cache
+    if use_cache:
+        workdir = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(palette))
+    else:
+        workdir = tempfile.mkdtemp(prefix="vidtools-palette-")
+    tmp_palette = os.path.join(workdir, "palette.png")
+    try:
+        if segments > 1:
+            end = start + length if length is not None else probe(input_file).duration
+            step = (end - start) / segments
+            parts = [os.path.join(workdir, f"palette{i:04d}.png") for i in range(segments)]
+            commands = [_palette_command(input_file, start + i * step, step, frames, part,
+                                         stats_mode, max_colors)
+                        for i, part in enumerate(parts)]
+            failed = run_commands(commands, "Palettes", unit="segment")
+            if failed:
+                print(f"Error: {len(failed)} of {segments} palette segments failed")
+                sys.exit(1)
+            _merge_palettes(parts, tmp_palette, max_colors)
+        else:
+            run_ffmpeg_command(_palette_command(input_file, start, length, frames, tmp_palette,
+                                                stats_mode, max_colors))
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    if not use_cache:
+        return tmp_palette  # the caller removes its directory
+    os.replace(tmp_palette, palette)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return palette
+
+
+def make_gif(input_file: str, output_file: str, fps=DEFAULT_FPS, width=DEFAULT_WIDTH,
+             dither: str = "sierra2_4a", bayer_scale: Optional[int] = None,
+             stats_mode: str = "full", max_colors: int = 256, loop: int = 0,
+             start_time=None, end_time=None, duration=None, segments: Optional[int] = None,
+             cache_palette: bool = True, cache=None) -> None:
+    """Render input_file (or a range of it) as a GIF using a separately generated palette.
+
+    Args:
+        input_file: Source video
+        output_file: Destination .gif
+        fps: Output frame rate
+        width: Output width in pixels, height keeps the aspect ratio (None keeps the size)
+        dither: paletteuse dithering (one of DITHERS)
+        bayer_scale: Bayer pattern scale 0-5 when dither is "bayer"
+        stats_mode: "full" (whole clip), "diff" (favour moving parts) or "single"
+            (a new palette per frame; always one pass, never cached)
+        max_colors: Palette size (2-256)
+        loop: GIF loop count (0 loops forever, -1 plays once)
+        start_time: Start timestamp (HH:MM:SS or seconds)
+        end_time: End timestamp (absolute)
+        duration: Length of the range (alternative to end_time)
+        segments: Build the palette from this many slices in parallel (0 = one per CPU)
+        cache_palette: Reuse/store the palette in the vidtools cache
+        cache: Output cache for the final render (None defers to $VIDTOOLS_CACHE)
+    """
+    from .seek import plan_seek
+
+    if dither not in DITHERS:
+        raise ValueError(f"unknown dither {dither!r}; choose from {', '.join(DITHERS)}")
+    if stats_mode not in STATS_MODES:
+        raise ValueError(f"unknown stats_mode {stats_mode!r}; choose from {', '.join(STATS_MODES)}")
+
+    seek = plan_seek(input_file, start_time, end_time, duration)
+    command = ["ffmpeg", *seek.input_args, "-i", input_file]
+    if stats_mode == "single":
+        # A palette per frame only exists inside the one graph that uses it
+        command += [*seek.output_args, "-vf",
+                    one_pass_filter(fps, width, dither, bayer_scale, stats_mode, max_colors)]
+    else:
+        start = parse_time(start_time) or 0.0
+        palette = make_palette(input_file, start, seek.duration, fps, width, stats_mode,
+                               max_colors, segments, use_cache=cache_palette)
+        logger.info("GIF palette", palette=palette, start=format_time(start),
+                    duration=seek.duration)
+        command += ["-i", palette, *seek.output_args, "-lavfi",
+                    f"[0:v]{frame_filter(fps, width)}[x];[x][1:v]"
+                    f"{_paletteuse(dither, bayer_scale, stats_mode)}"]
+    command += ["-loop", str(loop), output_file]
+    try:
+        run_ffmpeg_command(command, cache=cache)
+    finally:
+        if stats_mode != "single" and not cache_palette:
+            shutil.rmtree(os.path.dirname(palette), ignore_errors=True)
@@ -0,0 +1,214 @@
+"""Resource governor shared by every ffmpeg process vidtools starts.
+
+Left alone, each libx264/libx265 process sizes its thread pools for the
+whole machine, so eight concurrent encodes run eight times as many threads
+as there are cores and spend their time contending.  The governor divides
+a CPU budget evenly over the jobs running at once and passes each job its
+share as ``-threads`` (decoder and encoder), ``-filter_threads`` /
+``-filter_complex_threads`` and, for x265, ``pools``.  Commands with
+several outputs split the encoder share between them.  It can also start
+every ffmpeg under ``nice``, ``ionice`` and ``prlimit --as`` so a farm of
+encodes neither starves the host nor takes it down when one job balloons.
+
+Configuration comes from the environment or configure():
+
+    VIDTOOLS_CPU_BUDGET      threads to share across concurrent jobs (default: CPU count)
+    VIDTOOLS_NICE            niceness for ffmpeg, e.g. 10
+    VIDTOOLS_IONICE          ``idle`` or ``best-effort[:0-7]``
+    VIDTOOLS_MEMORY_LIMIT    address-space cap per ffmpeg, e.g. 4G
+
+With nothing configured and a single job running, commands are unchanged.
+"""
+
+import os
+import shutil
+import threading
+from typing import List, Optional
+
+from .utils import logger
+
+
+class Governor:
+    """CPU budget and process limits applied to ffmpeg commands."""
+
+    __slots__ = ("cpu_budget", "nice", "ionice", "memory_limit", "_active", "_lock", "_warned")
+
+    def __init__(self, cpu_budget: Optional[int] = None, nice: Optional[int] = None,
+                 ionice: Optional[str] = None, memory_limit: Optional[int] = None):
+        self.cpu_budget = cpu_budget
+        self.nice = nice
+        self.ionice = ionice
+        self.memory_limit = memory_limit
+        self._active = 0
+        self._lock = threading.Lock()
+        self._warned = set()
+
+    @classmethod
+    def from_env(cls) -> "Governor":
+        from .cache import parse_size
+
+        budget = os.environ.get("VIDTOOLS_CPU_BUDGET")
+        nice = os.environ.get("VIDTOOLS_NICE")
+        memory = os.environ.get("VIDTOOLS_MEMORY_LIMIT")
+        return cls(
+            cpu_budget=int(budget) if budget else None,
+            nice=int(nice) if nice else None,
+            ionice=os.environ.get("VIDTOOLS_IONICE") or None,
+            memory_limit=parse_size(memory) if memory else None,
+        )
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def acquire(self) -> int:
+        """Register a starting job; returns the number of jobs now running."""
+        with self._lock:
+            self._active += 1
+            return self._active
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    def threads_for(self, concurrency: int) -> Optional[int]:
+        """Threads one job gets when ``concurrency`` jobs share the budget (None: ffmpeg's default)."""
+        if self.cpu_budget is None and concurrency <= 1:
+            return None
+        budget = self.cpu_budget or os.cpu_count() or 1
+        return max(1, budget // max(1, concurrency))
+
+    def apply(self, command: List[str], concurrency: int) -> List[str]:
+        """Return command with thread limits for its share of the budget and the process prefix."""
+        threads = self.threads_for(concurrency)
+        if threads is not None and "-threads" not in command:
+            command = thread_args(command, threads)
+        return self._prefix() + command
+
+    def _prefix(self) -> List[str]:
+        prefix = []
+        if self.memory_limit and self._have("prlimit"):
+            prefix += ["prlimit", f"--as={self.memory_limit}", "--"]
+        if self.ionice and self._have("ionice"):
+            kind, _, level = self.ionice.partition(":")
+            if kind == "idle":
+                prefix += ["ionice", "-c", "3"]
+            else:
+                prefix += ["ionice", "-c", "2", "-n", level or "7"]
+        if self.nice is not None and self._have("nice"):
+            prefix += ["nice", "-n", str(self.nice)]
+        return prefix
+
+    def _have(self, tool: str) -> bool:
+        if shutil.which(tool):
+            return True
+        if tool not in self._warned:
+            self._warned.add(tool)
+            logger.warning("Resource limit tool not found; limit not applied", tool=tool)
+        return False
+
+    def __repr__(self):
+        return (f"<Governor budget={self.cpu_budget} nice={self.nice} ionice={self.ionice} "
+                f"memory_limit={self.memory_limit} active={self._active}>")
+
+
+# Options that take no value, so the next item may be an output
+_FLAG_OPTIONS = frozenset({
+    "-an", "-vn", "-sn", "-dn", "-y", "-n", "-nostdin", "-stats", "-nostats", "-hide_banner",
+    "-shortest", "-copyts", "-start_at_zero", "-accurate_seek", "-noaccurate_seek",
+})
+
+
+def output_positions(command: List[str]) -> List[int]:
+    """Indices of the output files in an ffmpeg argv (the non-option items after the last -i)."""
+    last_input = max((i for i, arg in enumerate(command) if arg == "-i"), default=-1)
+    positions = []
+    i = last_input + 2 if last_input >= 0 else 1
+    while i < len(command):
+        arg = command[i]
+        if arg in _FLAG_OPTIONS:
+            i += 1
+        elif arg.startswith("-") and arg != "-":
+            i += 2
+        else:
+            positions.append(i)
+            i += 1
+    return positions or [len(command) - 1]
+
+
+def _encodes_video(args: List[str]) -> bool:
+    """False for an output's options that drop, leave unmapped or stream-copy the video."""
+    maps = [value for flag, value in zip(args, args[1:]) if flag == "-map"]
+    if "-vn" in args or (maps and all(":a" in m for m in maps)):
+        return False
+    return not any(flag in ("-c", "-c:v", "-codec:v", "-vcodec") and value == "copy"
+                   for flag, value in zip(args, args[1:]))
+
+
+def thread_args(command: List[str], threads: int) -> List[str]:
+    """Insert thread limits into an ffmpeg argv (argv[0] is ffmpeg).
+
+    Decoding and filtering get ``threads``; every output gets its own
+    ``-threads`` (and x265 ``pools``) with the budget split evenly over the
+    outputs that encode video, so a multi-output command stays within it.
+    """
+    head = [command[0], "-filter_threads", str(threads)]
+    if "-filter_complex" in command:
+        head += ["-filter_complex_threads", str(threads)]
+    outputs = output_positions(command)
+    last_input = max((i for i, arg in enumerate(command) if arg == "-i"), default=-1)
+    start = last_input + 2 if last_input >= 0 else 1
+    inputs = list(command[1:start])
+    if "-i" in inputs:
+        # Decoder threads: an input option, so it goes before the first -i
+        inputs.insert(inputs.index("-i"), "-threads")
+        inputs.insert(inputs.index("-i"), str(threads))
+
+    segments = []
+    for position in outputs:
+        segments.append((list(command[start:position]), command[position]))
+        start = position + 1
+    encoders = sum(1 for args, _ in segments if _encodes_video(args))
+    per_output = max(1, threads // max(1, encoders))
+    body = []
+    for args, output in segments:
+        if "libx265" in args:
+            _merge_params(args, "-x265-params", f"pools={per_output}")
+        body += [*args, "-threads", str(per_output), output]
+    return head + inputs + body + list(command[start:])
+
+
+def _merge_params(args: List[str], flag: str, param: str) -> None:
+    if flag in args:
+        i = args.index(flag) + 1
+        args[i] = f"{args[i]}:{param}"
+    else:
+        args += [flag, param]
+
+
+_governor: Optional[Governor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> Governor:
+    """The process-wide governor, created from the environment on first use."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = Governor.from_env()
+        return _governor
+
+
+def configure(cpu_budget: Optional[int] = None, nice: Optional[int] = None,
+              ionice: Optional[str] = None, memory_limit: Optional[int] = None) -> Governor:
+    """Override the environment settings; arguments left as None keep their current value."""
+    governor = get_governor()
+    if cpu_budget is not None:
+        governor.cpu_budget = cpu_budget
+    if nice is not None:
+        governor.nice = nice
+    if ionice is not None:
+        governor.ionice = ionice
+    if memory_limit is not None:
+        governor.memory_limit = memory_limit
+    return governor
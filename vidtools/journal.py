@@ -0,0 +1,121 @@
+"""Append-only JSONL job journal used to resume interrupted batch runs.
+
+Every batch job writes a ``running`` record before ffmpeg starts and a
+``done`` or ``failed`` record when it finishes.  The last record for a key
+wins, so loading the journal is a single pass into a dict and checking a
+file on ``--resume`` is an O(1) lookup plus two ``os.stat`` calls.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .utils import logger
+
+JOURNAL_NAME = ".vidtools-journal.jsonl"
+
+
+def file_fingerprint(path: str) -> Optional[Dict[str, int]]:
+    """Return a cheap (size, mtime_ns) fingerprint, or None if the file is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def job_key(operation: str, input_file: str, output_file: str,
+            params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for one job; changing any parameter makes it a new job."""
+    payload = json.dumps(
+        [operation, os.path.abspath(input_file), os.path.abspath(output_file), params or {}],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def default_journal_path(output_dir: Optional[str], output_files: Sequence[str] = ()) -> str:
+    """Journal lives with the outputs: in output_dir, or else their common directory."""
+    if output_dir:
+        return os.path.join(output_dir, JOURNAL_NAME)
+    parents = [os.path.dirname(os.path.abspath(path)) for path in output_files]
+    return os.path.join(os.path.commonpath(parents) if parents else os.getcwd(), JOURNAL_NAME)
+
+
+class Journal:
+    """Thread-safe append-only journal of batch job states."""
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if resume:
+            self._load()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        # Only --resume consults earlier records, but every run appends so
+        # batches of different operations can share one output directory.
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash is expected; ignore it.
+                        continue
+                    self._entries[record["key"]] = record
+        except FileNotFoundError:
+            return
+        logger.debug("Journal loaded", file=self.path, entries=len(self._entries))
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_entry(self, key: str) -> bool:
+        return key in self._entries
+
+    def is_complete(self, key: str, input_file: str, output_file: str) -> bool:
+        """True if the journal says this job finished and nothing changed since."""
+        record = self._entries.get(key)
+        if not record or record.get("state") != "done":
+            return False
+        return (record.get("input_fp") == file_fingerprint(input_file)
+                and record.get("output_fp") == file_fingerprint(output_file))
+
+    def record(self, key: str, state: str, input_file: str, output_file: str,
+               argv: Optional[List[List[str]]] = None, error: Optional[str] = None,
+               params: Optional[Dict[str, Any]] = None) -> None:
+        entry: Dict[str, Any] = {
+            "key": key,
+            "state": state,
+            "time": time.time(),
+            "input": input_file,
+            "output": output_file,
+            "input_fp": file_fingerprint(input_file),
+        }
+        if params:
+            entry["params"] = params
+        if argv:
+            entry["argv"] = argv
+        if state == "done":
+            entry["output_fp"] = file_fingerprint(output_file)
+        if error:
+            entry["error"] = error
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._entries[key] = entry
+            self._fh.write(line)
+            self._fh.flush()
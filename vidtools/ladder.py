@@ -0,0 +1,112 @@
+"""Single-decode multi-rendition output (an encoding ladder).
+
+encode_renditions() builds one ffmpeg command whose filter_complex splits
+the decoded video once and gives every rendition its own branch of
+filters and its own encoder:
+
+    [0:v:0]split=3[v0][v1][v2];
+    [v0]scale=...[o0]; [v1]scale=...[o1]; [v2]scale=...[o2]
+
+so the source is read and decoded a single time however many outputs are
+produced.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from .utils import run_ffmpeg_command
+
+
+class Rendition:
+    """One output of a ladder: optional per-branch filters plus encoder arguments.
+
+    ``video_args`` may contain a ``-vf`` chain (as the gif settings do); it is
+    moved into the rendition's filter_complex branch.  ``-vn`` in
+    ``video_args`` makes an audio-only rendition.
+    """
+
+    __slots__ = ("output_file", "filters", "video_args", "audio_args")
+
+    def __init__(self, output_file: str, filters: Optional[str] = None,
+                 video_args: Optional[List[str]] = None, audio_args: Optional[List[str]] = None):
+        self.output_file = output_file
+        self.filters = filters
+        self.video_args = list(video_args or [])
+        self.audio_args = list(audio_args or [])
+
+    @property
+    def has_video(self) -> bool:
+        return "-vn" not in self.video_args
+
+    def __repr__(self):
+        return f"<Rendition {self.output_file!r} filters={self.filters!r}>"
+
+
+def scale_filter(height: int, algorithm: str = "lanczos") -> str:
+    """Scale to height (never upscaling), keeping the aspect ratio with an even width."""
+    return f"scale=-2:'min(ih,{int(height)})':flags={algorithm}"
+
+
+def _branch_chain(rendition: Rendition, index: int) -> Tuple[str, List[str]]:
+    """Return (filter chain, remaining video args) for one rendition's branch.
+
+    The rendition's filters and any ``-vf`` from its encoder args become a
+    single chain.
+    """
+    parts = [rendition.filters] if rendition.filters else []
+    args = rendition.video_args
+    if "-vf" in args:
+        i = args.index("-vf")
+        # Labels inside the chain (e.g. the gif palette split) must be unique
+        # across branches of the shared graph.
+        parts.append(re.sub(r"\[(\w+)\]", rf"[r{index}_\1]", args[i + 1]))
+        args = args[:i] + args[i + 2:]
+    return ",".join(parts) or "null", args
+
+
+def build_ladder_command(input_file: str, renditions: List[Rendition],
+                         input_args: Optional[List[str]] = None,
+                         output_args: Optional[List[str]] = None) -> List[str]:
+    """Return the ffmpeg argv producing every rendition from one decode.
+
+    ``input_args``/``output_args`` come from a SeekPlan and are applied to
+    the input and to every output respectively.
+    """
+    video_outputs = [r for r in renditions if r.has_video]
+    command = ["ffmpeg", *(input_args or []), "-i", input_file]
+
+    labels, branch_args = {}, {}
+    if video_outputs:
+        graph = []
+        if len(video_outputs) > 1:
+            splits = "".join(f"[v{i}]" for i in range(len(video_outputs)))
+            graph.append(f"[0:v:0]split={len(video_outputs)}{splits}")
+        for i, r in enumerate(video_outputs):
+            chain, branch_args[id(r)] = _branch_chain(r, i)
+            source = f"[v{i}]" if len(video_outputs) > 1 else "[0:v:0]"
+            graph.append(f"{source}{chain}[o{i}]")
+            labels[id(r)] = f"[o{i}]"
+        command += ["-filter_complex", ";".join(graph)]
+
+    for r in renditions:
+        if r.has_video:
+            command += ["-map", labels[id(r)]]
+            video_args = branch_args[id(r)]
+        else:
+            video_args = [a for a in r.video_args if a != "-vn"]
+        if r.audio_args:
+            command += ["-map", "0:a:0?"]
+        command += [*(output_args or []), *video_args, *r.audio_args]
+        if r.output_file.lower().endswith(".mp4"):
+            command += ["-movflags", "+faststart"]
+        command.append(r.output_file)
+    return command
+
+
+def encode_renditions(input_file: str, renditions: List[Rendition], start_time=None,
+                      end_time=None, duration=None) -> None:
+    """Produce every rendition of input_file with a single ffmpeg run."""
+    from .seek import plan_seek
+
+    seek = plan_seek(input_file, start_time, end_time, duration)
+    run_ffmpeg_command(build_ladder_command(input_file, renditions, seek.input_args, seek.output_args))
@@ -0,0 +1,135 @@
+"""Rotate and crop without re-encoding.
+
+Both operations can be expressed as metadata instead of new pixels:
+
+* rotation is the display matrix of the video track.  With ``-c copy`` and
+  ``-display_rotation`` (ffmpeg 6.1+) only the container header changes;
+  players rotate on playback, as they already do for phone footage.
+* cropping an H.264/HEVC stream is the frame-cropping window of its
+  SPS (the same field that turns a coded 1088-line picture into 1080p).
+  The ``h264_metadata``/``hevc_metadata`` bitstream filters rewrite it
+  while copying, so decoders output only the cropped region.
+
+Each function returns False (after logging why) when the source cannot be
+handled losslessly, so the caller can fall back to a re-encode.
+"""
+
+from typing import Optional, Tuple
+
+from .utils import logger, run_ffmpeg_command
+
+# Codecs whose crop window can be rewritten, and the bitstream filter doing it
+CROP_BSFS = {"h264": "h264_metadata", "hevc": "hevc_metadata"}
+
+# Containers that store a display matrix for the video track
+ROTATION_CONTAINERS = (".mp4", ".m4v", ".mov")
+
+# First ffmpeg release with -display_rotation
+DISPLAY_ROTATION_VERSION = (6, 1)
+
+
+def _crop_units(pix_fmt: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Granularity (horizontal, vertical) of the crop window for a pixel format."""
+    if not pix_fmt:
+        return None
+    if pix_fmt.startswith(("yuv420", "yuvj420", "nv12", "nv21", "p010", "p016")):
+        return 2, 2
+    if pix_fmt.startswith(("yuv422", "yuvj422", "nv16")):
+        return 2, 1
+    if pix_fmt.startswith(("yuv444", "yuvj444", "gray", "gbr")):
+        return 1, 1
+    return None
+
+
+def crop_filter(info, width, height, x=0, y=0) -> Tuple[Optional[str], Optional[str]]:
+    """Bitstream filter that crops the first video stream of info to width x height at (x, y).
+
+    Returns:
+        (bsf, None) when the crop can be done losslessly, else (None, reason)
+    """
+    video = info.video
+    if video is None:
+        return None, "no video stream"
+    bsf = CROP_BSFS.get(video.codec_name)
+    if bsf is None:
+        return None, f"{video.codec_name} has no crop window (only h264 and hevc do)"
+    if video.rotation:
+        return None, "source has a display rotation"
+    try:
+        width, height, x, y = int(width), int(height), int(x), int(y)
+    except (TypeError, ValueError):
+        return None, "crop size is an expression, not pixels"
+    if min(width, height) <= 0 or min(x, y) < 0 or x + width > video.width \
+            or y + height > video.height:
+        return None, (f"crop {width}x{height}+{x}+{y} is outside the "
+                      f"{video.width}x{video.height} frame")
+    if not video.coded_width or not video.coded_height:
+        return None, "coded size unknown, so the existing crop window is too"
+    units = _crop_units(video.pix_fmt)
+    if units is None:
+        return None, f"unknown pixel format {video.pix_fmt}"
+    unit_x, unit_y = units
+    if video.field_order not in (None, "unknown", "progressive"):
+        unit_y *= 2  # crop rows are counted per field pair
+
+    # The stream's own window (e.g. 1088 -> 1080) is kept on the right and bottom
+    left, top = x, y
+    right = (video.coded_width - video.width) + (video.width - x - width)
+    bottom = (video.coded_height - video.height) + (video.height - y - height)
+    if left % unit_x or right % unit_x or top % unit_y or bottom % unit_y:
+        return None, (f"{video.pix_fmt} can only be cropped in steps of {unit_x}x{unit_y} "
+                      "pixels")
+    return (f"{bsf}=crop_left={left}:crop_right={right}:crop_top={top}:crop_bottom={bottom}",
+            None)
+
+
+def _copy_command(input_file, output_file, input_args=(), output_args=()):
+    # Every track is kept: only the first video stream's metadata changes
+    command = ["ffmpeg", *input_args, "-i", input_file, "-map", "0", "-c", "copy", *output_args]
+    if output_file.lower().endswith((".mp4", ".m4v", ".mov")):
+        command.extend(["-movflags", "+faststart"])
+    command.append(output_file)
+    return command
+
+
+def rotate_video_lossless(input_file, output_file, rotation) -> bool:
+    """Rotate clockwise by setting the display matrix; False if a re-encode is needed."""
+    from .capabilities import get_capabilities
+    from .probe import probe
+
+    if not output_file.lower().endswith(ROTATION_CONTAINERS):
+        logger.warning("Lossless rotation needs an mp4/mov output; re-encoding", output=output_file)
+        return False
+    caps = get_capabilities()
+    version = caps.version_info if caps else None
+    if version is not None and version < DISPLAY_ROTATION_VERSION:
+        logger.warning("Lossless rotation needs ffmpeg 6.1 or newer; re-encoding",
+                       version=caps.version)
+        return False
+    video = probe(input_file).video
+    if video is None:
+        logger.warning("No video stream to rotate; re-encoding", input=input_file)
+        return False
+    # The display matrix is counter-clockwise and replaces any rotation already there
+    angle = (round(video.rotation or 0) - int(rotation)) % 360
+    if angle > 180:
+        angle -= 360
+    command = _copy_command(input_file, output_file,
+                            input_args=["-display_rotation:v:0", str(angle)])
+    logger.info("Rotating without re-encoding", rotation=rotation, display_rotation=angle)
+    run_ffmpeg_command(command)
+    return True
+
+
+def crop_video_lossless(input_file, output_file, width, height, x=0, y=0) -> bool:
+    """Crop by rewriting the H.264/HEVC crop window; False if a re-encode is needed."""
+    from .probe import probe
+
+    bsf, reason = crop_filter(probe(input_file), width, height, x, y)
+    if bsf is None:
+        logger.warning("Cannot crop losslessly; re-encoding", reason=reason)
+        return False
+    command = _copy_command(input_file, output_file, output_args=["-bsf:v:0", bsf])
+    logger.info("Cropping without re-encoding", bsf=bsf)
+    run_ffmpeg_command(command)
+    return True
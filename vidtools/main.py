@@ -9,20 +9,17 @@ from typing import Sequence
 from .utils import run_ffmpeg_command, check_ffmpeg_installed, logger
 from . import presets
 
-# re-export presets for CLI help
-PRESETS = presets.get_presets()
-
 save_presets_command = presets.save_preset_command
 delete_preset_command = presets.delete_preset
 edit_preset_command = presets.edit_preset_command
 list_presets_command = presets.list_presets
 
-# Re-export presets for cli and main access. Consider if direct import from presets.py in cli is better
-PRESETS = presets.get_presets()
-save_presets_command = presets.save_preset_command
-delete_preset_command = presets.delete_preset
-edit_preset_command = presets.edit_preset_command
-list_presets_command = presets.list_presets # Direct function access
+
+def __getattr__(name):
+    # PRESETS used to be read from disk at import time; it is now read on access
+    if name == "PRESETS":
+        return presets.get_presets()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- FFmpeg Function Wrappers (Orchestrators) ---
@@ -34,11 +31,14 @@ def resize_video_handler(args):
     algorithm = args.algorithm
     input_file = args.input
     output_file = args.output
-    resize_video(input_file, output_file, percentage=percentage, width=width, height=height, algorithm=algorithm)
+    cache = True if getattr(args, 'cache', False) else None
+    resize_video(input_file, output_file, percentage=percentage, width=width, height=height, algorithm=algorithm,
+                 cache=cache)
 
 def convert_format_handler(args):
     input_file = args.input
-    output_file = args.output
+    output_files = args.output if isinstance(args.output, list) else [args.output]
+    output_file = output_files[0]
 
     # Auto-detect format from output extension if not specified
     format_type = args.format if hasattr(args, 'format') and args.format else None
@@ -57,10 +57,24 @@ def convert_format_handler(args):
     start_time = args.start_time if hasattr(args, 'start_time') else None
     end_time = args.end_time if hasattr(args, 'end_time') else None
     duration = args.duration if hasattr(args, 'duration') else None
+    cache = True if getattr(args, 'cache', False) else None
+    chunks = getattr(args, 'chunked', None)
+    ladder = getattr(args, 'ladder', None)
+    auto_copy = not getattr(args, 'no_auto_copy', False)
+
+    if ladder or len(output_files) > 1:
+        convert_renditions(input_file, output_files, heights=ladder,
+                           format_type=args.format if getattr(args, 'format', None) else None,
+                           video_codec=video_codec, audio_codec=audio_codec,
+                           video_bitrate=video_bitrate, audio_bitrate=audio_bitrate,
+                           quality_scale=quality_scale, preset=preset, start_time=start_time,
+                           end_time=end_time, duration=duration)
+        return
 
     convert_format(input_file, output_file, format_type, video_codec, audio_codec,
                    video_bitrate, audio_bitrate, quality_scale, start_time, end_time,
-                   duration, preset=preset, use_copy=use_copy)
+                   duration, preset=preset, use_copy=use_copy, cache=cache, chunks=chunks,
+                   auto_copy=auto_copy)
 
 def extract_audio_handler(args):
     input_file = args.input
@@ -82,11 +96,20 @@ def extract_frames_handler(args):
     extract_frames(input_file, output_pattern, frame_rate, image_format, start_time, end_time, duration)
 
 def concatenate_videos_handler(args):
-    input_files = args.inputs
+    input_files = list(args.inputs)
+    if getattr(args, 'from_file', None):
+        with open(args.from_file, encoding='utf-8') as f:
+            input_files.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not input_files:
+        print("Error: no input files given")
+        sys.exit(1)
     output_file = args.output
     use_copy = args.copy if hasattr(args, 'copy') else True
     reencode = args.reencode if hasattr(args, 'reencode') else False
-    concatenate_videos(input_files, output_file, use_copy=use_copy and not reencode)
+    normalize = getattr(args, 'normalize', False)
+    concatenate_videos(input_files, output_file, use_copy=use_copy and not reencode,
+                       normalize=normalize and not reencode, jobs=getattr(args, 'jobs', None),
+                       fanout=getattr(args, 'fanout', None))
 
 def crop_video_handler(args):
     input_file = args.input
@@ -95,11 +118,26 @@ def crop_video_handler(args):
     height = args.height
     x = args.x
     y = args.y
-    crop_video(input_file, output_file, width, height, x, y)
+    crop_video(input_file, output_file, width, height, x, y, lossless=args.lossless)
 
 def get_video_info_handler(args):
-    input_file = args.input
-    get_video_info(input_file)
+    inputs = args.inputs
+    output_format = args.format or ("json" if args.json else "text")
+    single = len(inputs) == 1 and os.path.isfile(inputs[0])
+    if single and output_format == "text":
+        get_video_info(inputs[0])
+        return
+    if single and output_format == "json":
+        from .probe import probe
+
+        print(json.dumps(probe(inputs[0]).raw, indent=2))
+        return
+    if output_format == "json":
+        output_format = "jsonl"  # one object per line for many files
+    extensions = None if args.all_files else MEDIA_EXTENSIONS
+    failed = inventory_videos(inputs, output_format, jobs=args.jobs, extensions=extensions)
+    if failed:
+        sys.exit(1)
 
 def add_subtitles_handler(args):
     input_file = args.input
@@ -111,13 +149,14 @@ def rotate_video_handler(args):
     input_file = args.input
     output_file = args.output
     rotation = args.rotation
-    rotate_video(input_file, output_file, rotation)
+    rotate_video(input_file, output_file, rotation, lossless=args.lossless)
 
 def apply_preset_handler(args):
     input_file = args.input
     output_file = args.output
     preset_name = args.name if hasattr(args, 'name') else args.preset_name
-    apply_preset(input_file, output_file, preset_name)
+    cache = True if getattr(args, 'cache', False) else None
+    apply_preset(input_file, output_file, preset_name, cache=cache)
 
 def cut_video_handler(args):
     """Handler for the cut command with ffmpeg best practices."""
@@ -132,10 +171,53 @@ def cut_video_handler(args):
     video_codec = args.video_codec
     audio_codec = args.audio_codec
     crf = args.crf
+    smart = args.smart
+
+    if args.edl:
+        from .edl import cut_ranges, load_edl
+
+        if start_time or end_time or duration:
+            print("Error: --edl cannot be combined with --start/--end/--duration")
+            sys.exit(1)
+        if smart or fix_sync or fast_seek:
+            print("Error: --edl cannot be combined with --smart/--fix-sync/--fast-seek")
+            sys.exit(1)
+        try:
+            ranges = load_edl(args.edl)
+        except (OSError, ValueError) as e:
+            print(f"Error reading edit list {args.edl}: {e}")
+            sys.exit(1)
+        outputs = cut_ranges(input_file, ranges, output_file, use_copy=use_copy,
+                             video_codec=video_codec, audio_codec=audio_codec, crf=crf,
+                             max_gap=args.group_gap)
+        print(f"Cut {len(outputs)} clips into {output_file}")
+        return
 
     cut_video(input_file, output_file, start_time=start_time, end_time=end_time,
               duration=duration, use_copy=use_copy, fast_seek=fast_seek,
-              fix_sync=fix_sync, video_codec=video_codec, audio_codec=audio_codec, crf=crf)
+              fix_sync=fix_sync, video_codec=video_codec, audio_codec=audio_codec, crf=crf,
+              smart=smart)
+
+def cache_stats_handler(args):
+    from . import cache as output_cache
+
+    info = output_cache.stats()
+    print(f"Cache directory: {info['directory']}")
+    print(f"Entries:         {info['entries']}")
+    print(f"Size:            {output_cache.format_size(info['size'])}"
+          f" / {output_cache.format_size(info['max_size'])}")
+
+def cache_prune_handler(args):
+    from . import cache as output_cache
+
+    if args.all:
+        max_size = 0
+    elif args.max_size:
+        max_size = output_cache.parse_size(args.max_size)
+    else:
+        max_size = output_cache.max_cache_size()
+    removed, freed = output_cache.prune(max_size)
+    print(f"Removed {removed} cached outputs ({output_cache.format_size(freed)} freed)")
 
 def list_presets_handler(args): # args not used in list_presets
     list_presets_command() # Call the command function from presets.py
@@ -152,7 +234,7 @@ def edit_preset_handler(args):
 
 def cut_video(input_file, output_file, start_time=None, end_time=None, duration=None,
               use_copy=True, fast_seek=False, fix_sync=False,
-              video_codec=None, audio_codec=None, crf=None):
+              video_codec=None, audio_codec=None, crf=None, smart=False):
     """Cut/trim video following ffmpeg best practices.
 
     Args:
@@ -162,29 +244,30 @@ def cut_video(input_file, output_file, start_time=None, end_time=None, duration=
         end_time: End timestamp (absolute time)
         duration: Duration from start (alternative to end_time)
         use_copy: Use stream copy for speed (no re-encoding)
-        fast_seek: Place -ss before input (faster but less accurate)
+        fast_seek: Only seek the input (skip the fine output seek when re-encoding)
         fix_sync: Add -async 1 to fix audio sync issues
         video_codec: Video codec for re-encoding
         audio_codec: Audio codec for re-encoding
         crf: Quality for re-encoding
+        smart: Frame-accurate cut that re-encodes only the partial GOPs at
+            either end and stream-copies the rest (falls back to a full
+            re-encode when the codec cannot be spliced)
     """
-    command = ["ffmpeg"]
+    from .seek import plan_seek
 
-    # Fast seek (before input) - less accurate but faster
-    if fast_seek and start_time:
-        command.extend(["-ss", str(start_time)])
+    if smart:
+        from .segments import smart_cut
 
-    command.extend(["-i", input_file])
+        if smart_cut(input_file, output_file, start_time, end_time, duration, crf=crf):
+            return
+        use_copy = False
 
-    # Accurate seek (after input) - more accurate but slower initial seek
-    if not fast_seek and start_time:
-        command.extend(["-ss", str(start_time)])
+    # Stream copy can only start on a keyframe, so a single input seek is all
+    # it needs; re-encodes seek to the preceding keyframe, then fine-seek.
+    seek = plan_seek(input_file, start_time, end_time, duration,
+                     accurate=not use_copy and not fast_seek)
 
-    # End time or duration
-    if end_time:
-        command.extend(["-to", str(end_time)])
-    elif duration:
-        command.extend(["-t", str(duration)])
+    command = ["ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args]
 
     # Codec settings
     if use_copy:
@@ -218,8 +301,12 @@ def cut_video(input_file, output_file, start_time=None, end_time=None, duration=
     command.append(output_file)
     run_ffmpeg_command(command)
 
-def resize_video(input_file, output_file, percentage=None, width=None, height=None, algorithm="lanczos"):
-    """Resizes a video using ffmpeg scale filter with proper aspect ratio handling."""
+def resize_video(input_file, output_file, percentage=None, width=None, height=None, algorithm="lanczos",
+                 cache=None):
+    """Resizes a video using ffmpeg scale filter with proper aspect ratio handling.
+
+    ``cache`` enables the output cache (None defers to $VIDTOOLS_CACHE).
+    """
     if percentage:
         scale_filter = f"scale=iw*{percentage}:ih*{percentage}:flags={algorithm}"
     elif width and height:
@@ -245,99 +332,191 @@ def resize_video(input_file, output_file, percentage=None, width=None, height=No
         command.extend(["-movflags", "+faststart"])
 
     command.append(output_file)
-    run_ffmpeg_command(command)
-
-def convert_format(input_file, output_file, format_type, video_codec=None, audio_codec=None,
-                   video_bitrate=None, audio_bitrate=None, quality_scale=None,
-                   start_time=None, end_time=None, duration=None, preset=None, use_copy=False):
-    """Converts video format using ffmpeg with optimized settings."""
-    command = ["ffmpeg"]
-
-    # Time range before input for faster seeking if specified
-    if start_time and use_copy:
-        command.extend(["-ss", str(start_time)])
-
-    command.extend(["-i", input_file])
-
-    # Time range after input for accuracy if not using copy
-    if start_time and not use_copy:
-        command.extend(["-ss", str(start_time)])
-    if end_time:
-        command.extend(["-to", str(end_time)])
-    if duration:
-        command.extend(["-t", str(duration)])
+    run_ffmpeg_command(command, cache=cache)
 
+def _convert_codec_args(format_type, video_codec=None, audio_codec=None, video_bitrate=None,
+                        audio_bitrate=None, quality_scale=None, preset=None, use_copy=False):
+    """Return (video_args, audio_args) for convert_format's target format."""
+    video_args, audio_args = [], []
     if use_copy and not video_codec and not audio_codec:
         # Stream copy when possible
-        command.extend(["-c", "copy"])
+        video_args.extend(["-c", "copy"])
     elif format_type == "gif":
-        # Optimized GIF creation with palette
-        command.extend(["-vf", "fps=10,scale=320:-1:flags=lanczos,split[s0][s1];[s0]palettegen[p];[s1][p]paletteuse"])
+        # Optimized GIF creation with palette (in one graph; convert_format uses vidtools.gif)
+        from .gif import one_pass_filter
+
+        video_args.extend(["-vf", one_pass_filter()])
     elif format_type == "mp3":
-        command.extend(["-vn"])  # No video
-        command.extend(["-c:a", audio_codec or "libmp3lame"])
-        command.extend(["-b:a", audio_bitrate or "192k"])
-        command.extend(["-ar", "44100"])
+        video_args.extend(["-vn"])  # No video
+        audio_args.extend(["-c:a", audio_codec or "libmp3lame"])
+        audio_args.extend(["-b:a", audio_bitrate or "192k"])
+        audio_args.extend(["-ar", "44100"])
     elif format_type == "webm":
-        command.extend(["-c:v", video_codec or "libvpx-vp9"])
-        command.extend(["-crf", quality_scale or "30"])
-        command.extend(["-b:v", video_bitrate or "0"])
-        command.extend(["-c:a", audio_codec or "libopus"])
-        command.extend(["-b:a", audio_bitrate or "128k"])
+        video_args.extend(["-c:v", video_codec or "libvpx-vp9"])
+        video_args.extend(["-crf", quality_scale or "30"])
+        video_args.extend(["-b:v", video_bitrate or "0"])
+        audio_args.extend(["-c:a", audio_codec or "libopus"])
+        audio_args.extend(["-b:a", audio_bitrate or "128k"])
     elif format_type == "avi":
-        command.extend(["-c:v", video_codec or "libxvid"])
-        command.extend(["-qscale:v", quality_scale or "5"])
-        command.extend(["-c:a", audio_codec or "libmp3lame"])
+        video_args.extend(["-c:v", video_codec or "libxvid"])
+        video_args.extend(["-qscale:v", quality_scale or "5"])
+        audio_args.extend(["-c:a", audio_codec or "libmp3lame"])
     else:  # Default settings for MP4 and others
         if video_codec:
-            command.extend(["-c:v", video_codec])
+            video_args.extend(["-c:v", video_codec])
         elif not use_copy:
-            command.extend(["-c:v", "libx264"])  # Default to H.264
+            video_args.extend(["-c:v", "libx264"])  # Default to H.264
 
         if audio_codec:
-            command.extend(["-c:a", audio_codec])
+            audio_args.extend(["-c:a", audio_codec])
         elif not use_copy:
-            command.extend(["-c:a", "aac"])  # Default to AAC
+            audio_args.extend(["-c:a", "aac"])  # Default to AAC
 
         if video_bitrate:
-            command.extend(["-b:v", video_bitrate])
+            video_args.extend(["-b:v", video_bitrate])
         if audio_bitrate:
-            command.extend(["-b:a", audio_bitrate])
+            audio_args.extend(["-b:a", audio_bitrate])
 
         # Quality settings
         if quality_scale:
-            command.extend(["-crf", str(quality_scale)])
+            video_args.extend(["-crf", str(quality_scale)])
         elif not use_copy and not video_bitrate:
-            command.extend(["-crf", "23"])  # Default quality
+            video_args.extend(["-crf", "23"])  # Default quality
 
     # Encoding preset for speed vs compression trade-off
     if preset and not use_copy:
-        command.extend(["-preset", preset])
+        video_args.extend(["-preset", preset])
+    return video_args, audio_args
+
+def _resize_codec_args(output_file):
+    """Return (video_args, audio_args) for a resize preset rendition.
+
+    A rendition shares its ffmpeg command with the others, so its encoder is
+    spelled out: the output format's default encoder and quality.  The
+    audio is copied, as resize_video does.
+    """
+    format_type = _format_of(output_file)
+    video_args = [] if format_type in ("gif", "mp3") else _convert_codec_args(format_type)[0]
+    return video_args, ["-c:a", "copy"]
+
+def convert_format(input_file, output_file, format_type, video_codec=None, audio_codec=None,
+                   video_bitrate=None, audio_bitrate=None, quality_scale=None,
+                   start_time=None, end_time=None, duration=None, preset=None, use_copy=False,
+                   cache=None, chunks=None, auto_copy=True):
+    """Converts video format using ffmpeg with optimized settings.
+
+    ``cache`` enables the output cache (None defers to $VIDTOOLS_CACHE).
+    ``chunks`` splits the video at keyframes and encodes that many pieces in
+    parallel (0 means one per CPU); audio is encoded once over the whole file.
+    ``auto_copy`` probes the source and stream-copies every stream whose codec
+    already fits the target and that no explicit setting asks to re-encode.
+    """
+    from .seek import plan_seek
+    from .utils import _current_run_options, parse_time
+
+    if format_type == "gif" and not use_copy:
+        from .gif import make_gif
+
+        if chunks is not None:
+            print("Chunked encoding does not apply to gif; use `vt gif --segments` instead")
+        make_gif(input_file, output_file, start_time=start_time, end_time=end_time,
+                 duration=duration, cache=cache)
+        return
+
+    video_args, audio_args = _convert_codec_args(
+        format_type, video_codec, audio_codec, video_bitrate, audio_bitrate, quality_scale,
+        preset, use_copy)
+
+    copy_video = use_copy
+    if auto_copy and not use_copy:
+        from .seek import keyframe_before
+        from .transcode import copy_video_args, plan_streams
+
+        # Video can only be copied from a start that is already a keyframe
+        start = parse_time(start_time)
+        on_keyframe = not start
+        if start:
+            try:
+                keyframe = keyframe_before(input_file, start)
+                on_keyframe = keyframe is not None and abs(start - keyframe) <= 1e-3
+            except (subprocess.CalledProcessError, OSError):
+                pass
+        plan = plan_streams(input_file, format_type, video_args, audio_args, requested={
+            "vcodec": bool(video_codec), "acodec": bool(audio_codec),
+            "video_quality": bool(quality_scale or video_bitrate or preset),
+            "audio_quality": bool(audio_bitrate),
+        }, frame_accurate=not on_keyframe)
+        if plan:
+            if not _current_run_options().get("quiet"):
+                print(f"Stream plan: {plan.path} ({'; '.join(plan.reasons)})")
+            if plan.video == "copy":
+                video_args = copy_video_args(input_file, format_type)
+                copy_video = True
+            if plan.audio == "copy":
+                audio_args = ["-c:a", "copy"]
+
+    if chunks is not None and copy_video:
+        print("Video is stream-copied; chunked encoding is not needed")
+    elif chunks is not None:
+        if use_copy or format_type in ("gif", "mp3"):
+            print(f"Chunked encoding does not apply to {'stream copy' if use_copy else format_type}; "
+                  "converting in one pass")
+        else:
+            from .chunked import encode_chunked
+
+            encode_chunked(input_file, output_file, video_args, audio_args, chunks,
+                           start_time=start_time, end_time=end_time, duration=duration)
+            return
+
+    seek = plan_seek(input_file, start_time, end_time, duration, accurate=not copy_video)
+    command = ["ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args,
+               *video_args, *audio_args]
 
     # Fast start for MP4 files
     if format_type == "mp4" or output_file.lower().endswith('.mp4'):
         command.extend(["-movflags", "+faststart"])
 
     command.append(output_file)
-    run_ffmpeg_command(command) # Call run_ffmpeg_command from utils
+    run_ffmpeg_command(command, cache=cache) # Call run_ffmpeg_command from utils
 
-def extract_audio(input_file, output_file, audio_format="copy", start_time=None, end_time=None, duration=None):
-    """Extracts audio from video using ffmpeg with best practices."""
-    command = ["ffmpeg"]
+def _format_of(output_file, default="mp4"):
+    return os.path.splitext(output_file)[1].lower().lstrip('.') or default
 
-    # Fast seek for copy operations
-    if start_time and audio_format == "copy":
-        command.extend(["-ss", str(start_time)])
+def convert_renditions(input_file, output_files, heights=None, format_type=None,
+                       video_codec=None, audio_codec=None, video_bitrate=None, audio_bitrate=None,
+                       quality_scale=None, preset=None, start_time=None, end_time=None,
+                       duration=None):
+    """Write several renditions of input_file from a single decode.
 
-    command.extend(["-i", input_file])
+    With ``heights``, one output is expanded to ``<stem>_<height>p<ext>``
+    names, or one output per height may be given.  Without heights every
+    output is a full-size conversion whose format follows its extension.
+    """
+    from .ladder import Rendition, encode_renditions, scale_filter
+
+    if heights and len(output_files) == 1:
+        stem, ext = os.path.splitext(output_files[0])
+        output_files = [f"{stem}_{h}p{ext}" for h in heights]
+    elif heights and len(heights) != len(output_files):
+        print(f"Error: {len(heights)} ladder heights but {len(output_files)} outputs")
+        return
 
-    # Accurate seek for re-encoding
-    if start_time and audio_format != "copy":
-        command.extend(["-ss", str(start_time)])
-    if end_time:
-        command.extend(["-to", str(end_time)])
-    if duration:
-        command.extend(["-t", str(duration)])
+    renditions = []
+    for i, output_file in enumerate(output_files):
+        fmt = format_type or _format_of(output_file)
+        video_args, audio_args = _convert_codec_args(
+            fmt, video_codec, audio_codec, video_bitrate, audio_bitrate, quality_scale, preset)
+        filters = scale_filter(heights[i]) if heights else None
+        renditions.append(Rendition(output_file, filters, video_args, audio_args))
+    encode_renditions(input_file, renditions, start_time, end_time, duration)
+
+def extract_audio(input_file, output_file, audio_format="copy", start_time=None, end_time=None, duration=None):
+    """Extracts audio from video using ffmpeg with best practices."""
+    from .seek import plan_seek
+
+    # Audio frames are all keyframes, so an input seek is already exact
+    seek = plan_seek(input_file, start_time, end_time, duration, accurate=False)
+    command = ["ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args]
 
     # No video stream
     command.extend(["-vn"])
@@ -359,41 +538,48 @@ def extract_audio(input_file, output_file, audio_format="copy", start_time=None,
 
 def extract_frames(input_file, output_pattern, frame_rate=1, image_format="image2", start_time=None, end_time=None, duration=None):
     """Extracts frames from video using ffmpeg."""
-    command = ["ffmpeg", "-i", input_file]
-    if start_time: command.extend(["-ss", str(start_time)])
-    if end_time: command.extend(["-to", str(end_time)])
-    if duration: command.extend(["-t", str(duration)])
+    from .seek import plan_seek
+
+    seek = plan_seek(input_file, start_time, end_time, duration)
+    command = ["ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args]
     command.extend(["-r", str(frame_rate), "-f", image_format, output_pattern])
     run_ffmpeg_command(command) # Call run_ffmpeg_command from utils
 
 
-def concatenate_videos(input_files, output_file, use_copy=True):
+def concatenate_videos(input_files, output_file, use_copy=True, normalize=False, jobs=None,
+                       fanout=None):
     """Concatenates video files using ffmpeg concat demuxer.
 
     Args:
         input_files: List of input video paths
         output_file: Output video path
         use_copy: Use stream copy (requires same codec parameters)
+        normalize: Re-encode only the inputs whose codec parameters differ
+            from the majority, then stream-copy everything
+        jobs: Concurrent normalizing encodes / concat groups (0 or None: one per CPU)
+        fanout: Inputs per ffmpeg run; larger sets are stream-copied in
+            parallel stages (default: concat.DEFAULT_FANOUT)
     """
     import tempfile
+    from . import concat
+    from .batch import resolve_jobs
 
-    # Create temporary file for concat list
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-        list_file_path = f.name
-        for file in input_files:
-            # Use absolute paths and escape single quotes
-            abs_path = os.path.abspath(file)
-            escaped_path = abs_path.replace("'", "\\'")  # Line 388
-            f.write(f"file '{escaped_path}'\n")           # Line 389
+    max_workers = resolve_jobs(jobs) if jobs else None
+    fanout = fanout or concat.DEFAULT_FANOUT
 
-    try:
-        command = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", list_file_path]
+    if normalize:
+        concat.concat_normalized(input_files, output_file, max_workers=max_workers, fanout=fanout)
+        return
+    if use_copy:
+        concat.concat_copy(input_files, output_file, fanout=fanout, max_workers=max_workers)
+        return
 
-        if use_copy:
-            command.extend(["-c", "copy"])
-        else:
-            # Re-encode to handle different codecs
-            command.extend(["-c:v", "libx264", "-c:a", "aac", "-crf", "23"])
+    # Re-encode to handle different codecs
+    with tempfile.TemporaryDirectory(prefix="vidtools-concat-") as tmp:
+        list_file_path = os.path.join(tmp, "inputs.ffconcat")
+        concat.write_ffconcat(input_files, list_file_path)
+        command = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", list_file_path,
+                   "-c:v", "libx264", "-c:a", "aac", "-crf", "23"]
 
         # Fast start for MP4
         if output_file.lower().endswith('.mp4'):
@@ -401,24 +587,29 @@ def concatenate_videos(input_files, output_file, use_copy=True):
 
         command.append(output_file)
         run_ffmpeg_command(command)
-    finally:
-        # Clean up temp file
-        if os.path.exists(list_file_path):
-            os.remove(list_file_path)
 
 
-def crop_video(input_file, output_file, width, height, x, y):
-    """Crops a video using ffmpeg crop filter."""
+def crop_video(input_file, output_file, width, height, x, y, lossless=False):
+    """Crops a video using ffmpeg crop filter.
+
+    With ``lossless`` an H.264/HEVC source is cropped by rewriting its crop
+    window under stream copy; other sources fall back to the filter.
+    """
+    if lossless:
+        from .lossless import crop_video_lossless
+
+        if crop_video_lossless(input_file, output_file, width, height, x, y):
+            return
     crop_filter = f"crop={width}:{height}:{x}:{y}"
     command = ["ffmpeg", "-i", input_file, "-vf", crop_filter, output_file]
     run_ffmpeg_command(command)  # Call run_ffmpeg_command from utils
 
 def get_video_info(input_file):
-    """Gets video information using ffprobe."""
-    command = ["ffprobe", "-v", "error", "-show_format", "-show_streams", input_file]
+    """Gets video information using ffprobe (served from the probe cache when possible)."""
+    from .probe import format_probe_text, probe
+
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        print(result.stdout)
+        print(format_probe_text(probe(input_file)))
     except subprocess.CalledProcessError as e:
         print(f"ffprobe command failed with error code: {e.returncode}")
         print(f"Error Output:\n{e.stderr}")
@@ -427,6 +618,90 @@ def get_video_info(input_file):
         print("Error: ffprobe not found. Please ensure ffmpeg is installed and in your PATH.")
         exit(1)
 
+MEDIA_EXTENSIONS = {
+    ".mp4", ".m4v", ".mov", ".mkv", ".webm", ".avi", ".wmv", ".flv", ".mpg", ".mpeg",
+    ".ts", ".mts", ".m2ts", ".3gp", ".ogv", ".gif", ".webp", ".mp3", ".m4a", ".aac",
+    ".wav", ".flac", ".ogg", ".opus",
+}
+
+
+def iter_media_files(inputs, extensions=MEDIA_EXTENSIONS):
+    """Lazily expand files, glob patterns and directories (walked recursively).
+
+    Directory entries are filtered by ``extensions`` (None keeps everything);
+    explicitly named files are always yielded.
+    """
+    import glob
+
+    for entry in inputs:
+        if os.path.isdir(entry):
+            stack = [entry]
+            while stack:
+                with os.scandir(stack.pop()) as it:
+                    for de in it:
+                        if de.is_dir(follow_symlinks=False):
+                            stack.append(de.path)
+                        elif (extensions is None
+                              or os.path.splitext(de.name)[1].lower() in extensions):
+                            yield de.path
+        elif os.path.isfile(entry):
+            yield entry
+        else:
+            matched = False
+            for path in glob.iglob(entry, recursive=True):
+                if os.path.isfile(path):
+                    matched = True
+                    yield path
+            if not matched:
+                print(f"Warning: no files match '{entry}'", file=sys.stderr)
+
+
+def inventory_videos(inputs, output_format="jsonl", jobs=8, extensions=MEDIA_EXTENSIONS,
+                     out=None):
+    """Probe many files concurrently and stream one record per file.
+
+    Args:
+        inputs: Files, glob patterns and/or directories
+        output_format: "jsonl" (full ffprobe data), "csv" (summary columns) or "text"
+        jobs: Number of concurrent ffprobe processes
+        extensions: Extensions to pick up when walking directories (None = all)
+        out: Text stream to write to (default: stdout)
+
+    Returns:
+        Number of files that could not be probed.
+    """
+    import csv
+    from .batch import imap_bounded
+    from .probe import format_probe_text, probe
+
+    out = out or sys.stdout
+    writer = None
+    failed = 0
+    for path, info, error in imap_bounded(probe, iter_media_files(inputs, extensions), jobs):
+        message = None
+        if error is not None:
+            failed += 1
+            message = (getattr(error, "stderr", None) or str(error)).strip()
+            logger.warning("ffprobe failed", path=path, error=message)
+        if output_format == "csv":
+            row = info.summary() if info else {"path": path}
+            if writer is None:
+                from .probe import MediaInfo
+
+                fields = list(MediaInfo(path, {}).summary()) + ["error"]
+                writer = csv.DictWriter(out, fieldnames=fields)
+                writer.writeheader()
+            row["error"] = message
+            writer.writerow(row)
+        elif output_format == "text":
+            print(f"==> {path} <==", file=out)
+            print(format_probe_text(info) if info else f"error: {message}", file=out)
+        else:
+            record = {"path": path, **info.raw} if info else {"path": path, "error": message}
+            out.write(json.dumps(record) + "\n")
+        out.flush()
+    return failed
+
 def add_subtitles(input_file, output_file, subtitles_file):
     """Adds subtitles to video using ffmpeg subtitles filter."""
     if not os.path.isfile(subtitles_file):
@@ -435,23 +710,43 @@ def add_subtitles(input_file, output_file, subtitles_file):
     command = ["ffmpeg", "-i", input_file, "-vf", f"subtitles={subtitles_file}", output_file]
     run_ffmpeg_command(command) # Call run_ffmpeg_command from utils
 
-def rotate_video(input_file, output_file, rotation):
-    """Rotates video using ffmpeg transpose filter."""
-    rotation_values = {
-        "90": "1",   # 90 degrees clockwise
-        "180": "2,transpose=2", # 180 degrees (apply transpose=2 twice)
-        "270": "3"  # 270 degrees clockwise (or 90 counter-clockwise)
-    }
-    if rotation not in rotation_values:
-        print(f"Error: Invalid rotation value. Choose from 90, 180, 270 degrees.")
+def rotate_video(input_file, output_file, rotation, lossless=False):
+    """Rotates video clockwise (negative values rotate counter-clockwise) with transpose.
+
+    With ``lossless`` the streams are copied and only the display matrix
+    changes (mp4/mov outputs); otherwise, or for other containers, it re-encodes.
+    """
+    from .pipeline import rotate_filter
+
+    try:
+        rotation_filter = rotate_filter(rotation)
+    except ValueError:
+        print(f"Error: Invalid rotation value. Choose from 90, 180, 270 or -90 degrees.")
         return
+    if rotation_filter is None:
+        print("Error: Rotation of 0 degrees leaves the video unchanged.")
+        return
+    if lossless:
+        from .lossless import rotate_video_lossless
+
+        if rotate_video_lossless(input_file, output_file, rotation):
+            return
 
-    rotate_filter = f'"{rotation_values[rotation]}"'
-    command = ["ffmpeg", "-i", input_file, "-vf", rotate_filter, output_file]
+    command = ["ffmpeg", "-i", input_file, "-vf", rotation_filter, output_file]
     run_ffmpeg_command(command) # Call run_ffmpeg_command from utils
 
-def apply_preset(input_file, output_file, preset_name):
-    """Applies a preset configuration."""
+def apply_preset(input_file, output_file, preset_name, cache=None):
+    """Applies a preset configuration.
+
+    ``preset_name`` may be a list: several presets are rendered from one
+    decode into ``output_file`` (a directory) as ``<stem>_<preset>.<ext>``.
+    """
+    if isinstance(preset_name, (list, tuple)):
+        if len(preset_name) > 1:
+            apply_presets(input_file, output_file, preset_name)
+            return
+        preset_name = preset_name[0]
+
     all_presets = presets.get_presets() # Get presets from presets.py
     if preset_name not in all_presets:
         print(f"Error: Preset '{preset_name}' not found. Available presets are: {', '.join(all_presets.keys())}")
@@ -464,12 +759,45 @@ def apply_preset(input_file, output_file, preset_name):
         convert_format(input_file, output_file, format_type,
                        video_codec=preset.get("vcodec"), audio_codec=preset.get("acodec"),
                        video_bitrate=preset.get("vbitrate"), audio_bitrate=preset.get("abitrate"),
-                       quality_scale=preset.get("quality"))
+                       quality_scale=preset.get("quality"), cache=cache)
     elif "resize_percentage" in preset:
-        resize_video(input_file, output_file, percentage=preset["resize_percentage"])
+        resize_video(input_file, output_file, percentage=preset["resize_percentage"], cache=cache)
     else:
         print(f"Error: Preset '{preset_name}' is not fully defined or recognized.")
 
+def apply_presets(input_file, output_dir, preset_names):
+    """Render several presets of input_file from a single decode into output_dir."""
+    from .ladder import Rendition, encode_renditions
+
+    all_presets = presets.get_presets()
+    missing = [name for name in preset_names if name not in all_presets]
+    if missing:
+        print(f"Error: Preset(s) {', '.join(missing)} not found. Available presets are: {', '.join(all_presets.keys())}")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem, input_ext = os.path.splitext(os.path.basename(input_file))
+    renditions = []
+    for name in preset_names:
+        preset = all_presets[name]
+        format_type = preset.get("format")
+        if format_type:
+            output_file = os.path.join(output_dir, f"{stem}_{name}.{format_type}")
+            video_args, audio_args = _convert_codec_args(
+                format_type, preset.get("vcodec"), preset.get("acodec"),
+                preset.get("vbitrate"), preset.get("abitrate"), preset.get("quality"))
+            renditions.append(Rendition(output_file, None, video_args, audio_args))
+        elif "resize_percentage" in preset:
+            percentage = preset["resize_percentage"]
+            output_file = os.path.join(output_dir, f"{stem}_{name}{input_ext}")
+            video_args, audio_args = _resize_codec_args(output_file)
+            renditions.append(Rendition(output_file, f"scale=iw*{percentage}:ih*{percentage}:flags=lanczos",
+                                        video_args, audio_args))
+        else:
+            print(f"Error: Preset '{name}' is not fully defined or recognized.")
+            return
+    encode_renditions(input_file, renditions)
+
 def save_preset_handler(args):
     """Saves a preset by parsing the current command line."""
     preset_name = args.preset_name
@@ -678,17 +1006,37 @@ def sanitize_video_handler(args) -> None:
         extra_bottom=args.extra_bottom,
         manual_crop=args.manual_crop,
         audio_mode=("none" if args.no_audio else "aac" if args.aac else "copy"),
+        preset=args.preset,
     )
 
 # ───────────────────────────── core implementation ───────────────────────────
 def _probe_dimensions(path: str) -> tuple[int, int]:
-    """Return (width, height) of the first video stream via ffprobe JSON."""
-    probe = subprocess.run(
-        ["ffprobe", "-v", "error", "-select_streams", "v:0",
-         "-show_entries", "stream=width,height", "-of", "json", path],
-        capture_output=True, text=True, check=True)
-    info = json.loads(probe.stdout)["streams"][0]
-    return int(info["width"]), int(info["height"])
+    """Return (width, height) of the first video stream (cached ffprobe data)."""
+    from .probe import probe
+
+    info = probe(path)
+    return int(info.width), int(info.height)
+
+
+def _detect_crops(input_file: str, limit: int) -> list[str]:
+    """Run cropdetect over the first 300 frames and return its crop suggestions."""
+    detect_cmd: Sequence[str] = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "info",
+        "-i",
+        input_file,
+        "-vf",
+        f"cropdetect=limit={limit}:round=2:reset=0",
+        "-frames:v",
+        "300",
+        "-f",
+        "null",
+        "-",
+    ]
+    detect = subprocess.run(detect_cmd, stderr=subprocess.PIPE, text=True)
+    return re.findall(r"crop=([0-9:]+)", detect.stderr)
 
 
 def sanitize_video(
@@ -701,6 +1049,7 @@ def sanitize_video(
     extra_bottom: int = 0,
     manual_crop: str | None = None,
     audio_mode: str = "copy",  # "copy" | "aac" | "none"
+    preset: str = "slow",
 ) -> None:
     """
     1. Detect bottom banner with cropdetect (first ≈12 s).
@@ -711,24 +1060,13 @@ def sanitize_video(
     if manual_crop:
         crop_expr = manual_crop
     else:
-        # ── auto‑detect banner with cropdetect ──────────────────────────
-        detect_cmd: Sequence[str] = [
-            "ffmpeg",
-            "-hide_banner",
-            "-loglevel",
-            "info",
-            "-i",
-            input_file,
-            "-vf",
-            f"cropdetect=limit={limit}:round=2:reset=0",
-            "-frames:v",
-            "300",
-            "-f",
-            "null",
-            "-",
-        ]
-        detect = subprocess.run(detect_cmd, stderr=subprocess.PIPE, text=True)
-        matches = re.findall(r"crop=([0-9:]+)", detect.stderr)
+        # ── auto‑detect banner with cropdetect (cached per file version) ─
+        from .probe import cached_analysis
+
+        matches = cached_analysis(
+            input_file, f"cropdetect:limit={limit}",
+            lambda: _detect_crops(input_file, limit),
+        )
 
         _, in_h = _probe_dimensions(input_file)
         if not matches:
@@ -754,7 +1092,7 @@ def sanitize_video(
         "-bsf:v", "filter_units=remove_types=6",
         "-c:v", "libx264", "-x264-params",
         "sei=0:open-gop=0:no-scenecut=1",
-        "-crf", str(crf), "-preset", "slow",
+        "-crf", str(crf), "-preset", preset,
         "-movflags", "+faststart",
     ]
 
@@ -769,42 +1107,115 @@ def sanitize_video(
     run_ffmpeg_command(cmd)
 
 
-# ──────────────────────────── merge stub (placeholder) ───────────────────────
+# ──────────────────────────── merge handler ──────────────────────────────────
 def merge_videos_handler(args):
-    """
-    Placeholder for the 'merge' CLI command.
+    """Merge clips with transitions, re-encoding only the transition windows."""
+    from .merge import merge_clips
 
-    The CLI references this symbol to avoid an AttributeError at import time.
-    Full implementation will be added later.
-    """
-    logger.error("merge_videos_handler is not yet implemented.")
-    print("❌  The 'merge' command has not been implemented in this build.")
-    sys.exit(1)
+    if len(args.clips) < 2:
+        print("❌  merge needs at least two clips.")
+        sys.exit(1)
+    try:
+        smart = merge_clips(args.clips, args.output, transition=args.transition,
+                            duration=args.duration, crf=args.crf, preset=args.preset)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌  {e}")
+        sys.exit(1)
+    if smart:
+        print(f"Merged {len(args.clips)} clips (only the transitions were re-encoded)")
+    else:
+        print(f"Merged {len(args.clips)} clips (full re-encode: clips differ or are too short)")
+
+
+# ──────────────────────────── chain handler ──────────────────────────────────
+def chain_video_handler(args):
+    """Apply the --crop/--rotate/--resize/--subtitles steps in order with one encode."""
+    from .pipeline import Pipeline, parse_crop, parse_resize
+
+    if not args.steps and not (args.start_time or args.end_time or args.duration):
+        print("❌  chain needs at least one of --crop, --rotate, --resize, --subtitles or a trim.")
+        sys.exit(1)
+    pipeline = Pipeline(args.input).trim(args.start_time, args.end_time, args.duration)
+    try:
+        for kind, value in args.steps:
+            if kind == "crop":
+                pipeline.crop(*parse_crop(value))
+            elif kind == "rotate":
+                pipeline.rotate(value)
+            elif kind == "resize":
+                percentage, width, height = parse_resize(value)
+                pipeline.resize(percentage=percentage, width=width, height=height)
+            elif kind == "subtitles":
+                pipeline.subtitles(value)
+    except ValueError as e:
+        print(f"❌  --{kind} {value}: {e}")
+        sys.exit(1)
+    pipeline.run(args.output, video_codec=args.vcodec, audio_codec=args.acodec,
+                 quality=args.crf, preset=args.preset)
+
+
+# ──────────────────────────── gif handler ────────────────────────────────────
+def make_gif_handler(args):
+    """Render a GIF with a cached (optionally segment-parallel) palette."""
+    from .gif import make_gif
+
+    make_gif(args.input, args.output, fps=args.fps, width=args.width or None,
+             dither=args.dither, bayer_scale=args.bayer_scale, stats_mode=args.stats_mode,
+             max_colors=args.colors, loop=args.loop, start_time=args.start_time,
+             end_time=args.end_time, duration=args.duration, segments=args.segments,
+             cache_palette=not args.no_palette_cache, cache=True if args.cache else None)
 
 
 # ──────────────────────────── batch handlers ─────────────────────────────────
+def _batch_output_path(input_path, output_dir, suffix, ext):
+    """Return the output path for one batch item (creating output_dir if needed)."""
+    from pathlib import Path
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        return Path(output_dir) / f"{input_path.stem}{suffix}{ext}"
+    return input_path.with_name(f"{input_path.stem}{suffix}{ext}")
+
+
+def _open_batch_journal(args, jobs):
+    """Open the job journal for a batch run (resuming it if --resume was given).
+
+    Without an explicit --journal it is kept next to the outputs, and a run
+    with nothing to do writes none at all.
+    """
+    from contextlib import nullcontext
+    from .journal import Journal, default_journal_path
+
+    if not jobs and not args.journal:
+        return nullcontext()
+    path = args.journal or default_journal_path(args.output_dir,
+                                                 [job.output_file for job in jobs])
+    return Journal(path, resume=args.resume)
+
+
 def batch_convert_handler(args):
     """Handle batch convert operations."""
     import glob
     from pathlib import Path
-    
+    from .batch import BatchJob, resolve_jobs, run_batch
+
     pattern = args.pattern
     output_format = args.format
     output_dir = args.output_dir
     suffix = args.suffix or ""
-    overwrite = args.overwrite
-    
+    auto_copy = not getattr(args, 'no_auto_copy', False)
+
     files = glob.glob(pattern)
     if not files:
         print(f"No files found matching pattern: {pattern}")
         return
-    
+
     print(f"Found {len(files)} files to convert")
-    success_count = 0
-    
+    jobs, skipped = [], []
+
     for input_file in files:
         input_path = Path(input_file)
-        
+
         # Determine output format
         if output_format:
             ext = output_format if output_format.startswith('.') else f'.{output_format}'
@@ -814,155 +1225,123 @@ def batch_convert_handler(args):
                 ext = '.mp4'  # Convert images to video
             else:
                 print(f"Cannot auto-detect format for {input_file}, skipping")
+                skipped.append(BatchJob(input_file, "", None))
                 continue
-        
-        # Determine output path
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            output_file = Path(output_dir) / f"{input_path.stem}{suffix}{ext}"
-        else:
-            output_file = input_path.with_name(f"{input_path.stem}{suffix}{ext}")
-        
-        # Skip if exists and not overwriting
-        if output_file.exists() and not overwrite:
-            print(f"Skipping {input_file} (output exists)")
-            continue
-        
-        print(f"Converting: {input_file} -> {output_file}")
-        
-        try:
-            # Auto-detect format from extension
-            format_type = ext.lstrip('.')
-            convert_format(str(input_file), str(output_file), format_type)
-            success_count += 1
-            print(f"  ✓ Success")
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
-    
-    print(f"\nBatch conversion complete: {success_count}/{len(files)} successful")
+
+        output_file = _batch_output_path(input_path, output_dir, suffix, ext)
+        format_type = ext.lstrip('.')
+        jobs.append(BatchJob(
+            input_file, str(output_file),
+            lambda i=str(input_file), o=str(output_file), f=format_type:
+                convert_format(i, o, f, auto_copy=auto_copy),
+            params={"format": format_type, "auto_copy": auto_copy},
+        ))
+
+    with _open_batch_journal(args, jobs) as journal:
+        run_batch(jobs, "Converting", "conversion", max_workers=resolve_jobs(args.jobs),
+                  overwrite=args.overwrite, skipped=skipped, journal=journal)
 
 def batch_resize_handler(args):
     """Handle batch resize operations."""
     import glob
     from pathlib import Path
-    
+    from .batch import BatchJob, resolve_jobs, run_batch
+
     pattern = args.pattern
     scale = args.scale
     width = args.width
     height = args.height
     output_dir = args.output_dir
     suffix = args.suffix
-    
+
     files = glob.glob(pattern)
     if not files:
         print(f"No files found matching pattern: {pattern}")
         return
-    
+
     print(f"Found {len(files)} files to resize")
-    success_count = 0
-    
+    jobs = []
+
     for input_file in files:
         input_path = Path(input_file)
-        
-        # Determine output path
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            output_file = Path(output_dir) / f"{input_path.stem}{suffix}{input_path.suffix}"
-        else:
-            output_file = input_path.with_name(f"{input_path.stem}{suffix}{input_path.suffix}")
-        
-        print(f"Resizing: {input_file} -> {output_file}")
-        
-        try:
-            resize_video(str(input_file), str(output_file), 
-                        percentage=scale, width=width, height=height)
-            success_count += 1
-            print(f"  ✓ Success")
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
-    
-    print(f"\nBatch resize complete: {success_count}/{len(files)} successful")
+        output_file = _batch_output_path(input_path, output_dir, suffix, input_path.suffix)
+        jobs.append(BatchJob(
+            input_file, str(output_file),
+            lambda i=str(input_file), o=str(output_file): resize_video(
+                i, o, percentage=scale, width=width, height=height),
+            params={"scale": scale, "width": width, "height": height},
+        ))
+
+    with _open_batch_journal(args, jobs) as journal:
+        run_batch(jobs, "Resizing", "resize", max_workers=resolve_jobs(args.jobs),
+                  overwrite=args.overwrite, journal=journal)
 
 def batch_cut_handler(args):
     """Handle batch cut operations."""
     import glob
     from pathlib import Path
-    
+    from .batch import BatchJob, resolve_jobs, run_batch
+
     pattern = args.pattern
     start_time = args.start
     end_time = args.end
     duration = args.duration
     output_dir = args.output_dir
     suffix = args.suffix
-    
+
     files = glob.glob(pattern)
     if not files:
         print(f"No files found matching pattern: {pattern}")
         return
-    
+
     print(f"Found {len(files)} files to cut")
-    success_count = 0
-    
+    jobs = []
+
     for input_file in files:
         input_path = Path(input_file)
-        
-        # Determine output path
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            output_file = Path(output_dir) / f"{input_path.stem}{suffix}{input_path.suffix}"
-        else:
-            output_file = input_path.with_name(f"{input_path.stem}{suffix}{input_path.suffix}")
-        
-        print(f"Cutting: {input_file} -> {output_file}")
-        
-        try:
-            cut_video(str(input_file), str(output_file),
-                     start_time=start_time, end_time=end_time, duration=duration)
-            success_count += 1
-            print(f"  ✓ Success")
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
-    
-    print(f"\nBatch cut complete: {success_count}/{len(files)} successful")
+        output_file = _batch_output_path(input_path, output_dir, suffix, input_path.suffix)
+        jobs.append(BatchJob(
+            input_file, str(output_file),
+            lambda i=str(input_file), o=str(output_file): cut_video(
+                i, o, start_time=start_time, end_time=end_time, duration=duration),
+            params={"start": start_time, "end": end_time, "duration": duration},
+        ))
+
+    with _open_batch_journal(args, jobs) as journal:
+        run_batch(jobs, "Cutting", "cut", max_workers=resolve_jobs(args.jobs),
+                  overwrite=args.overwrite, journal=journal)
 
 def batch_extract_audio_handler(args):
     """Handle batch extract audio operations."""
     import glob
     from pathlib import Path
-    
+    from .batch import BatchJob, resolve_jobs, run_batch
+
     pattern = args.pattern
     audio_format = args.format
     output_dir = args.output_dir
-    
+
     files = glob.glob(pattern)
     if not files:
         print(f"No files found matching pattern: {pattern}")
         return
-    
+
     print(f"Found {len(files)} files to extract audio from")
-    success_count = 0
-    
+    jobs = []
+
     for input_file in files:
         input_path = Path(input_file)
-        
-        # Determine output path
         ext = audio_format if audio_format.startswith('.') else f'.{audio_format}'
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            output_file = Path(output_dir) / f"{input_path.stem}{ext}"
-        else:
-            output_file = input_path.with_suffix(ext)
-        
-        print(f"Extracting: {input_file} -> {output_file}")
-        
-        try:
-            extract_audio(str(input_file), str(output_file), audio_format)
-            success_count += 1
-            print(f"  ✓ Success")
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
-    
-    print(f"\nBatch audio extraction complete: {success_count}/{len(files)} successful")
+        output_file = _batch_output_path(input_path, output_dir, "", ext)
+        jobs.append(BatchJob(
+            input_file, str(output_file),
+            lambda i=str(input_file), o=str(output_file): extract_audio(i, o, audio_format),
+            params={"format": audio_format},
+        ))
+
+    with _open_batch_journal(args, jobs) as journal:
+        run_batch(jobs, "Extracting", "audio extraction", max_workers=resolve_jobs(args.jobs),
+                  overwrite=args.overwrite, journal=journal)
 
 # ─────────────────────────── CLI entry-point ─────────────────────────────────
 # Entry point moved to cli.py for package structure
@@ -0,0 +1,240 @@
+"""Chain crop, rotate, resize, subtitles and trims into a single encode.
+
+Running crop_video, rotate_video, resize_video and add_subtitles one after
+another decodes and re-encodes the video once per step.  A Pipeline only
+records the steps; when it runs they are compiled into one ``-vf`` chain
+and encoded once:
+
+    Pipeline("in.mp4").trim(10, duration=30).crop(1920, 960).rotate(90) \\
+        .resize(height=720).subtitles("subs.srt").run("out.mp4")
+
+While compiling, steps that change nothing are dropped (rotate by 0, resize
+by 1.0, a full-frame crop), consecutive rotations are folded into one and
+consecutive resizes into a single scale.  Trims are not filters at all:
+they become the keyframe-aware seek of vidtools.seek, so frames outside
+the range are never decoded.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+from .utils import format_time, logger, run_ffmpeg_command
+
+# Clockwise rotation -> filter chain
+ROTATE_FILTERS = {
+    90: "transpose=clock",
+    180: "hflip,vflip",
+    270: "transpose=cclock",
+}
+
+
+def rotate_filter(degrees) -> Optional[str]:
+    """Filter for a clockwise rotation by a multiple of 90 degrees (None for no rotation)."""
+    degrees = int(degrees)
+    if degrees % 90:
+        raise ValueError(f"rotation must be a multiple of 90 degrees, got {degrees}")
+    return ROTATE_FILTERS.get(degrees % 360)
+
+
+def _filter_path(path: str) -> str:
+    # Quote for the filter-option level; a quote inside is closed, escaped, reopened
+    return "'" + os.path.abspath(path).replace("\\", "/").replace("'", "'\\\\''") + "'"
+
+
+class Step:
+    """One recorded operation: ``kind`` plus its parameters."""
+
+    __slots__ = ("kind", "params")
+
+    def __init__(self, kind: str, **params):
+        self.kind = kind
+        self.params = params
+
+    def __repr__(self):
+        args = ", ".join(f"{k}={v!r}" for k, v in self.params.items() if v is not None)
+        return f"{self.kind}({args})"
+
+
+class Pipeline:
+    """Lazily collected video operations on one input, compiled into one ffmpeg run."""
+
+    __slots__ = ("input_file", "steps", "start_time", "end_time", "duration")
+
+    def __init__(self, input_file: str):
+        self.input_file = input_file
+        self.steps: List[Step] = []
+        self.start_time = None
+        self.end_time = None
+        self.duration = None
+
+    # -- recording ---------------------------------------------------------
+    def trim(self, start_time=None, end_time=None, duration=None) -> "Pipeline":
+        """Keep [start_time, end_time) (or duration from start_time) of the input."""
+        self.start_time = start_time
+        self.end_time = end_time
+        self.duration = duration
+        return self
+
+    def crop(self, width, height, x=0, y=0) -> "Pipeline":
+        """Crop to width x height at (x, y); numbers or ffmpeg expressions such as ``iw/2``."""
+        self.steps.append(Step("crop", width=width, height=height, x=x, y=y))
+        return self
+
+    def rotate(self, degrees) -> "Pipeline":
+        """Rotate clockwise by a multiple of 90 degrees (negative is counter-clockwise)."""
+        rotate_filter(degrees)  # validate now rather than at run time
+        self.steps.append(Step("rotate", degrees=int(degrees) % 360))
+        return self
+
+    def resize(self, percentage=None, width=None, height=None, algorithm="lanczos") -> "Pipeline":
+        """Scale by a factor or to width and/or height (keeping the aspect ratio)."""
+        if not (percentage or width or height):
+            raise ValueError("resize needs a percentage, width or height")
+        self.steps.append(Step("resize", percentage=percentage, width=width, height=height,
+                               algorithm=algorithm))
+        return self
+
+    def subtitles(self, subtitles_file: str) -> "Pipeline":
+        """Burn in a subtitle file (.srt, .ass, ...)."""
+        if not os.path.isfile(subtitles_file):
+            raise ValueError(f"subtitle file {subtitles_file!r} not found")
+        self.steps.append(Step("subtitles", path=subtitles_file))
+        return self
+
+    # -- compiling ---------------------------------------------------------
+    def optimized_steps(self) -> List[Step]:
+        """The recorded steps with no-ops dropped and adjacent rotations/resizes folded."""
+        steps: List[Step] = []
+        for step in self.steps:
+            previous = steps[-1] if steps else None
+            if step.kind == "rotate":
+                if previous is not None and previous.kind == "rotate":
+                    steps[-1] = Step("rotate", degrees=(previous.params["degrees"]
+                                                        + step.params["degrees"]) % 360)
+                else:
+                    steps.append(step)
+                if steps[-1].params["degrees"] == 0:
+                    steps.pop()
+            elif step.kind == "resize":
+                p = step.params
+                if previous is not None and previous.kind == "resize":
+                    if p["percentage"] and previous.params["percentage"]:
+                        # Two factors multiply into one
+                        steps[-1] = Step("resize", percentage=previous.params["percentage"]
+                                         * p["percentage"], width=None, height=None,
+                                         algorithm=p["algorithm"])
+                    elif not p["percentage"]:
+                        # An absolute size replaces whatever came before it
+                        steps[-1] = step
+                    else:
+                        steps.append(step)
+                else:
+                    steps.append(step)
+                if steps[-1].kind == "resize" and steps[-1].params["percentage"] == 1:
+                    steps.pop()
+            elif step.kind == "crop":
+                p = step.params
+                # x and y may be expressions such as (iw-ow)/2; only literal zeros are no-ops
+                if (str(p["width"]) in ("iw", "in_w") and str(p["height"]) in ("ih", "in_h")
+                        and _is_zero(p["x"]) and _is_zero(p["y"])):
+                    continue
+                steps.append(step)
+            else:
+                steps.append(step)
+        return steps
+
+    def filters(self, time_offset: float = 0.0) -> List[str]:
+        """Compile the steps into filters for one -vf chain.
+
+        ``time_offset`` is where the input seek lands; subtitles are timed
+        against the source, so frames are shifted back for that filter only.
+        """
+        chain = []
+        for step in self.optimized_steps():
+            p = step.params
+            if step.kind == "crop":
+                chain.append(f"crop={p['width']}:{p['height']}:{p['x']}:{p['y']}")
+            elif step.kind == "rotate":
+                chain.append(rotate_filter(p["degrees"]))
+            elif step.kind == "resize":
+                chain.append(_scale_filter(p))
+            elif step.kind == "subtitles":
+                subtitles = f"subtitles=filename={_filter_path(p['path'])}"
+                if time_offset > 0:
+                    offset = format_time(time_offset)
+                    subtitles = f"setpts=PTS+{offset}/TB,{subtitles},setpts=PTS-{offset}/TB"
+                chain.append(subtitles)
+        return chain
+
+    def build_command(self, output_file: str, video_codec=None, audio_codec=None,
+                      video_bitrate=None, audio_bitrate=None, quality=None,
+                      preset=None) -> List[str]:
+        """Return the single ffmpeg argv that applies every step and encodes once."""
+        from .main import _convert_codec_args, _format_of
+        from .seek import plan_seek
+
+        format_type = _format_of(output_file)
+        video_args, audio_args = _convert_codec_args(
+            format_type, video_codec, audio_codec, video_bitrate, audio_bitrate, quality, preset)
+        seek = plan_seek(self.input_file, self.start_time, self.end_time, self.duration)
+        time_offset = seek.keyframe if seek.keyframe is not None else seek.start
+        chain = self.filters(time_offset)
+        if "-vf" in video_args:
+            # Format-specific filters (the gif palette) run after ours
+            i = video_args.index("-vf")
+            chain.append(video_args[i + 1])
+            video_args = video_args[:i] + video_args[i + 2:]
+
+        command = ["ffmpeg", *seek.input_args, "-i", self.input_file, *seek.output_args]
+        if chain:
+            command += ["-vf", ",".join(chain)]
+        command += [*video_args, *audio_args]
+        if output_file.lower().endswith(".mp4"):
+            command.extend(["-movflags", "+faststart"])
+        command.append(output_file)
+        return command
+
+    def run(self, output_file: str, **encode) -> None:
+        """Compile and run; ``encode`` takes build_command()'s encoder options."""
+        command = self.build_command(output_file, **encode)
+        logger.info("Pipeline", input=self.input_file, steps=self.optimized_steps(),
+                    recorded=len(self.steps))
+        run_ffmpeg_command(command)
+
+    def __repr__(self):
+        return f"<Pipeline {self.input_file!r} {self.steps}>"
+
+
+def _is_zero(value) -> bool:
+    try:
+        return not float(value or 0)
+    except ValueError:
+        return False
+
+
+def _scale_filter(params) -> str:
+    algorithm = params["algorithm"]
+    if params["percentage"]:
+        factor = params["percentage"]
+        # Keep dimensions even so 4:2:0 encoders accept them
+        return f"scale=trunc(iw*{factor}/2)*2:trunc(ih*{factor}/2)*2:flags={algorithm}"
+    width, height = params["width"], params["height"]
+    return f"scale={width or -2}:{height or -2}:flags={algorithm}"
+
+
+def parse_resize(spec: str) -> Tuple[Optional[float], Optional[int], Optional[int]]:
+    """Parse ``0.5``, ``1280x720``, ``1280x`` or ``x720`` into (percentage, width, height)."""
+    if "x" not in spec:
+        return float(spec), None, None
+    width, _, height = spec.partition("x")
+    return None, int(width) if width else None, int(height) if height else None
+
+
+def parse_crop(spec: str) -> Tuple[str, str, str, str]:
+    """Parse ``W:H[:X:Y]`` (numbers or ffmpeg expressions) into its four parts."""
+    parts = spec.split(":")
+    if len(parts) not in (2, 4):
+        raise ValueError(f"crop must be W:H or W:H:X:Y, got {spec!r}")
+    if len(parts) == 2:
+        parts += ["0", "0"]
+    return tuple(parts)
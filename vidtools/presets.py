@@ -67,17 +67,14 @@ DEFAULT_PRESETS = {
 def load_presets() -> Dict[str, Dict[str, Any]]:
     """Loads presets from JSON file or uses defaults if file not found."""
     try:
-        # Ensure the presets folder exists, create if not
-        if not os.path.exists(PRESET_FOLDER):
-            os.makedirs(PRESET_FOLDER)
-
+        # Reading never creates the presets folder; save_presets() does that
         with open(PRESET_FILE, "r") as f:
             presets = json.load(f)
             merged_presets = {**DEFAULT_PRESETS, **presets}  # Merge loaded with defaults
             logger.debug("Presets loaded from file", file=PRESET_FILE, loaded_count=len(presets), merged_count=len(merged_presets)) # Logging preset load
             return merged_presets
     except FileNotFoundError:
-        logger.warning("Preset file not found, using default presets.", file=PRESET_FILE) # Logging file not found
+        logger.debug("Preset file not found, using default presets.", file=PRESET_FILE) # No saved presets yet is the normal case
         return DEFAULT_PRESETS
     except json.JSONDecodeError as e:
         logger.error("Invalid JSON in preset file, using default presets.", file=PRESET_FILE, error=str(e)) # Logging JSON error
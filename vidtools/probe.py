@@ -0,0 +1,283 @@
+"""Persistent ffprobe metadata cache.
+
+probe() returns a MediaInfo for a file, running ffprobe only the first
+time a given (path, size, mtime_ns, inode) is seen.  Results live in a
+SQLite database under the vidtools cache directory, so every command (and
+every process) shares them.  cached_analysis() stores other per-file
+results, such as cropdetect output, with the same invalidation rule.
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .utils import cache_dir, logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode    INTEGER NOT NULL,
+    data     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    path     TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode    INTEGER NOT NULL,
+    data     TEXT NOT NULL,
+    PRIMARY KEY (path, kind)
+);
+"""
+
+_local = threading.local()
+
+
+def _db() -> sqlite3.Connection:
+    """One connection per thread; WAL lets concurrent processes share the file."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(os.path.join(cache_dir(), "probe.sqlite"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _stat_key(path: str):
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def _fraction(value: Optional[str]) -> Optional[float]:
+    """Convert ffprobe rationals like '30000/1001' to float (None for 0/0)."""
+    if not value:
+        return None
+    num, _, den = value.partition("/")
+    try:
+        if not den:
+            return float(num)
+        return float(num) / float(den) if float(den) else None
+    except ValueError:
+        return None
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class StreamInfo:
+    """One stream from ffprobe's ``-show_streams`` output."""
+
+    __slots__ = (
+        "index", "codec_type", "codec_name", "profile", "width", "height",
+        "coded_width", "coded_height", "pix_fmt", "frame_rate", "time_base",
+        "sample_rate", "channels", "channel_layout", "bit_rate", "duration", "tags",
+        "disposition", "rotation", "field_order", "variable_frame_rate",
+    )
+
+    def __init__(self, data: Dict[str, Any]):
+        self.index: int = data.get("index", 0)
+        self.codec_type: Optional[str] = data.get("codec_type")
+        self.codec_name: Optional[str] = data.get("codec_name")
+        self.profile: Optional[str] = data.get("profile")
+        self.width: Optional[int] = _int(data.get("width"))
+        self.height: Optional[int] = _int(data.get("height"))
+        self.coded_width: Optional[int] = _int(data.get("coded_width"))
+        self.coded_height: Optional[int] = _int(data.get("coded_height"))
+        self.pix_fmt: Optional[str] = data.get("pix_fmt")
+        avg_rate = _fraction(data.get("avg_frame_rate"))
+        base_rate = _fraction(data.get("r_frame_rate"))
+        self.frame_rate: Optional[float] = avg_rate or base_rate
+        # The average only matches the base rate when every frame has the same duration
+        self.variable_frame_rate: bool = bool(avg_rate and base_rate
+                                              and abs(avg_rate - base_rate) > 1e-6 * base_rate)
+        self.time_base: Optional[str] = data.get("time_base")
+        self.sample_rate: Optional[int] = _int(data.get("sample_rate"))
+        self.channels: Optional[int] = _int(data.get("channels"))
+        self.channel_layout: Optional[str] = data.get("channel_layout")
+        self.bit_rate: Optional[int] = _int(data.get("bit_rate"))
+        self.duration: Optional[float] = _float(data.get("duration"))
+        self.tags: Dict[str, str] = data.get("tags", {})
+        self.disposition: Dict[str, int] = data.get("disposition", {})
+        self.field_order: Optional[str] = data.get("field_order")
+        # Display-matrix rotation (counter-clockwise degrees), or the legacy rotate tag
+        self.rotation: Optional[float] = None
+        for side_data in data.get("side_data_list", []):
+            if "rotation" in side_data:
+                self.rotation = _float(side_data["rotation"])
+        if self.rotation is None and "rotate" in self.tags:
+            self.rotation = -(_float(self.tags["rotate"]) or 0.0)
+
+    def __repr__(self):
+        return f"<StreamInfo #{self.index} {self.codec_type}:{self.codec_name}>"
+
+
+class MediaInfo:
+    """Typed view of ffprobe's ``-show_format -show_streams`` JSON."""
+
+    __slots__ = ("path", "format_name", "duration", "size", "bit_rate", "start_time",
+                 "streams", "raw")
+
+    def __init__(self, path: str, raw: Dict[str, Any]):
+        fmt = raw.get("format", {})
+        self.path = path
+        self.raw = raw
+        self.format_name: Optional[str] = fmt.get("format_name")
+        self.duration: Optional[float] = _float(fmt.get("duration"))
+        self.size: Optional[int] = _int(fmt.get("size"))
+        self.bit_rate: Optional[int] = _int(fmt.get("bit_rate"))
+        self.start_time: float = _float(fmt.get("start_time")) or 0.0
+        self.streams: List[StreamInfo] = [StreamInfo(s) for s in raw.get("streams", [])]
+
+    def streams_of(self, codec_type: str) -> List[StreamInfo]:
+        return [s for s in self.streams if s.codec_type == codec_type]
+
+    @property
+    def video(self) -> Optional[StreamInfo]:
+        """First video stream that is not an attached picture (cover art)."""
+        for s in self.streams_of("video"):
+            if not s.disposition.get("attached_pic"):
+                return s
+        return None
+
+    @property
+    def audio(self) -> Optional[StreamInfo]:
+        streams = self.streams_of("audio")
+        return streams[0] if streams else None
+
+    @property
+    def width(self) -> Optional[int]:
+        return self.video.width if self.video else None
+
+    @property
+    def height(self) -> Optional[int]:
+        return self.video.height if self.video else None
+
+    @property
+    def video_codec(self) -> Optional[str]:
+        return self.video.codec_name if self.video else None
+
+    @property
+    def audio_codec(self) -> Optional[str]:
+        return self.audio.codec_name if self.audio else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Flat one-row description, used for CSV inventories."""
+        video, audio = self.video, self.audio
+        return {
+            "path": self.path,
+            "format": self.format_name,
+            "duration": self.duration,
+            "size": self.size,
+            "bit_rate": self.bit_rate,
+            "streams": len(self.streams),
+            "video_codec": video.codec_name if video else None,
+            "width": video.width if video else None,
+            "height": video.height if video else None,
+            "fps": round(video.frame_rate, 3) if video and video.frame_rate else None,
+            "pix_fmt": video.pix_fmt if video else None,
+            "audio_codec": audio.codec_name if audio else None,
+            "sample_rate": audio.sample_rate if audio else None,
+            "channels": audio.channels if audio else None,
+        }
+
+    def __repr__(self):
+        return f"<MediaInfo {self.path!r} {self.format_name} {self.duration}s>"
+
+
+def run_ffprobe(path: str) -> Dict[str, Any]:
+    """Run ffprobe and return its parsed JSON (raises CalledProcessError on failure)."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", path],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def probe(path: str, use_cache: bool = True) -> MediaInfo:
+    """Return MediaInfo for path, from the cache when the file is unchanged."""
+    abs_path, size, mtime_ns, inode = _stat_key(path)
+    if use_cache:
+        row = _db().execute(
+            "SELECT data FROM probes WHERE path=? AND size=? AND mtime_ns=? AND inode=?",
+            (abs_path, size, mtime_ns, inode),
+        ).fetchone()
+        if row:
+            return MediaInfo(path, json.loads(row[0]))
+
+    raw = run_ffprobe(path)
+    conn = _db()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO probes (path, size, mtime_ns, inode, data) VALUES (?, ?, ?, ?, ?)",
+            (abs_path, size, mtime_ns, inode, json.dumps(raw)),
+        )
+    logger.debug("Probed file", path=abs_path)
+    return MediaInfo(path, raw)
+
+
+def cached_analysis(path: str, kind: str, compute: Callable[[], Any]) -> Any:
+    """Return a JSON-serialisable per-file result, computing it once per file version."""
+    abs_path, size, mtime_ns, inode = _stat_key(path)
+    row = _db().execute(
+        "SELECT data FROM analyses WHERE path=? AND kind=? AND size=? AND mtime_ns=? AND inode=?",
+        (abs_path, kind, size, mtime_ns, inode),
+    ).fetchone()
+    if row:
+        return json.loads(row[0])
+    value = compute()
+    conn = _db()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO analyses (path, kind, size, mtime_ns, inode, data)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (abs_path, kind, size, mtime_ns, inode, json.dumps(value)),
+        )
+    return value
+
+
+def has_cached_analysis(path: str, kind: str) -> bool:
+    """True if cached_analysis() would answer from the cache without computing."""
+    abs_path, size, mtime_ns, inode = _stat_key(path)
+    row = _db().execute(
+        "SELECT 1 FROM analyses WHERE path=? AND kind=? AND size=? AND mtime_ns=? AND inode=?",
+        (abs_path, kind, size, mtime_ns, inode),
+    ).fetchone()
+    return row is not None
+
+
+def format_probe_text(info: MediaInfo) -> str:
+    """Render cached probe data in ffprobe's default ``[STREAM]``/``[FORMAT]`` layout."""
+    lines = []
+
+    def section(name: str, data: Dict[str, Any]) -> None:
+        lines.append(f"[{name}]")
+        for key, value in data.items():
+            if isinstance(value, dict):
+                prefix = "TAG" if key == "tags" else key.upper()
+                lines.extend(f"{prefix}:{k}={v}" for k, v in value.items())
+            elif not isinstance(value, list):
+                lines.append(f"{key}={value}")
+        lines.append(f"[/{name}]")
+
+    for stream in info.raw.get("streams", []):
+        section("STREAM", stream)
+    section("FORMAT", info.raw.get("format", {}))
+    return "\n".join(lines)
@@ -0,0 +1,159 @@
+"""Keyframe index and seek planner shared by every time-ranged operation.
+
+ffmpeg seeks fastest when ``-ss`` is given before ``-i``: the demuxer jumps
+to a keyframe and nothing before it is read.  For re-encodes, plan_seek()
+combines a coarse input seek to the keyframe at or before the requested
+start with a fine output seek for the remainder, so late-in-file ranges
+start instantly and still land on the exact frame.
+
+Keyframe times come from packet flags and are relative to the container's
+start_time, which is the timeline ``-ss`` uses.
+"""
+
+import bisect
+import subprocess
+from typing import List, Optional
+
+from .utils import format_time, logger, parse_time
+
+# How far back a windowed lookup reads when no full index is cached yet
+WINDOW_SECONDS = 30.0
+
+
+def _packet_keyframes(input_file: str, read_intervals: Optional[str] = None) -> List[float]:
+    """Return sorted absolute pts times of video keyframe packets."""
+    command = ["ffprobe", "-v", "error", "-select_streams", "v:0"]
+    if read_intervals:
+        command += ["-read_intervals", read_intervals]
+    command += ["-show_entries", "packet=pts_time,dts_time,flags", "-of", "csv=p=0", input_file]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stdout.splitlines():
+        fields = line.split(",")
+        if len(fields) < 3 or "K" not in fields[2]:
+            continue
+        stamp = fields[0] if fields[0] not in ("", "N/A") else fields[1]
+        try:
+            times.append(float(stamp))
+        except ValueError:
+            continue
+    return sorted(times)
+
+
+def _start_time(input_file: str) -> float:
+    from .probe import probe
+
+    return probe(input_file).start_time
+
+
+def has_video(input_file: str) -> bool:
+    from .probe import probe
+
+    try:
+        return probe(input_file).video is not None
+    except (subprocess.CalledProcessError, OSError):
+        return True  # unknown: assume video so callers stay conservative
+
+
+def keyframe_index(input_file: str) -> List[float]:
+    """Return all video keyframe times (seconds from start), cached per file version.
+
+    Building the index demuxes the whole video stream once; afterwards every
+    command run on the same unchanged file reuses it.
+    """
+    from .probe import cached_analysis
+
+    def build():
+        offset = _start_time(input_file)
+        times = [round(t - offset, 6) for t in _packet_keyframes(input_file)]
+        logger.debug("Keyframe index built", path=input_file, keyframes=len(times))
+        return times
+
+    return cached_analysis(input_file, "keyframes", build)
+
+
+def has_keyframe_index(input_file: str) -> bool:
+    from .probe import has_cached_analysis
+
+    return has_cached_analysis(input_file, "keyframes")
+
+
+def keyframe_before(input_file: str, t: float) -> Optional[float]:
+    """Return the last keyframe at or before t (seconds from start).
+
+    Uses the full index when it is already cached; otherwise reads only a
+    short window of packets before t, which keeps one-off seeks into huge
+    files cheap.
+    """
+    if has_keyframe_index(input_file):
+        times = keyframe_index(input_file)
+    else:
+        offset = _start_time(input_file)
+        begin = max(0.0, t - WINDOW_SECONDS) + offset
+        interval = f"{format_time(begin)}%{format_time(t + offset + 0.001)}"
+        times = [x - offset for x in _packet_keyframes(input_file, interval)]
+    i = bisect.bisect_right(times, t + 1e-6)
+    return times[i - 1] if i else None
+
+
+def keyframe_after(times: List[float], t: float) -> Optional[float]:
+    """Return the first keyframe at or after t from an index."""
+    i = bisect.bisect_left(times, t - 1e-6)
+    return times[i] if i < len(times) else None
+
+
+class SeekPlan:
+    """ffmpeg arguments for a time range: ``input_args`` go before ``-i``."""
+
+    __slots__ = ("input_args", "output_args", "start", "duration", "keyframe")
+
+    def __init__(self):
+        self.input_args: List[str] = []
+        self.output_args: List[str] = []
+        self.start: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.keyframe: Optional[float] = None
+
+    def __repr__(self):
+        return f"<SeekPlan in={self.input_args} out={self.output_args}>"
+
+
+def plan_seek(input_file, start_time=None, end_time=None, duration=None, accurate=True):
+    """Plan -ss/-t placement for reading [start_time, end_time) of input_file.
+
+    Args:
+        input_file: Source path
+        start_time: Start timestamp (HH:MM:SS or seconds)
+        end_time: End timestamp (absolute)
+        duration: Length of the range (alternative to end_time)
+        accurate: Land on the exact frame (re-encodes). False gives a single
+            input seek, which is what stream copy and audio-only jobs want.
+
+    Returns:
+        SeekPlan
+    """
+    plan = SeekPlan()
+    start = parse_time(start_time) or 0.0
+    end = parse_time(end_time)
+    length = parse_time(duration)
+    if length is None and end is not None:
+        length = max(0.0, end - start)
+    plan.start = start
+    plan.duration = length
+
+    if start > 0:
+        keyframe = None
+        if accurate and has_video(input_file):
+            try:
+                keyframe = keyframe_before(input_file, start)
+            except (subprocess.CalledProcessError, OSError) as e:
+                logger.debug("Keyframe lookup failed; using plain input seek", error=str(e))
+        if keyframe is not None and start - keyframe > 1e-3:
+            plan.keyframe = keyframe
+            plan.input_args = ["-ss", format_time(keyframe)]
+            plan.output_args = ["-ss", format_time(start - keyframe)]
+        else:
+            plan.input_args = ["-ss", format_time(start)]
+    if length is not None:
+        plan.output_args += ["-t", format_time(length)]
+    return plan
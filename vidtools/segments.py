@@ -0,0 +1,166 @@
+"""Segment-level helpers: re-encode only where needed, stream-copy the rest.
+
+Pieces are written as MPEG-TS so every segment carries its own in-band
+SPS/PPS.  That lets freshly encoded edges and stream-copied middles be
+joined losslessly with the concat demuxer even though their encoder
+headers differ.
+"""
+
+import os
+import tempfile
+from typing import List, Optional
+
+from .utils import format_time, logger, parse_time, run_ffmpeg_command
+
+# Container for intermediate pieces (see the module docstring)
+PIECE_FORMAT = "mpegts"
+PIECE_EXT = ".ts"
+
+# Source codec -> encoder that can produce a bitstream we can splice into it
+VIDEO_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+}
+
+
+def matching_video_args(stream, crf=None, preset=None) -> Optional[List[str]]:
+    """Encoder arguments that reproduce the source stream's codec parameters.
+
+    Returns None when the codec cannot be spliced (the caller should fall back
+    to a full re-encode).
+    """
+    encoder = VIDEO_ENCODERS.get(stream.codec_name)
+    if not encoder:
+        return None
+    args = ["-c:v", encoder]
+    if stream.profile:
+        profile = stream.profile.lower().replace(" ", "")
+        # ffprobe reports e.g. "Constrained Baseline"/"High 4:2:2"; the encoders
+        # accept baseline/main/high/high10/high422/high444 and main/main10.
+        profile = {"constrainedbaseline": "baseline", "high4:2:2": "high422",
+                   "high4:4:4predictive": "high444", "high4:4:4": "high444"}.get(profile, profile)
+        args += ["-profile:v", profile]
+    if stream.pix_fmt:
+        args += ["-pix_fmt", stream.pix_fmt]
+    args += ["-crf", str(crf if crf is not None else 18)]
+    if preset:
+        args += ["-preset", preset]
+    return args
+
+
+def write_concat_list(paths, list_path: str) -> None:
+    """Write a concat demuxer list, escaping single quotes in paths."""
+    with open(list_path, "w") as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def _encode_piece(input_file, start, length, video_args, piece_path):
+    from .seek import plan_seek
+
+    seek = plan_seek(input_file, start, duration=length)
+    run_ffmpeg_command([
+        "ffmpeg", *seek.input_args, "-i", input_file, *seek.output_args,
+        "-map", "0:v:0", "-an", "-sn", "-dn", *video_args, "-f", PIECE_FORMAT, piece_path,
+    ])
+
+
+def copy_limit_args(length: Optional[float], frame_rate: Optional[float]) -> List[str]:
+    """Arguments that end a stream-copied piece just before the next keyframe.
+
+    With B-frames, ``-t`` on a copied stream lets through packets whose
+    decode time is before the limit but whose presentation time is not,
+    duplicating the first frames of the following piece.  Counting packets
+    is exact for keyframe-to-keyframe pieces because a GOP is stored
+    contiguously in decode order, but only at a constant frame rate; pass
+    ``frame_rate=None`` (see copy_frame_rate) to fall back to ``-t``.
+    """
+    if length is None:
+        return []
+    if frame_rate:
+        return ["-frames:v", str(int(round(length * frame_rate)))]
+    return ["-t", format_time(length)]
+
+
+def copy_frame_rate(stream) -> Optional[float]:
+    """Frame rate to count copied packets by, or None when the stream is variable frame rate."""
+    if stream is None or stream.variable_frame_rate:
+        return None
+    return stream.frame_rate
+
+
+def copy_piece(input_file, start, length, piece_path, frame_rate=None):
+    """Stream-copy the video from keyframe ``start`` for ``length`` seconds (None: to the end)."""
+    command = ["ffmpeg"]
+    if start > 0:
+        # start is a keyframe, so the input seek lands on it exactly
+        command += ["-ss", format_time(start)]
+    command += ["-i", input_file, *copy_limit_args(length, frame_rate),
+                "-map", "0:v:0", "-an", "-sn", "-dn", "-c", "copy", "-f", PIECE_FORMAT, piece_path]
+    run_ffmpeg_command(command)
+
+
+def smart_cut(input_file, output_file, start_time=None, end_time=None, duration=None,
+              crf=None):
+    """Frame-accurate cut that re-encodes only the partial GOPs at each end.
+
+    The head (start up to the first keyframe) and tail (last keyframe up to
+    end) are re-encoded with the source's codec parameters; everything in
+    between is stream-copied.  Audio is stream-copied over the whole range.
+    Falls back to a full re-encode for codecs that cannot be spliced or
+    ranges shorter than one GOP.
+
+    Returns:
+        True if the smart path was used, False if it fell back.
+    """
+    from .probe import probe
+    from .seek import keyframe_after, keyframe_index
+
+    info = probe(input_file)
+    start = parse_time(start_time) or 0.0
+    if duration is not None:
+        end = start + parse_time(duration)
+    elif end_time is not None:
+        end = parse_time(end_time)
+    else:
+        end = info.duration
+    video_args = matching_video_args(info.video, crf=crf) if info.video else None
+
+    times = keyframe_index(input_file) if video_args else []
+    first_kf = keyframe_after(times, start)
+    last_kf = None
+    for t in reversed(times):
+        if t <= end + 1e-6:
+            last_kf = t
+            break
+    if not video_args or first_kf is None or last_kf is None or first_kf >= last_kf:
+        logger.info("Smart cut not possible, re-encoding the whole range",
+                    codec=info.video_codec, first_keyframe=first_kf, last_keyframe=last_kf)
+        return False
+
+    logger.info("Smart cut plan", head=(start, first_kf), copy=(first_kf, last_kf), tail=(last_kf, end))
+    with tempfile.TemporaryDirectory(prefix="vidtools-smartcut-") as tmp:
+        pieces = []
+        if first_kf - start > 1e-3:
+            pieces.append(os.path.join(tmp, "head" + PIECE_EXT))
+            _encode_piece(input_file, start, first_kf - start, video_args, pieces[-1])
+        pieces.append(os.path.join(tmp, "middle" + PIECE_EXT))
+        copy_piece(input_file, first_kf, last_kf - first_kf, pieces[-1],
+                   frame_rate=copy_frame_rate(info.video))
+        if end - last_kf > 1e-3:
+            pieces.append(os.path.join(tmp, "tail" + PIECE_EXT))
+            _encode_piece(input_file, last_kf, end - last_kf, video_args, pieces[-1])
+
+        list_path = os.path.join(tmp, "pieces.txt")
+        write_concat_list(pieces, list_path)
+        command = [
+            "ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path,
+            "-ss", format_time(start), "-t", format_time(end - start), "-i", input_file,
+            "-map", "0:v:0", "-map", "1:a?", "-c", "copy",
+        ]
+        if output_file.lower().endswith(".mp4"):
+            command.extend(["-movflags", "+faststart"])
+        command.append(output_file)
+        run_ffmpeg_command(command)
+    return True
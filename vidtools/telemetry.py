@@ -0,0 +1,192 @@
+"""Per-job performance telemetry for ffmpeg runs.
+
+Every command run through run_ffmpeg_command produces one JobMetrics: wall
+time, ffmpeg's final speed and fps, the child's user/system CPU time and
+peak RSS (from ``os.wait4``), and the input/output sizes.  Each job is
+logged as a structlog event.  Two optional sinks are configured from the
+environment:
+
+    VIDTOOLS_METRICS_FILE        append one JSON object per job
+    VIDTOOLS_PROMETHEUS_FILE     node_exporter textfile-collector file with
+                                 totals per video encoder and status
+
+The Prometheus file is rewritten atomically; its totals are read back
+before each update, so successive CLI runs keep accumulating.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .utils import logger
+
+_write_lock = threading.Lock()
+
+# Totals exported to Prometheus: metric name -> (help, JobMetrics attribute or None for a count)
+_COUNTERS = {
+    "vidtools_jobs_total": ("ffmpeg jobs run", None),
+    "vidtools_job_wall_seconds_total": ("Wall-clock seconds spent in ffmpeg", "wall_time"),
+    "vidtools_job_cpu_seconds_total": ("User plus system CPU seconds used by ffmpeg", "cpu_time"),
+    "vidtools_job_input_bytes_total": ("Bytes of input read", "input_bytes"),
+    "vidtools_job_output_bytes_total": ("Bytes of output written", "output_bytes"),
+}
+_PEAK_RSS = "vidtools_job_max_rss_bytes"
+
+
+class JobMetrics:
+    """Resource usage of one finished ffmpeg run."""
+
+    __slots__ = ("command", "output_file", "encoder", "returncode", "wall_time", "speed", "fps",
+                 "frames", "user_time", "sys_time", "max_rss", "input_bytes", "output_bytes",
+                 "finished_at")
+
+    def __init__(self, command: List[str], returncode: int, wall_time: float, progress=None,
+                 rusage=None):
+        self.command = command
+        self.output_file = command[-1]
+        self.encoder = _encoder(command)
+        self.returncode = returncode
+        self.wall_time = wall_time
+        self.speed = progress.speed if progress else None
+        self.fps = progress.fps if progress else None
+        self.frames = progress.frame if progress else None
+        self.user_time = rusage.ru_utime if rusage else None
+        self.sys_time = rusage.ru_stime if rusage else None
+        self.max_rss = _rss_bytes(rusage.ru_maxrss) if rusage else None
+        self.input_bytes = sum(_size(path) or 0 for path in _inputs(command))
+        self.output_bytes = _size(self.output_file)
+        self.finished_at = time.time()
+
+    @property
+    def cpu_time(self) -> Optional[float]:
+        if self.user_time is None:
+            return None
+        return self.user_time + self.sys_time
+
+    @property
+    def status(self) -> str:
+        return "ok" if self.returncode == 0 else "failed"
+
+    def as_dict(self) -> Dict:
+        return {
+            "output": self.output_file, "encoder": self.encoder, "status": self.status,
+            "returncode": self.returncode, "wall_time": round(self.wall_time, 3),
+            "speed": self.speed, "fps": self.fps, "frames": self.frames,
+            "user_time": self.user_time, "sys_time": self.sys_time, "max_rss": self.max_rss,
+            "input_bytes": self.input_bytes, "output_bytes": self.output_bytes,
+            "finished_at": self.finished_at, "argv": self.command,
+        }
+
+    def __repr__(self):
+        return f"<JobMetrics {self.output_file!r} {self.status} wall={self.wall_time:.2f}s>"
+
+
+def _encoder(command: List[str]) -> str:
+    for flag in ("-c:v", "-vcodec", "-c"):
+        if flag in command:
+            i = command.index(flag)
+            if i + 1 < len(command):
+                return command[i + 1]
+    return "default"
+
+
+def _inputs(command: List[str]) -> List[str]:
+    return [command[i + 1] for i, arg in enumerate(command[:-1]) if arg == "-i"]
+
+
+def _size(path: str) -> Optional[int]:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def _rss_bytes(maxrss: int) -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def wait_with_rusage(process) -> Tuple[int, Optional[object]]:
+    """Reap process with os.wait4 so its own resource usage is known.
+
+    Returns (returncode, rusage); rusage is None where wait4 is unavailable.
+    """
+    if not hasattr(os, "wait4"):
+        return process.wait(), None
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # Already reaped elsewhere
+        return process.wait(), None
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    return process.returncode, rusage
+
+
+def record(metrics: JobMetrics) -> None:
+    """Log metrics and append them to the sinks configured in the environment."""
+    data = metrics.as_dict()
+    logger.info("ffmpeg job metrics", **{k: v for k, v in data.items() if k != "argv"})
+
+    jsonl_path = os.environ.get("VIDTOOLS_METRICS_FILE")
+    prom_path = os.environ.get("VIDTOOLS_PROMETHEUS_FILE")
+    if not jsonl_path and not prom_path:
+        return
+    with _write_lock:
+        try:
+            if jsonl_path:
+                with open(jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(data) + "\n")
+            if prom_path:
+                _update_textfile(prom_path, metrics)
+        except OSError as e:
+            logger.warning("Could not write job metrics", error=str(e))
+
+
+def _read_textfile(path: str) -> Dict[Tuple[str, str], float]:
+    values = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                series, _, value = line.rpartition(" ")
+                name, _, labels = series.partition("{")
+                values[(name, "{" + labels if labels else "")] = float(value)
+    except (OSError, ValueError):
+        pass
+    return values
+
+
+def _update_textfile(path: str, metrics: JobMetrics) -> None:
+    values = _read_textfile(path)
+    labels = f'{{encoder="{metrics.encoder}",status="{metrics.status}"}}'
+    for name, (_, attribute) in _COUNTERS.items():
+        amount = 1 if attribute is None else getattr(metrics, attribute)
+        if amount is not None:
+            values[(name, labels)] = values.get((name, labels), 0.0) + amount
+    if metrics.max_rss is not None:
+        rss_labels = f'{{encoder="{metrics.encoder}"}}'
+        values[(_PEAK_RSS, rss_labels)] = max(values.get((_PEAK_RSS, rss_labels), 0.0),
+                                              metrics.max_rss)
+
+    lines = []
+    helps = {name: (text, "counter") for name, (text, _) in _COUNTERS.items()}
+    helps[_PEAK_RSS] = ("Peak resident set size of any ffmpeg job", "gauge")
+    for name, (text, kind) in helps.items():
+        series = sorted((labels, value) for (n, labels), value in values.items() if n == name)
+        if not series:
+            continue
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{labels} {value!r}" for labels, value in series]
+
+    # The collector may read at any moment, so never expose a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,147 @@
+"""Transcode avoidance: decide per stream whether to copy or re-encode.
+
+plan_streams() compares the probed source streams with what the target
+container accepts and what the caller asked for.  A stream is copied when
+its codec already fits the container (or matches an explicitly requested
+encoder) and nothing demands a re-encode, such as an explicit quality or
+bitrate, a frame-accurate start, or a filter.  An MKV to MP4 rewrap of
+H.264/AAC therefore becomes a remux that finishes in seconds.
+"""
+
+import subprocess
+from typing import Dict, List, Optional, Set
+
+from .utils import logger
+
+# Codecs each target container can carry without re-encoding
+CONTAINER_CODECS: Dict[str, Dict[str, Set[str]]] = {
+    "mp4": {"video": {"h264", "hevc", "av1", "mpeg4"},
+            "audio": {"aac", "mp3", "ac3", "eac3", "alac"}},
+    "mov": {"video": {"h264", "hevc", "prores", "mpeg4", "mjpeg"},
+            "audio": {"aac", "mp3", "ac3", "alac", "pcm_s16le", "pcm_s24le"}},
+    "mkv": {"video": {"h264", "hevc", "av1", "vp8", "vp9", "mpeg4", "mpeg2video", "prores"},
+            "audio": {"aac", "mp3", "ac3", "eac3", "opus", "vorbis", "flac", "dts", "alac",
+                      "pcm_s16le", "pcm_s24le"}},
+    "webm": {"video": {"vp8", "vp9", "av1"}, "audio": {"opus", "vorbis"}},
+    "avi": {"video": {"mpeg4", "h264", "mjpeg"}, "audio": {"mp3", "ac3", "pcm_s16le"}},
+    "mp3": {"video": set(), "audio": {"mp3"}},
+    "ts": {"video": {"h264", "hevc", "mpeg2video"}, "audio": {"aac", "mp3", "ac3", "eac3"}},
+}
+CONTAINER_CODECS["m4v"] = CONTAINER_CODECS["mp4"]
+
+# Encoder name -> codec it produces, to tell whether a requested encoder
+# would just recreate what the source already has
+ENCODER_CODECS = {
+    "libx264": "h264", "libx265": "hevc", "libvpx": "vp8", "libvpx-vp9": "vp9",
+    "libaom-av1": "av1", "libsvtav1": "av1", "libxvid": "mpeg4", "mpeg4": "mpeg4",
+    "aac": "aac", "libfdk_aac": "aac", "libopus": "opus", "libvorbis": "vorbis",
+    "libmp3lame": "mp3", "ac3": "ac3", "flac": "flac",
+}
+
+
+class StreamPlan:
+    """Per-stream decision: ``copy``, ``encode`` or ``none`` (no such stream)."""
+
+    __slots__ = ("video", "audio", "reasons")
+
+    def __init__(self):
+        self.video = "none"
+        self.audio = "none"
+        self.reasons: List[str] = []
+
+    @property
+    def path(self) -> str:
+        """Short label: remux, audio-only re-encode, video-only re-encode or transcode."""
+        encoded = {kind for kind in ("video", "audio") if getattr(self, kind) == "encode"}
+        if not encoded:
+            return "remux"
+        if encoded == {"audio"}:
+            return "audio re-encode"
+        if encoded == {"video"} and self.audio == "copy":
+            return "video re-encode"
+        return "transcode"
+
+    def __repr__(self):
+        return f"<StreamPlan video={self.video} audio={self.audio}>"
+
+
+def _option(args: List[str], flag: str) -> Optional[str]:
+    if flag in args and args.index(flag) + 1 < len(args):
+        return args[args.index(flag) + 1]
+    return None
+
+
+def _decide(kind, stream, container, args, codec_requested, quality_requested,
+            frame_accurate, reasons) -> str:
+    if stream is None:
+        return "none"
+    codec = stream.codec_name
+    allowed = CONTAINER_CODECS[container][kind]
+    encoder = _option(args, f"-c:{kind[0]}")
+    if codec not in allowed:
+        reasons.append(f"{kind} {codec} not allowed in {container}")
+        return "encode"
+    if codec_requested and ENCODER_CODECS.get(encoder or "") != codec:
+        reasons.append(f"{kind} {codec} differs from requested {encoder}")
+        return "encode"
+    if quality_requested:
+        reasons.append(f"{kind} quality/bitrate requested")
+        return "encode"
+    if frame_accurate:
+        reasons.append(f"{kind} start is not on a keyframe")
+        return "encode"
+    reasons.append(f"{kind} {codec} fits {container}")
+    return "copy"
+
+
+def plan_streams(input_file: str, format_type: str, video_args: List[str], audio_args: List[str],
+                 requested: Optional[Dict[str, bool]] = None,
+                 frame_accurate: bool = False) -> Optional[StreamPlan]:
+    """Decide copy vs encode for the first video and audio stream of input_file.
+
+    Args:
+        input_file: Source path
+        format_type: Target container (mp4, mkv, webm, ...)
+        video_args: Video encoder arguments convert would otherwise use
+        audio_args: Audio encoder arguments convert would otherwise use
+        requested: Which settings the user chose explicitly; keys are
+            ``vcodec``, ``acodec``, ``video_quality`` and ``audio_quality``.
+            Defaults filled in by convert never force a re-encode.
+        frame_accurate: The start time is not on a keyframe, so video must be re-encoded
+
+    Returns:
+        StreamPlan, or None when the source cannot be probed or the target
+        container is unknown (the caller should transcode as before).
+    """
+    from .probe import probe
+
+    if format_type not in CONTAINER_CODECS:
+        return None
+    try:
+        info = probe(input_file)
+    except (subprocess.CalledProcessError, OSError, ValueError) as e:
+        logger.debug("Probe failed; not planning stream copy", file=input_file, error=str(e))
+        return None
+
+    requested = requested or {}
+    plan = StreamPlan()
+    if "-vn" not in video_args:
+        plan.video = _decide("video", info.video, format_type, video_args,
+                             requested.get("vcodec"), requested.get("video_quality"),
+                             frame_accurate, plan.reasons)
+    plan.audio = _decide("audio", info.audio, format_type, audio_args,
+                         requested.get("acodec"), requested.get("audio_quality"),
+                         False, plan.reasons)
+    logger.info("Stream plan", input=input_file, target=format_type, path=plan.path,
+                video=plan.video, audio=plan.audio, reasons=plan.reasons)
+    return plan
+
+
+def copy_video_args(input_file: str, format_type: str) -> List[str]:
+    """Arguments that stream-copy the video, tagging HEVC so Apple players accept it."""
+    from .probe import probe
+
+    args = ["-c:v", "copy"]
+    if format_type in ("mp4", "mov", "m4v") and probe(input_file).video_codec == "hevc":
+        args += ["-tag:v", "hvc1"]
+    return args
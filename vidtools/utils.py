@@ -2,39 +2,163 @@ import subprocess
 import os
 import sys
 import re
-from tqdm import tqdm
-import structlog
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 
 # --- Logging Setup ---
-structlog.configure(
-    processors=[
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
-    ],
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
-
-logger = structlog.get_logger(__name__)
+# structlog (which pulls in rich) and tqdm cost more to import than the rest
+# of the CLI combined, so both are imported on first use: a `vt` call that
+# never logs or runs ffmpeg never pays for them.
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            import structlog
+
+            structlog.configure(
+                processors=[
+                    structlog.stdlib.add_logger_name,
+                    structlog.stdlib.add_log_level,
+                    structlog.stdlib.PositionalArgumentsFormatter(),
+                    structlog.processors.TimeStamper(fmt="iso"),
+                    structlog.processors.StackInfoRenderer(),
+                    structlog.processors.format_exc_info,
+                    structlog.processors.UnicodeDecoder(),
+                    structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+                ],
+                logger_factory=structlog.stdlib.LoggerFactory(),
+                wrapper_class=structlog.stdlib.BoundLogger,
+                cache_logger_on_first_use=True,
+            )
+            _logger = structlog.get_logger(__name__)
+        return _logger
+
+
+class _LazyLogger:
+    """Forwards to the structlog logger, configuring structlog on first use."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(_get_logger(), name)
+
+
+logger = _LazyLogger()
+
+# --- Per-thread run options ---
+# Callers that drive many ffmpeg processes at once (e.g. the batch engine) use
+# ffmpeg_run_options() to change how run_ffmpeg_command behaves on the current
+# thread without threading extra arguments through every command builder.
+_local = threading.local()
+
+
+def _current_run_options():
+    if not hasattr(_local, "options"):
+        _local.options = {}
+    return _local.options
+
+
+@contextmanager
+def ffmpeg_run_options(**overrides):
+    """Temporarily override run options for ffmpeg commands on this thread.
+
+    Supported options:
+        quiet: suppress the command echo, progress bar and success message
+        overwrite: True adds -y, False adds -n (never prompt on stdin)
+        record: list that receives every resolved argv that is executed
+        progress: callable receiving a ProgressEvent for every ffmpeg update
+        capture: list that receives every resolved argv instead of running it
+        concurrency: how many ffmpeg processes the caller runs at once, so the
+            resource governor can size each one's thread share up front
+    """
+    options = _current_run_options()
+    saved = dict(options)
+    options.update(overrides)
+    try:
+        yield options
+    finally:
+        options.clear()
+        options.update(saved)
+
+
+def _apply_run_options(command, options):
+    """Insert global flags implied by the active run options after argv[0]."""
+    extra = []
+    if options.get("quiet"):
+        extra.append("-nostdin")
+    overwrite = options.get("overwrite")
+    if overwrite is True:
+        extra.append("-y")
+    elif overwrite is False:
+        extra.append("-n")
+    if not extra:
+        return list(command)
+    return [command[0], *extra, *command[1:]]
 
 # --- Utility Functions ---
 
 def check_ffmpeg_installed():
-    """Checks if ffmpeg is installed and in PATH."""
+    """Checks if ffmpeg is installed and in PATH (a PATH lookup; ffmpeg is not started)."""
+    import shutil
+
+    return shutil.which("ffmpeg") is not None
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the vidtools cache root.
+
+    The root is $VIDTOOLS_CACHE_DIR, else $XDG_CACHE_HOME/vidtools, else
+    ~/.cache/vidtools.
+    """
+    root = os.environ.get("VIDTOOLS_CACHE_DIR")
+    if not root:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(xdg, "vidtools")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+_TIME_RE = re.compile(r"^(-?)(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d*)?|\.\d+)(s|ms|us)?$")
+_TIME_UNITS = {None: 1.0, "s": 1.0, "ms": 1e-3, "us": 1e-6}
+
+def parse_time(value):
+    """Parse an ffmpeg-style time into seconds.
+
+    Accepts what ffmpeg's -ss/-t/-to take: ``[-][HH:]MM:SS[.m...]`` or
+    ``[-]S+[.m...]`` with an optional ``s``, ``ms`` or ``us`` suffix.
+    Raises ValueError for anything else.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    match = _TIME_RE.match(text)
+    if not match or (match.group(5) and (match.group(2) or match.group(3))):
+        raise ValueError(f"invalid time {value!r} (use HH:MM:SS[.ms], seconds, or 500ms)")
+    sign, hours, minutes, seconds, unit = match.groups()
+    total = (int(hours or 0) * 3600 + int(minutes or 0) * 60
+             + float(seconds) * _TIME_UNITS[unit])
+    return -total if sign else total
+
+def time_arg(value):
+    """argparse ``type=`` for time options: validate now, pass the text on unchanged."""
+    import argparse
+
     try:
-        subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
-        return True
-    except FileNotFoundError:
-        return False
-    except subprocess.CalledProcessError:
-        return True
+        parse_time(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+def format_time(seconds):
+    """Format seconds for ffmpeg's -ss/-t/-to options."""
+    return f"{seconds:.6f}".rstrip("0").rstrip(".") or "0"
 
 def is_valid_file(parser, arg):
     """Checks if the provided file path exists and is a file."""
@@ -44,36 +168,234 @@ def is_valid_file(parser, arg):
         parser.error(f"Error: '{arg}' is not a file.")
     return arg
 
-def run_ffmpeg_command(command):
-    """Executes an ffmpeg command with progress bar and error handling."""
-    print("FFmpeg Command:", " ".join(command))  # ADD THIS LINE - Print the command
-    process = subprocess.Popen(command, stderr=subprocess.PIPE, universal_newlines=True)
-    progress_bar = tqdm(total=100, unit="%", desc="Processing", dynamic_ncols=True)
-    duration = None
-    progress_regex = re.compile(r"frame=\s*\d+\s+fps=\s*[\d\.]+\s+q=[\-\d\.]+\s+size=\s*[\w\d]+\s+time=([\d\:\.]+)\s+bitrate=")
-    duration_regex = re.compile(r"Duration: (\d{2}:\d{2}:\d{2}\.\d{2})")
+def run_ffmpeg_command(command, cache=False):
+    """Executes an ffmpeg command with progress bar and error handling.
+
+    With ``cache`` set (None means "use $VIDTOOLS_CACHE"), the output is
+    looked up in the content-addressed output cache first and stored there
+    after a successful run.
+    """
+    command = _checked_command(command)
+    options = _current_run_options()
+    if options.get("capture") is not None:
+        options["capture"].append(_apply_run_options(command, options))
+        return
+    if cache is None:
+        cache = os.environ.get("VIDTOOLS_CACHE", "").lower() in ("1", "true", "yes")
+    if not cache:
+        _execute_ffmpeg_command(command)
+        return
+
+    from . import cache as output_cache
+
+    key = output_cache.command_key(command)
+    if key is None:
+        _execute_ffmpeg_command(command)
+        return
+    overwrite = _current_run_options().get("overwrite")
+    if output_cache.restore(key, command[-1], overwrite=overwrite is True):
+        if not _current_run_options().get("quiet"):
+            print(f"Cache hit: {command[-1]} restored without running ffmpeg.")
+        return
+    _execute_ffmpeg_command(command)
+    output_cache.store(key, command[-1])
+
+# --- Progress reporting ---
+# ffmpeg writes machine-readable progress to the fd given by -progress as
+# key=value lines, one block per update ending in "progress=continue" (or
+# "progress=end").  Reading it from a dedicated pipe leaves stderr free to
+# be collected for error reports.
+
+# Lines of stderr kept for the error report of a failed command
+STDERR_TAIL_LINES = 200
+
+
+class ProgressEvent:
+    """One ``-progress`` update from a running ffmpeg.
+
+    ``out_time`` is in seconds of output written so far; ``percent`` is
+    only set when the expected output duration is known.
+    """
+
+    __slots__ = ("frame", "fps", "bitrate", "total_size", "out_time", "speed", "percent", "done")
+
+    def __init__(self, fields, duration=None):
+        self.frame = _to_number(fields.get("frame"), int)
+        self.fps = _to_number(fields.get("fps"), float)
+        self.bitrate = fields.get("bitrate")
+        self.total_size = _to_number(fields.get("total_size"), int)
+        out_time_us = _to_number(fields.get("out_time_us") or fields.get("out_time_ms"), int)
+        self.out_time = out_time_us / 1_000_000 if out_time_us is not None and out_time_us >= 0 else None
+        speed = (fields.get("speed") or "").rstrip("x")
+        self.speed = _to_number(speed, float)
+        self.done = fields.get("progress") == "end"
+        self.percent = None
+        if duration and self.out_time is not None:
+            self.percent = min(100.0, self.out_time / duration * 100)
+        if self.done and duration:
+            self.percent = 100.0
+
+    def __repr__(self):
+        return f"<ProgressEvent out_time={self.out_time} fps={self.fps} speed={self.speed} done={self.done}>"
+
+
+def _to_number(value, kind):
     try:
-        while True:
-            stderr_line = process.stderr.readline()
-            if not stderr_line and process.poll() is not None:
-                break
-            if stderr_line:
-                if not duration:
-                    duration_match = duration_regex.search(stderr_line)
-                    if duration_match:
-                        duration_str = duration_match.group(1)
-                        h, m, s_ms = map(float, duration_str.split(':'))
-                        duration = h * 3600 + m * 60 + s_ms
-                progress_match = progress_regex.search(stderr_line)
-                if progress_match and duration:
-                    time_str = progress_match.group(1)
-                    h, m, s_ms = map(float, time_str.split(':'))
-                    current_time = h * 3600 + m * 60 + s_ms
-                    progress = min(100, (current_time / duration) * 100)
-                    progress_bar.update(int(progress - progress_bar.n))
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _expected_duration(command):
+    """Output duration implied by an output -t in the command, if any."""
+    last_input = max((i for i, arg in enumerate(command) if arg == "-i"), default=0)
+    for i in range(len(command) - 2, last_input, -1):
+        if command[i] == "-t":
+            try:
+                return parse_time(command[i + 1])
+            except ValueError:
+                return None
+    return None
+
+
+def last_ffmpeg_error():
+    """Last stderr line of the most recent failed ffmpeg run on this thread."""
+    tail = getattr(_local, "stderr_tail", None)
+    return tail[-1] if tail else None
+
+
+_DURATION_RE = re.compile(r"Duration: (\d+:\d{2}:\d{2}\.\d+)")
+
+
+def _note_stderr_line(line, tail, state):
+    line = line.rstrip()
+    if not line:
+        return
+    tail.append(line)
+    if state.get("duration") is None:
+        match = _DURATION_RE.search(line)
+        if match:
+            state["duration"] = parse_time(match.group(1))
+
+
+def _read_stderr(stream, tail, state):
+    """Keep the last lines of stderr and pick up the input duration from the banner."""
+    for line in stream:
+        _note_stderr_line(line, tail, state)
+
+
+def _progress_line(line, fields, state):
+    """Add one -progress line to fields; return a ProgressEvent when it ends a block."""
+    key, sep, value = line.strip().partition("=")
+    if not sep:
+        return None
+    fields[key] = value
+    if key != "progress":
+        return None
+    event = ProgressEvent(fields, state.get("duration"))
+    fields.clear()
+    return event
+
+
+def _iter_progress(stream, state):
+    """Yield a ProgressEvent for every complete block read from the -progress pipe."""
+    fields = {}
+    for line in stream:
+        event = _progress_line(line, fields, state)
+        if event is not None:
+            yield event
+
+
+def _checked_command(command):
+    """Swap in fallback encoders and stop before running a command this ffmpeg can't do."""
+    from .capabilities import check_command
+
+    command, problems = check_command(command)
+    if problems:
+        logger.error("FFmpeg command needs features this build lacks", problems=problems,
+                     command=command)
+        print("\n🚨 FFmpeg cannot run this command: 🚨", file=sys.stderr)
+        for problem in problems:
+            print(f"  - {problem}", file=sys.stderr)
+        exit(1)
+    return command
+
+def _execute_ffmpeg_command(command):
+    from tqdm import tqdm
+
+    from . import telemetry
+    from .governor import get_governor
+
+    options = _current_run_options()
+    quiet = options.get("quiet", False)
+    on_progress = options.get("progress")
+    command = _apply_run_options(command, options)
+    if options.get("record") is not None:
+        options["record"].append(command)
+    if not quiet:
+        print("FFmpeg Command:", " ".join(command))  # ADD THIS LINE - Print the command
+
+    tail = deque(maxlen=STDERR_TAIL_LINES)
+    _local.stderr_tail = None
+    state = {"duration": _expected_duration(command)}
+    progress_bar = tqdm(total=100, unit="%", desc="Processing", dynamic_ncols=True, disable=quiet)
+    process = None
+    reader = None
+    started = time.monotonic()
+    governor = get_governor()
+    running = governor.acquire()
+    try:
+        concurrency = max(running, options.get("concurrency") or 1)
+        if os.name == "posix":
+            read_fd, write_fd = os.pipe()
+            argv = governor.apply(
+                [command[0], "-nostats", "-progress", f"pipe:{write_fd}", *command[1:]], concurrency)
+            try:
+                process = subprocess.Popen(
+                    argv,
+                    stdin=subprocess.DEVNULL if quiet else None,
+                    stderr=subprocess.PIPE,
+                    pass_fds=(write_fd,),
+                    universal_newlines=True,
+                )
+            except BaseException:
+                os.close(read_fd)
+                raise
+            finally:
+                # Only ffmpeg holds the write end, so EOF means it exited
+                os.close(write_fd)
+            progress_stream = os.fdopen(read_fd, "r")
+        else:
+            # No fd inheritance: fall back to stdout, which vidtools never writes media to
+            argv = governor.apply([command[0], "-nostats", "-progress", "pipe:1", *command[1:]],
+                                  concurrency)
+            process = subprocess.Popen(
+                argv,
+                stdin=subprocess.DEVNULL if quiet else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+            )
+            progress_stream = process.stdout
+
+        reader = threading.Thread(target=_read_stderr, args=(process.stderr, tail, state), daemon=True)
+        reader.start()
+        last_event = None
+        with progress_stream:
+            for event in _iter_progress(progress_stream, state):
+                last_event = event
+                if event.percent is not None:
+                    progress_bar.update(int(event.percent - progress_bar.n))
+                if on_progress is not None:
+                    on_progress(event)
+        _, rusage = telemetry.wait_with_rusage(process)
+        reader.join()
         progress_bar.close()
+        telemetry.record(telemetry.JobMetrics(command, process.returncode, time.monotonic() - started,
+                                              last_event, rusage))
         if process.returncode != 0:
-            error_output = process.stderr.read()
+            _local.stderr_tail = list(tail)
+            error_output = "\n".join(tail)
             logger.error("FFmpeg command failed!", return_code=process.returncode, error_output=error_output) # Structlog logging
             print(f"\n🚨 FFmpeg command failed! 🚨", file=sys.stderr)
             print(f"Error Code: {process.returncode}", file=sys.stderr)
@@ -82,14 +404,23 @@ def run_ffmpeg_command(command):
             exit(1)
         else:
             logger.info("FFmpeg command completed successfully.") # Structlog logging
-            print("FFmpeg command completed successfully.")
+            if not quiet:
+                print("FFmpeg command completed successfully.")
     except FileNotFoundError:
         logger.error("ffmpeg not found!", exc_info=True) # Structlog logging with exception info
         print("\n🚨 Error: ffmpeg not found! 🚨", file=sys.stderr)
         print("Please ensure ffmpeg is installed and in your PATH.", file=sys.stderr)
         exit(1)
     except Exception as e:
+        if process is not None:
+            if process.poll() is None:
+                process.kill()
+            process.wait()  # reap it, and let the stderr reader see EOF
+        if reader is not None:
+            reader.join()
         logger.exception("An unexpected error occurred during ffmpeg execution") # Full exception logging
         print(f"\n🚨 An unexpected error occurred: {e} 🚨", file=sys.stderr)
         print("Please review the command and your inputs, and check for ffmpeg errors above.", file=sys.stderr)
-        exit(1)
\ No newline at end of file
+        exit(1)
+    finally:
+        governor.release()